@@ -1,4 +1,3 @@
-import yfinance as yf
 import pandas as pd
 import json
 import math
@@ -6,6 +5,9 @@ import numpy as np
 from flask import request, Response
 from flask_restful import Resource
 
+from applications.price_store import get_history
+from applications.symbol_master import DEFAULT_SUFFIX, canonical_symbol
+
 
 # ---------------------------
 # Helper: recursive sanitizer (UNCHANGED)
@@ -88,23 +90,17 @@ class StockChart:
         self.MA_PERIODS = [20, 50] 
 
     def _format_ticker(self, ticker: str) -> str:
-        if not any(ticker.endswith(suffix) for suffix in [".NS", ".BO", ".L", ".PA"]):
-            return ticker + ".NS"
-        return ticker
+        # Charts treat bare codes as NSE listings
+        return canonical_symbol(ticker, DEFAULT_SUFFIX)
 
     def fetch_data(self):
-        df = yf.download(
-            self.yf_ticker,
-            period="1y", 
-            interval="1d",
-            progress=False
-        )
-
-        if df.empty:
+        start = (pd.Timestamp.today().normalize() - pd.DateOffset(years=1)).strftime('%Y-%m-%d')
+        df = get_history([self.yf_ticker], start).get(self.yf_ticker)
+
+        if df is None or df.empty:
             raise ValueError(f"Could not fetch data for ticker: {self.raw_ticker} (Tried: {self.yf_ticker})")
 
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
+        df = df.copy()  # the store's frame is shared; indicators go on a private copy
 
         if not {"Close", "Volume"}.issubset(set(df.columns)):
             raise ValueError("Essential columns (Close, Volume) missing.")
@@ -1,31 +1,118 @@
 from flask_restful import Resource, reqparse
-from flask import jsonify, request, make_response
+from flask import Response, jsonify, request, make_response, stream_with_context
 from flask_security import auth_token_required, current_user
-import google.generativeai as genai
-from applications.models import PortfolioHolding, User
+from applications.llm_cache import cached_generate, lookup, store, user_scope
+from applications.models import User
+from applications.portfolio_queries import consolidated_positions
 from applications.database import db
 import os
 from dotenv import load_dotenv
 from datetime import datetime
+import json
+import threading
+import time
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-    # List available models for debugging
-    try:
-        available_models = genai.list_models()
-        print("[DEBUG] Available Gemini models:")
-        for model in available_models:
-            print(f"  - {model.name}")
-    except Exception as e:
-        print(f"[DEBUG] Could not list models: {e}")
-else:
+if not GEMINI_API_KEY:
     print("[WARNING] GEMINI_API_KEY not found in .env file")
 
+GEMINI_MODEL = 'models/gemini-2.5-flash'
+
+_genai = None
+_genai_lock = threading.Lock()
+
+
+def get_genai():
+    """
+    Import and configure google.generativeai on first use.
+    The SDK (and its gRPC stack) is slow to import, so workers that never
+    serve an /ai/* request never load it.
+    """
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=GEMINI_API_KEY)
+                _genai = genai
+    return _genai
+
+
+# -------------------------------
+# STREAMING (Server-Sent Events)
+# -------------------------------
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _chunk_text(chunk):
+    try:
+        return chunk.text or ''
+    except ValueError:      # chunk without text parts (e.g. blocked by a safety filter)
+        return ''
+
+
+def stream_answer(endpoint, prompt, started, meta, system_instruction=None, scope=None, fixed_text=None):
+    """
+    SSE response relaying the model's answer as it is generated:
+      event: chunk  {"text": ...}  one per streamed piece (a cached answer is one chunk)
+      event: done   meta + generated_at, cached, chunks, chars, ttfb_ms, total_ms
+      event: error  {"message": ...}
+    ttfb_ms / total_ms are measured from `started` (request start) to the first / last chunk.
+    Complete answers are stored in the LLM cache like the non-streaming endpoints.
+    """
+    def events():
+        ttfb = None
+        pieces = 0
+        parts = []
+        try:
+            key, entry = (None, None) if fixed_text is not None else lookup(
+                endpoint, GEMINI_MODEL, prompt, system_instruction, scope)
+            if fixed_text is not None:
+                source = [fixed_text]
+            elif entry is not None:
+                source = [entry['text']]
+            else:
+                model = get_genai().GenerativeModel(model_name=GEMINI_MODEL,
+                                                    system_instruction=system_instruction)
+                source = (_chunk_text(chunk) for chunk in model.generate_content(prompt, stream=True))
+
+            for text in source:
+                if not text:
+                    continue
+                if ttfb is None:
+                    ttfb = time.perf_counter() - started
+                pieces += 1
+                parts.append(text)
+                yield _sse('chunk', {'text': text})
+
+            answer = ''.join(parts)
+            if not answer:
+                yield _sse('error', {'message': 'Failed to get AI response'})
+                return
+            if entry is not None:
+                generated_at = entry['generated_at']
+            elif fixed_text is not None:
+                generated_at = datetime.now().isoformat()
+            else:
+                generated_at = store(endpoint, key, answer)
+
+            total = time.perf_counter() - started
+            print(f"[AI_STREAM] {endpoint}: ttfb {ttfb * 1000:.0f} ms, total {total * 1000:.0f} ms, "
+                  f"{pieces} chunk(s){' (cached)' if entry is not None else ''}")
+            yield _sse('done', dict(meta, model=GEMINI_MODEL, generated_at=generated_at,
+                                    cached=entry is not None, chunks=pieces, chars=len(answer),
+                                    ttfb_ms=round(ttfb * 1000, 1), total_ms=round(total * 1000, 1)))
+        except Exception as e:
+            print(f"[AI_STREAM_ERROR] {endpoint}: {e}")
+            yield _sse('error', {'message': f'Error: {str(e)}'})
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 # Parser for chatbot messages
 chat_parser = reqparse.RequestParser()
 chat_parser.add_argument('message', type=str, required=True, help='Message is required', location='json')
@@ -41,26 +128,10 @@ class AIChatbot(Resource):
     
     def post(self):
         try:
-            args = chat_parser.parse_args()
-            user_id = args['user_id']
-            user_message = args['message'].strip()
-            
-            if not user_message:
-                return make_response(jsonify({'message': 'Message cannot be empty'}), 400)
-            
-            # Verify user exists
-            user = User.query.get(user_id)
-            if not user:
-                return make_response(jsonify({'message': 'User not found'}), 404)
-            
-            if not GEMINI_API_KEY:
-                return make_response(jsonify({'message': 'Gemini API key not configured'}), 500)
-            
-            # Get user's portfolio context
-            portfolio_context = self._get_portfolio_context(user_id)
-            
-            # Build system prompt with portfolio context
-            system_prompt = self._build_system_prompt(portfolio_context)
+            error, job = self._prepare()
+            if error is not None:
+                return error
+            user_message, system_prompt, portfolio_context = job
             
             # Get AI response using Gemini
             ai_response = self._get_gemini_response(system_prompt, user_message)
@@ -82,12 +153,36 @@ class AIChatbot(Resource):
                 'message': f'Error: {str(e)}'
             }), 500)
     
+    def _prepare(self):
+        """Validate the request -> (error response, None) or (None, (message, system prompt, portfolio context))"""
+        args = chat_parser.parse_args()
+        user_id = args['user_id']
+        user_message = args['message'].strip()
+        
+        if not user_message:
+            return make_response(jsonify({'message': 'Message cannot be empty'}), 400), None
+        
+        # Verify user exists
+        user = User.query.get(user_id)
+        if not user:
+            return make_response(jsonify({'message': 'User not found'}), 404), None
+        
+        if not GEMINI_API_KEY:
+            return make_response(jsonify({'message': 'Gemini API key not configured'}), 500), None
+        
+        # Get user's portfolio context
+        portfolio_context = self._get_portfolio_context(user_id)
+        
+        # Build system prompt with portfolio context
+        system_prompt = self._build_system_prompt(portfolio_context)
+        return None, (user_message, system_prompt, portfolio_context)
+    
     def _get_portfolio_context(self, user_id):
         """Fetch user's portfolio data for context"""
         try:
-            holdings = PortfolioHolding.query.filter_by(user_id=user_id).all()
+            positions = consolidated_positions(user_id)
             
-            if not holdings:
+            if not positions:
                 return {
                     'status': 'empty',
                     'message': 'No portfolio holdings yet',
@@ -95,20 +190,15 @@ class AIChatbot(Resource):
                     'holdings_count': 0
                 }
             
-            total_invested = 0
-            holdings_list = []
-            
-            for holding in holdings:
-                invested = holding.quantity * holding.purchase_price
-                total_invested += invested
-                
-                holdings_list.append({
-                    'symbol': holding.symbol,
-                    'quantity': holding.quantity,
-                    'purchase_price': holding.purchase_price,
-                    'invested_amount': invested,
-                    'purchase_date': holding.purchase_date.strftime('%Y-%m-%d') if holding.purchase_date else 'N/A'
-                })
+            total_invested = sum(p.invested for p in positions)
+            holdings_list = [{
+                'symbol': p.symbol,
+                'quantity': p.quantity,
+                'purchase_price': p.avg_cost or 0,
+                'invested_amount': p.invested,
+                'lots': p.lots,
+                'purchase_date': p.first_purchase.strftime('%Y-%m-%d') if p.first_purchase else 'N/A'
+            } for p in positions]
             
             return {
                 'status': 'active',
@@ -138,7 +228,7 @@ how to build a diversified portfolio, and suggest good beginner stocks for India
             portfolio_info = "Could not fetch portfolio data. Provide general investment advice."
         else:
             holdings_str = "\n".join([
-                f"  • {h['symbol']}: {h['quantity']} shares @ ₹{h['purchase_price']:.2f} = ₹{h['invested_amount']:.2f} (Bought: {h['purchase_date']})"
+                f"  • {h['symbol']}: {h['quantity']} shares @ avg ₹{h['purchase_price']:.2f} = ₹{h['invested_amount']:.2f} ({h['lots']} lot(s), first bought: {h['purchase_date']})"
                 for h in portfolio_context.get('holdings', [])
             ])
             
@@ -197,14 +287,17 @@ IMPORTANT: You are advising a real investor with real money. Be responsible and
             if not GEMINI_API_KEY:
                 return None
             
-            # Use gemini-2.5-flash with correct format
-            model = genai.GenerativeModel(
-                model_name='models/gemini-2.5-flash',
-                system_instruction=system_prompt
-            )
-            
-            response = model.generate_content(user_message)
-            return response.text if response and hasattr(response, 'text') else None
+            def generate():
+                model = get_genai().GenerativeModel(
+                    model_name=GEMINI_MODEL,
+                    system_instruction=system_prompt
+                )
+                response = model.generate_content(user_message)
+                return response.text if response and hasattr(response, 'text') else None
+
+            text, _, _ = cached_generate('chat', GEMINI_MODEL, user_message, generate,
+                                         system_instruction=system_prompt)
+            return text
         
         except Exception as e:
             print(f"[GEMINI_API_ERROR]: {e}")
@@ -216,16 +309,41 @@ class AIStockAnalyzer(Resource):
     
     def post(self):
         try:
-            args = stock_parser.parse_args()
-            ticker = args['ticker'].upper().strip()
+            error, job = self._prepare()
+            if error is not None:
+                return error
+            ticker, analysis_prompt = job
             
-            if not ticker:
-                return make_response(jsonify({'message': 'Ticker symbol is required'}), 400)
-            
-            if not GEMINI_API_KEY:
-                return make_response(jsonify({'message': 'Gemini API key not configured'}), 500)
+            def generate():
+                response = get_genai().GenerativeModel(model_name=GEMINI_MODEL).generate_content(analysis_prompt)
+                return response.text if response and hasattr(response, 'text') else None
+
+            # Identical prompt per ticker: served from the LLM cache within its TTL
+            analysis_text, generated_at, cached = cached_generate('analyze_stock', GEMINI_MODEL, analysis_prompt, generate)
             
-            analysis_prompt = f"""Provide a comprehensive investment analysis for {ticker} stock:
+            return make_response(jsonify({
+                'ticker': ticker,
+                'analysis': analysis_text or "Could not generate analysis",
+                'generated_at': generated_at,
+                'cached': cached
+            }), 200)
+        
+        except Exception as e:
+            print(f"[STOCK_ANALYZER_ERROR]: {e}")
+            return make_response(jsonify({'message': f'Error analyzing stock: {str(e)}'}), 500)
+    
+    def _prepare(self):
+        """Validate the request -> (error response, None) or (None, (ticker, analysis prompt))"""
+        args = stock_parser.parse_args()
+        ticker = args['ticker'].upper().strip()
+        
+        if not ticker:
+            return make_response(jsonify({'message': 'Ticker symbol is required'}), 400), None
+        
+        if not GEMINI_API_KEY:
+            return make_response(jsonify({'message': 'Gemini API key not configured'}), 500), None
+        
+        analysis_prompt = f"""Provide a comprehensive investment analysis for {ticker} stock:
 
 1. **Company Overview**: 
    - What does the company do?
@@ -267,65 +385,86 @@ class AIStockAnalyzer(Resource):
    - Investment horizon
 
 Focus on Indian market perspective. Be specific and data-driven where possible."""
-            
-            model = genai.GenerativeModel(model_name='models/gemini-2.5-flash')
-            response = model.generate_content(analysis_prompt)
-            
-            analysis_text = response.text if response and hasattr(response, 'text') else "Could not generate analysis"
-            
-            return make_response(jsonify({
-                'ticker': ticker,
-                'analysis': analysis_text,
-                'generated_at': datetime.now().isoformat()
-            }), 200)
-        
-        except Exception as e:
-            print(f"[STOCK_ANALYZER_ERROR]: {e}")
-            return make_response(jsonify({'message': f'Error analyzing stock: {str(e)}'}), 500)
+        return None, (ticker, analysis_prompt)
 
 
 class AIPortfolioAdvisor(Resource):
     """POST /api/v1/ai/portfolio-advice - Get comprehensive portfolio advice"""
     
+    EMPTY_PORTFOLIO_ADVICE = ('Start building your portfolio by adding stocks you believe in. '
+                              'A diversified portfolio typically includes 5-10 stocks across different sectors.')
+    
     def post(self):
         try:
-            # Get user_id from request body instead of relying on current_user
-            data = request.get_json()
-            user_id = data.get('user_id')
-            
-            if not user_id:
-                return make_response(jsonify({'message': 'User ID is required'}), 400)
+            error, job = self._prepare()
+            if error is not None:
+                return error
             
-            try:
-                user_id = int(user_id)
-            except (ValueError, TypeError):
-                return make_response(jsonify({'message': 'Invalid User ID format'}), 400)
-            
-            # Verify user
-            user = User.query.get(user_id)
-            if not user:
-                return make_response(jsonify({'message': 'User not found'}), 404)
-            
-            if not GEMINI_API_KEY:
-                return make_response(jsonify({'message': 'Gemini API key not configured'}), 500)
-            
-            # Get portfolio
-            holdings = PortfolioHolding.query.filter_by(user_id=user_id).all()
-            
-            if not holdings:
+            if job['prompt'] is None:
                 return make_response(jsonify({
                     'message': 'No portfolio to analyze',
-                    'advice': 'Start building your portfolio by adding stocks you believe in. A diversified portfolio typically includes 5-10 stocks across different sectors.'
+                    'advice': self.EMPTY_PORTFOLIO_ADVICE
                 }), 200)
             
-            # Calculate portfolio metrics
-            total_invested = sum(h.quantity * h.purchase_price for h in holdings)
-            holdings_str = "\n".join([
-                f"- {h.symbol}: {h.quantity} shares @ ₹{h.purchase_price:.2f} = ₹{h.quantity * h.purchase_price:,.2f}"
-                for h in holdings
-            ])
+            user_id, advisor_prompt = job['user_id'], job['prompt']
             
-            advisor_prompt = f"""A user has the following stock portfolio with {len(holdings)} holdings:
+            def generate():
+                response = get_genai().GenerativeModel(model_name=GEMINI_MODEL).generate_content(advisor_prompt)
+                return response.text if response and hasattr(response, 'text') else None
+
+            # Scoped to the user: any holdings write invalidates it (dashboard_cache.on_holdings_changed)
+            advice_text, generated_at, cached = cached_generate(
+                'portfolio_advice', GEMINI_MODEL, advisor_prompt, generate, scope=user_scope(user_id))
+            
+            return make_response(jsonify({
+                'user_id': user_id,
+                'holdings_count': job['holdings_count'],
+                'total_invested': job['total_invested'],
+                'portfolio_advice': advice_text or "Could not generate advice",
+                'generated_at': generated_at,
+                'cached': cached
+            }), 200)
+        
+        except Exception as e:
+            print(f"[PORTFOLIO_ADVISOR_ERROR]: {e}")
+            return make_response(jsonify({'message': f'Error getting advice: {str(e)}'}), 500)
+    
+    def _prepare(self):
+        """Validate the request -> (error response, None) or (None, {user_id, holdings_count, total_invested, prompt})"""
+        # Get user_id from request body instead of relying on current_user
+        data = request.get_json()
+        user_id = data.get('user_id')
+        
+        if not user_id:
+            return make_response(jsonify({'message': 'User ID is required'}), 400), None
+        
+        try:
+            user_id = int(user_id)
+        except (ValueError, TypeError):
+            return make_response(jsonify({'message': 'Invalid User ID format'}), 400), None
+        
+        # Verify user
+        user = User.query.get(user_id)
+        if not user:
+            return make_response(jsonify({'message': 'User not found'}), 404), None
+        
+        if not GEMINI_API_KEY:
+            return make_response(jsonify({'message': 'Gemini API key not configured'}), 500), None
+        
+        # Get portfolio
+        holdings = consolidated_positions(user_id)
+        
+        if not holdings:
+            return None, {'user_id': user_id, 'holdings_count': 0, 'prompt': None}
+        
+        # Calculate portfolio metrics
+        total_invested = sum(h.invested for h in holdings)
+        holdings_str = "\n".join([
+            f"- {h.symbol}: {h.quantity} shares @ avg ₹{h.avg_cost or 0:.2f} = ₹{h.invested:,.2f}"
+            for h in holdings
+        ])
+        
+        advisor_prompt = f"""A user has the following stock portfolio with {len(holdings)} holdings:
 
 {holdings_str}
 
@@ -373,20 +512,70 @@ Please provide comprehensive portfolio advice including:
    - Long-term vision (1+ year)
 
 Provide specific, actionable advice tailored to this portfolio."""
-            
-            model = genai.GenerativeModel(model_name='models/gemini-2.5-flash')
-            response = model.generate_content(advisor_prompt)
-            
-            advice_text = response.text if response and hasattr(response, 'text') else "Could not generate advice"
-            
-            return make_response(jsonify({
-                'user_id': user_id,
-                'holdings_count': len(holdings),
-                'total_invested': round(total_invested, 2),
-                'portfolio_advice': advice_text,
-                'generated_at': datetime.now().isoformat()
-            }), 200)
+        return None, {
+            'user_id': user_id,
+            'holdings_count': len(holdings),
+            'total_invested': round(total_invested, 2),
+            'prompt': advisor_prompt
+        }
+
+
+# -------------------------------
+# STREAMING ENDPOINTS
+# -------------------------------
+class AIChatbotStream(AIChatbot):
+    """POST /api/v1/ai/chat/stream - /ai/chat answered as Server-Sent Events"""
+    
+    def post(self):
+        started = time.perf_counter()
+        try:
+            error, job = self._prepare()
+            if error is not None:
+                return error
+            user_message, system_prompt, portfolio_context = job
+            return stream_answer('chat', user_message, started,
+                                 {'success': True, 'portfolio_status': portfolio_context.get('status', 'unknown')},
+                                 system_instruction=system_prompt)
+        
+        except Exception as e:
+            print(f"[CHATBOT_ERROR]: {e}")
+            return make_response(jsonify({'success': False, 'message': f'Error: {str(e)}'}), 500)
+
+
+class AIStockAnalyzerStream(AIStockAnalyzer):
+    """POST /api/v1/ai/analyze-stock/stream - /ai/analyze-stock answered as Server-Sent Events"""
+    
+    def post(self):
+        started = time.perf_counter()
+        try:
+            error, job = self._prepare()
+            if error is not None:
+                return error
+            ticker, analysis_prompt = job
+            return stream_answer('analyze_stock', analysis_prompt, started, {'ticker': ticker})
+        
+        except Exception as e:
+            print(f"[STOCK_ANALYZER_ERROR]: {e}")
+            return make_response(jsonify({'message': f'Error analyzing stock: {str(e)}'}), 500)
+
+
+class AIPortfolioAdvisorStream(AIPortfolioAdvisor):
+    """POST /api/v1/ai/portfolio-advice/stream - /ai/portfolio-advice answered as Server-Sent Events"""
+    
+    def post(self):
+        started = time.perf_counter()
+        try:
+            error, job = self._prepare()
+            if error is not None:
+                return error
+            meta = {'user_id': job['user_id'], 'holdings_count': job['holdings_count'],
+                    'total_invested': job.get('total_invested', 0)}
+            if job['prompt'] is None:
+                return stream_answer('portfolio_advice', None, started, meta,
+                                     fixed_text=self.EMPTY_PORTFOLIO_ADVICE)
+            return stream_answer('portfolio_advice', job['prompt'], started, meta,
+                                 scope=user_scope(job['user_id']))
         
         except Exception as e:
             print(f"[PORTFOLIO_ADVISOR_ERROR]: {e}")
-            return make_response(jsonify({'message': f'Error getting advice: {str(e)}'}), 500)
\ No newline at end of file
+            return make_response(jsonify({'message': f'Error getting advice: {str(e)}'}), 500)
@@ -4,11 +4,14 @@ from flask_security import hash_password, utils, auth_token_required, current_us
 from applications.user_datastore import user_datastore
 from applications.database import db
 from applications.models import User, Watchlist 
+from applications.price_store import get_info
+from applications.response_cache import invalidate
+from applications.symbol_master import canonical_symbol
+from sqlalchemy import or_
 from sqlalchemy.sql import exists
 from sqlalchemy.exc import IntegrityError
 import uuid
 import pandas as pd
-import yfinance as yf
 import datetime
 
 # --- Required Imports (Ensure these are at the top of your file) ---
@@ -45,6 +48,14 @@ add_watchlist_parser.add_argument('notes', type=str, required=False, location='j
 
 
 # --- AUTHENTICATION RESOURCES ---
+def find_user_by_identifier(identifier):
+    """Username or email lookup in one query; a username match wins, as with two find_user calls."""
+    return (User.query
+            .filter(or_(User.username == identifier, User.email == identifier))
+            .order_by((User.username == identifier).desc())
+            .first())
+
+
 class ValidUser(Resource):
     """API endpoint to check if a username or email is already registered."""
     def post(self):
@@ -54,7 +65,7 @@ class ValidUser(Resource):
         if not identifier:
             return make_response(jsonify({'message': 'Username or Email is required'}), 400)
 
-        user = user_datastore.find_user(username=identifier) or user_datastore.find_user(email=identifier)
+        user = find_user_by_identifier(identifier)
 
         if user:
             return make_response(jsonify({'message': 'Identifier already exists'}), 409)
@@ -104,7 +115,7 @@ class Login(Resource):
         if not identifier or not password:
             return make_response(jsonify({'message': 'Username/Email and password are required'}), 400)
 
-        user = user_datastore.find_user(username=identifier) or user_datastore.find_user(email=identifier)
+        user = find_user_by_identifier(identifier)
 
         if not user:
             return make_response(jsonify({'message': 'Invalid credentials'}), 401)
@@ -181,8 +192,7 @@ class UserWatchlist(Resource):
         """
         try:
             # 1. Fetch data
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            info = get_info(ticker)
             
             # 2. Extract price, using fallback for market price
             price = info.get('currentPrice') or info.get('regularMarketPrice')
@@ -308,6 +318,7 @@ class AddToWatchlist(Resource):
             )
             db.session.add(new_item)
             db.session.commit()
+            invalidate('watchlist', user_id)
 
             return make_response(jsonify({
                 'message': 'Ticker added successfully',
@@ -338,6 +349,7 @@ class WatchlistItemDeletion(Resource):
         try:
             db.session.delete(item)
             db.session.commit()
+            invalidate('watchlist', item.user_id)
             
             return make_response(jsonify({
                 'message': f'Watchlist item {item_id} ({item.ticker}) deleted successfully.'
@@ -410,14 +422,13 @@ class StockAnalyzer(Resource):
             args = analyzer_parser.parse_args()
             ticker_symbol = args['ticker'].upper()
             exchange_suffix = args['exchange'].upper()
-            yf_symbol = f"{ticker_symbol}.{exchange_suffix}"
+            yf_symbol = canonical_symbol(ticker_symbol if '.' in ticker_symbol else f"{ticker_symbol}.{exchange_suffix}")
             
         except Exception:
             return make_response(jsonify({'message': 'Missing required query parameter: ticker.'}), 400)
 
         try:
-            ticker = yf.Ticker(yf_symbol)
-            info = ticker.info
+            info = get_info(yf_symbol)
             
             if 'regularMarketPrice' not in info and 'symbol' not in info:
                 return make_response(jsonify({'message': f'Ticker symbol "{yf_symbol}" not found. Check symbol accuracy.'}), 404)
@@ -0,0 +1,163 @@
+# -- coding: utf-8 --
+"""
+🧪 Walk-forward backtesting for the forecasters
+→ Rolling-origin evaluation at fixed 7- and 14-day horizons
+→ Any registered forecaster (LSTM or statistical) across many tickers
+→ (model, ticker) jobs spread over a process pool; fitted folds cached on disk, keyed on a
+  fingerprint of the forecaster code and parameters so edits never reuse stale folds
+→ Reports MAPE, directional accuracy and wall time per model
+"""
+
+import hashlib
+import inspect
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+from joblib import Memory
+
+from applications import stat_forecasters
+from applications.config import Config
+from applications.stat_forecasters import FORECASTERS
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+HORIZONS = (7, 14)
+MAX_HORIZON = max(HORIZONS)
+NUM_FOLDS = 12
+FOLD_STEP = 10                 # trading days between consecutive origins
+MIN_TRAIN = 500                # minimum history before the first origin
+CACHE_DIR = os.path.join(Config.instance_folder, 'backtests')
+
+_fold_cache = Memory(CACHE_DIR, verbose=0)
+
+
+# -------------------------------
+# FORECASTER REGISTRY
+# -------------------------------
+def _lstm_path(train_closes):
+    from applications.stock_7_14 import predict_prices, train_model
+
+    model, scaler, _ = train_model(train_closes)
+    return predict_prices(model, scaler, train_closes)
+
+
+def _stat_path(name):
+    def path(train_closes):
+        return FORECASTERS[name](train_closes, MAX_HORIZON)['point']
+    return path
+
+
+BACKTEST_FORECASTERS = {'lstm': _lstm_path}
+BACKTEST_FORECASTERS.update({name: _stat_path(name) for name in FORECASTERS})
+
+
+@lru_cache(maxsize=None)
+def forecaster_fingerprint(model_name):
+    """
+    Hash of everything that shapes a model's forecasts: for the LSTM, MODEL_VERSION,
+    its hyperparameters and the training / windowing / prediction code; for the
+    statistical models, the whole stat_forecasters module (code and parameters).
+    """
+    if model_name == 'lstm':
+        from applications import stock_7_14 as lstm
+        parts = [lstm.MODEL_VERSION, repr((lstm.LOOK_BACK, lstm.FORECAST_DAYS, lstm.EPOCHS, lstm.VALIDATION_WINDOWS))]
+        parts += [inspect.getsource(f) for f in (lstm.build_model, lstm.create_sequences, lstm._split_windows,
+                                                 lstm.train_model, lstm.predict_prices, lstm.last_window)]
+    else:
+        parts = [model_name, inspect.getsource(stat_forecasters)]
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def fit_fold(model_name, train_closes):
+    """Forecast path for one fold."""
+    return _fit_fold(model_name, forecaster_fingerprint(model_name), train_closes)
+
+
+@_fold_cache.cache
+def _fit_fold(model_name, fingerprint, train_closes):
+    """Cached on (model, forecaster fingerprint, exact training data)."""
+    return np.asarray(BACKTEST_FORECASTERS[model_name](train_closes), dtype=float)[:MAX_HORIZON]
+
+
+# -------------------------------
+# WALK-FORWARD
+# -------------------------------
+def fold_origins(n_obs, num_folds=NUM_FOLDS, step=FOLD_STEP):
+    """Indices where each fold's forecast starts, oldest first."""
+    last = n_obs - MAX_HORIZON
+    origins = [last - i * step for i in range(num_folds)]
+    return sorted(o for o in origins if o >= MIN_TRAIN)
+
+
+def walk_forward(model_name, closes, num_folds=NUM_FOLDS, step=FOLD_STEP):
+    """Evaluate one model on one price series. Returns metrics per horizon."""
+    closes = np.asarray(closes, dtype=float)
+    origins = fold_origins(len(closes), num_folds, step)
+    if not origins:
+        return None
+
+    started = time.perf_counter()
+    paths = np.array([fit_fold(model_name, closes[:o]) for o in origins])
+    wall = time.perf_counter() - started
+
+    idx = np.array(origins)
+    base = closes[idx - 1]
+    metrics = {'folds': len(origins), 'wall_seconds': round(wall, 3)}
+    for h in HORIZONS:
+        actual = closes[idx + h - 1]
+        predicted = paths[:, h - 1]
+        metrics[f'mape_{h}d'] = round(float(np.mean(np.abs(predicted - actual) / actual) * 100), 3)
+        metrics[f'directional_accuracy_{h}d'] = round(
+            float(np.mean(np.sign(predicted - base) == np.sign(actual - base))), 3)
+    return metrics
+
+
+def _run_job(job):
+    model_name, ticker, closes, num_folds, step = job
+    try:
+        return model_name, ticker, walk_forward(model_name, closes, num_folds, step), None
+    except Exception as e:
+        return model_name, ticker, None, str(e)
+
+
+def run_backtest(series, models=None, num_folds=NUM_FOLDS, step=FOLD_STEP, max_workers=None):
+    """
+    series: {ticker: 1-D array of closes}
+    Runs every (model, ticker) pair in a process pool and aggregates per model.
+    """
+    models = models or list(BACKTEST_FORECASTERS)
+    unknown = [m for m in models if m not in BACKTEST_FORECASTERS]
+    if unknown:
+        raise ValueError(f"Unknown models: {unknown}. Available: {list(BACKTEST_FORECASTERS)}")
+
+    jobs = [(m, t, np.asarray(c, dtype=float), num_folds, step) for m in models for t, c in series.items()]
+    per_ticker, errors = {m: {} for m in models}, []
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for model_name, ticker, metrics, error in pool.map(_run_job, jobs):
+            if error:
+                errors.append({'model': model_name, 'ticker': ticker, 'error': error})
+            elif metrics:
+                per_ticker[model_name][ticker] = metrics
+
+    summary = {}
+    for model_name, results in per_ticker.items():
+        if not results:
+            continue
+        rows = list(results.values())
+        summary[model_name] = {'tickers': len(rows), 'wall_seconds': round(sum(r['wall_seconds'] for r in rows), 3)}
+        for h in HORIZONS:
+            for key in (f'mape_{h}d', f'directional_accuracy_{h}d'):
+                summary[model_name][key] = round(float(np.mean([r[key] for r in rows])), 3)
+
+    return {
+        'summary': summary,
+        'per_ticker': per_ticker,
+        'errors': errors,
+        'elapsed_seconds': round(time.perf_counter() - started, 3),
+    }
@@ -1,10 +1,12 @@
 from flask import Flask, request
 from flask_restful import Api, Resource
 from flask_cors import CORS 
-import yfinance as yf
 import pandas as pd
 import traceback
 
+from applications.price_store import get_history
+from applications.symbol_master import canonical_symbol
+
 # -------------------------------
 # CONFIG
 # -------------------------------
@@ -18,19 +20,16 @@ class TechnicalAnalyzer:
     """Fetches stock data, calculates RSI & OBV, returns simple signal."""
 
     def __init__(self, ticker):
-        self.ticker = ticker.upper()
+        self.ticker = canonical_symbol(ticker)
         self.data = None
 
     def fetch_data(self):
-        # Fetch data for 1 year
-        df = yf.download(self.ticker, period="1y", progress=False, auto_adjust=False)
-        if df.empty:
+        # Fetch data for 1 year (adjusted bars from the shared price store)
+        start = (pd.Timestamp.today().normalize() - pd.DateOffset(years=1)).strftime('%Y-%m-%d')
+        df = get_history([self.ticker], start).get(self.ticker)
+        if df is None or df.empty:
             raise ValueError(f"Could not fetch data for ticker: {self.ticker}")
 
-        # Flatten multi-index columns if present
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
-
         # Keep only necessary columns
         if 'Close' not in df.columns or 'Volume' not in df.columns:
             raise ValueError(f"'Close' or 'Volume' column missing for {self.ticker}")
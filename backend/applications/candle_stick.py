@@ -1,13 +1,16 @@
 from flask import jsonify
 from flask_restful import Resource
-import yfinance as yf
 import pandas as pd
 import numpy as np
 import datetime as dt
 
+from applications.price_store import get_history
+from applications.symbol_master import canonical_symbol
+
 class CandleData(Resource):
     def get(self, symbol):
         try:
+            symbol = canonical_symbol(symbol)
             print(f"\n=== BACKEND: Fetching {symbol} ===")
             
             # ---- Date Range ----
@@ -15,7 +18,8 @@ class CandleData(Resource):
             start = end - dt.timedelta(days=60)
             
             # ---- Fetch Data ----
-            df = yf.download(symbol, start=start, end=end, progress=False)
+            frames = get_history([symbol], start.isoformat())
+            df = frames[symbol].loc[frames[symbol].index < pd.Timestamp(end)].copy() if symbol in frames else pd.DataFrame()
             
             print(f"Downloaded shape: {df.shape}")
 
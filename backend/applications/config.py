@@ -15,10 +15,54 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f"sqlite:///{DATABASE_PATH}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Applied to every new SQLite connection (see applications/db_setup.py)
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',          # readers no longer block on a writer
+        'synchronous': 'NORMAL',        # fsync at checkpoints only; safe with WAL
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,       # negative = KiB, i.e. 64 MiB page cache
+        'busy_timeout': 5000,           # ms to wait for a lock instead of failing
+    }
+
+    # Per-request SQL instrumentation (see applications/query_stats.py)
+    # Off unless explicitly enabled; also gates /debug/cache. Both /debug endpoints require the admin role
+    QUERY_STATS_ENABLED = os.getenv('QUERY_STATS_ENABLED', '').lower() in ('1', 'true', 'yes')
+    QUERY_STATS_HEADER = os.getenv('QUERY_STATS_HEADER', '').lower() in ('1', 'true', 'yes')  # X-DB-Queries
+    QUERY_BUDGET = 20                   # statements per request before [QUERY_BUDGET] fires
+    QUERY_REPEAT_LIMIT = 5              # same statement shape this often in one request -> [N+1]
+
+    # Persisted forecasting models (weights, scaler, metadata per ticker)
+    MODEL_REGISTRY_DIR = os.path.join(instance_folder, 'models')
+
+    # Exchange listing files for the local symbol master (see update_symbols.py)
+    SYMBOL_MASTER_FILES = [
+        os.path.join(instance_folder, 'EQUITY_L.csv'),   # NSE
+        os.path.join(instance_folder, 'Equity.csv'),     # BSE
+    ]
+
+    # Optional local LSTM inference server ("host:port"); unset = predict in-process
+    INFERENCE_SERVER_ADDRESS = os.getenv('INFERENCE_SERVER_ADDRESS')
+    # Shared secret authenticating that channel (required; no default)
+    INFERENCE_SERVER_KEY = os.getenv('INFERENCE_SERVER_KEY')
+
     # Security settings
     SECRET_KEY = os.getenv('SECRET_KEY', 'supersecretkey')
     SECURITY_PASSWORD_SALT = 'financeapp_salt'
 
-    # Caching (in-memory for simplicity)
-    CACHE_TYPE = 'SimpleCache'
+    # Cache shared by all worker processes on the host (see applications/shared_cache.py):
+    # 'sqlite' = one on-disk store for every worker, 'memory' = per-process only
+    SHARED_CACHE_BACKEND = os.getenv('SHARED_CACHE_BACKEND', 'sqlite').lower()
+    SHARED_CACHE_PATH = os.path.join(instance_folder, 'shared_cache.sqlite3')
+    SHARED_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+    # LLM answers cached per endpoint, in seconds (0 = never); see applications/llm_cache.py
+    LLM_CACHE_TTLS = {
+        'chat': 0,                      # conversational: always ask the model
+        'analyze_stock': 6 * 3600,
+        'portfolio_advice': 24 * 3600,  # also dropped whenever the user's holdings change
+    }
+
+    # Response caching; per-endpoint TTLs live in response_cache.POLICIES
+    CACHE_TYPE = 'applications.shared_cache.SQLiteCache' if SHARED_CACHE_BACKEND == 'sqlite' else 'SimpleCache'
     CACHE_DEFAULT_TIMEOUT = 30
+    CACHE_THRESHOLD = 2000              # SimpleCache entries before it starts evicting
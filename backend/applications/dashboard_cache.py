@@ -0,0 +1,132 @@
+# -- coding: utf-8 --
+"""
+🧊 Materialized portfolio dashboards
+→ Everything derived from the holdings alone (lots, positions, allocation) is built once per user
+→ Entries are tagged with the user's generation in the shared cache; Add / Update / Delete
+  call on_holdings_changed(user_id) to bump it, so every worker drops its copy
+  (and the user's cached AI portfolio advice goes too)
+→ Each load only re-marks values against cached quotes with a few vector operations
+"""
+
+import threading
+from collections import namedtuple
+
+import numpy as np
+from cachetools import LRUCache
+
+from applications import llm_cache
+from applications.models import PortfolioHolding
+from applications.portfolio_queries import consolidated_positions, lot_rows
+from applications.price_store import to_yf_symbol
+from applications.shared_cache import bump_generation, generation
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+MAX_MATERIALIZED_USERS = 1024
+
+Materialized = namedtuple('Materialized', [
+    'symbols',        # yfinance symbol per position, in position order
+    'lots',           # per-lot dicts without price-dependent fields
+    'positions',      # per-position dicts without price-dependent fields
+    'lot_position',   # position index of each lot
+    'lot_quantity', 'lot_invested', 'lot_cost_price',
+    'position_quantity', 'position_invested',
+])
+
+_materialized = LRUCache(maxsize=MAX_MATERIALIZED_USERS)   # user_id -> (generation, entry)
+_lock = threading.Lock()
+
+
+def _generation(user_id):
+    return generation(f"dashboard:{int(user_id)}")
+
+
+def on_holdings_changed(user_id):
+    """Call after any committed write to a user's holdings."""
+    bump_generation(f"dashboard:{int(user_id)}")
+    with _lock:
+        _materialized.pop(int(user_id), None)
+    llm_cache.invalidate('portfolio_advice', llm_cache.user_scope(user_id))
+
+
+def _materialize(user_id):
+    positions = consolidated_positions(user_id)
+    if not positions:
+        return None
+    symbols = [to_yf_symbol(p.symbol) for p in positions]
+    index = {p.symbol: i for i, p in enumerate(positions)}
+    lots = lot_rows(user_id)
+
+    return Materialized(
+        symbols=symbols,
+        lots=[PortfolioHolding.row_to_dict(lot) for lot in lots],
+        positions=[{
+            'symbol': p.symbol,
+            'quantity': p.quantity,
+            'avg_cost': round(p.avg_cost, 2) if p.avg_cost is not None else None,
+            'lots': p.lots,
+            'first_purchase': p.first_purchase.isoformat() if p.first_purchase else None,
+            'last_purchase': p.last_purchase.isoformat() if p.last_purchase else None,
+            'total_invested': round(p.invested, 2),
+        } for p in positions],
+        lot_position=np.array([index[lot.symbol] for lot in lots], dtype=int),
+        lot_quantity=np.array([lot.quantity for lot in lots], dtype=float),
+        lot_invested=np.array([round(lot.quantity * lot.purchase_price, 2) for lot in lots], dtype=float),
+        lot_cost_price=np.array([lot.purchase_price for lot in lots], dtype=float),
+        position_quantity=np.array([p.quantity for p in positions], dtype=float),
+        position_invested=np.array([round(p.invested, 2) for p in positions], dtype=float),
+    )
+
+
+def get_materialized(user_id):
+    """
+    The user's materialized dashboard, built on first use. None if they hold nothing.
+    A build that overlapped a holdings write is returned but not kept.
+    """
+    user_id = int(user_id)
+    current = _generation(user_id)
+    with _lock:
+        cached = _materialized.get(user_id)
+    if cached is not None and cached[0] == current:
+        return cached[1]
+    entry = _materialize(user_id)
+    if _generation(user_id) == current:
+        with _lock:
+            _materialized[user_id] = (current, entry)
+    return entry
+
+
+def _gain_percent(gain, invested):
+    return np.round(np.divide(gain * 100, invested, out=np.zeros_like(gain), where=invested != 0), 2)
+
+
+def mark_to_market(entry, prices):
+    """
+    Per-lot and per-position dicts valued at `prices` ({yf_symbol: close}).
+    Unpriced lots are carried at cost, exactly as the un-materialized dashboard did.
+    """
+    price = np.array([prices.get(s, np.nan) for s in entry.symbols], dtype=float)
+    priced = ~np.isnan(price)
+
+    lot_price = np.where(priced[entry.lot_position], price[entry.lot_position], entry.lot_cost_price)
+    lot_value = np.round(entry.lot_quantity * lot_price, 2)
+    lot_gain = np.round(lot_value - entry.lot_invested, 2)
+    lot_gain_pct = _gain_percent(lot_gain, entry.lot_invested)
+
+    position_value = np.where(priced, np.round(entry.position_quantity * np.nan_to_num(price), 2),
+                              entry.position_invested)
+    position_gain = np.round(position_value - entry.position_invested, 2)
+    position_gain_pct = _gain_percent(position_gain, entry.position_invested)
+
+    lots = [
+        dict(base, current_price=float(p), current_value=float(v), gain_loss=float(g), gain_loss_percent=float(pct))
+        for base, p, v, g, pct in zip(entry.lots, lot_price, lot_value, lot_gain, lot_gain_pct)
+    ]
+    positions = [
+        dict(base, current_price=float(p) if ok else None, current_value=float(v),
+             gain_loss=float(g), gain_loss_percent=float(pct))
+        for base, p, ok, v, g, pct in zip(entry.positions, price, priced, position_value, position_gain,
+                                           position_gain_pct)
+    ]
+    return lots, positions
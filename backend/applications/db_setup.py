@@ -0,0 +1,49 @@
+# -- coding: utf-8 --
+"""
+⚙️ Engine configuration for the SQLite database
+→ Applies Config.SQLITE_PRAGMAS (WAL, synchronous, mmap, cache, busy timeout) on every
+  new pooled connection, for the Flask-SQLAlchemy engine and standalone engines alike
+→ ensure_indexes(): CREATE INDEX IF NOT EXISTS for every index declared on the models,
+  so databases created before an index was added pick it up
+"""
+
+from sqlalchemy import event, inspect
+from sqlalchemy.schema import CreateIndex
+
+from applications.config import Config
+from applications.database import db
+
+
+def _apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in Config.SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def configure_engine(engine):
+    """Register the connect-time pragmas on a SQLite engine (idempotent)."""
+    if engine.dialect.name == 'sqlite' and not event.contains(engine, 'connect', _apply_pragmas):
+        event.listen(engine, 'connect', _apply_pragmas)
+    return engine
+
+
+def ensure_indexes(engine):
+    """Create any missing model index on existing tables; returns the names created."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {ix['name'] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in present:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+                    created.append(index.name)
+        if created:
+            conn.exec_driver_sql('ANALYZE')   # refresh planner statistics for the new indexes
+    return created
@@ -0,0 +1,255 @@
+# -- coding: utf-8 --
+"""
+🧠 Local LSTM inference server
+→ One process holds TensorFlow and every loaded model, instead of one copy per web worker
+→ Requests arriving within BATCH_WINDOW are micro-batched into a single fused model call
+→ Missing or stale models are trained on a separate thread; their tickers are answered
+  as busy meanwhile, so warm tickers never wait behind a training run
+→ Web workers talk to it over a local authenticated socket (multiprocessing.connection);
+  the channel pickles its messages, so it only runs with a dedicated INFERENCE_SERVER_KEY
+
+Run next to the web workers (from backend/):
+    INFERENCE_SERVER_ADDRESS=127.0.0.1:6001 INFERENCE_SERVER_KEY=<random secret> python -m applications.inference_server
+and start the Flask app with the same INFERENCE_SERVER_ADDRESS / INFERENCE_SERVER_KEY so /predict uses it.
+"""
+
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Client, Listener
+
+from applications.config import Config
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+BATCH_WINDOW = 0.010          # seconds to wait for more requests after the first one
+MAX_BATCH_REQUESTS = 64
+CLIENT_TIMEOUT = 120          # seconds a web worker waits for a reply
+MIN_KEY_LENGTH = 16
+TRAIN_WORKERS = 1             # models trained concurrently, off the batch thread
+TRAIN_RETRY_AFTER = 60        # seconds a ticker whose training failed answers that error
+BUSY_MESSAGE = "Model is being prepared, retry shortly"
+
+
+class InferenceBusy(Exception):
+    """The server accepted the request but did not answer in time (typically still training)."""
+
+
+def parse_address(address):
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def _authkey():
+    key = Config.INFERENCE_SERVER_KEY or ''
+    if len(key) < MIN_KEY_LENGTH:
+        raise RuntimeError(f"INFERENCE_SERVER_KEY must be set to a secret of at least {MIN_KEY_LENGTH} characters")
+    return key.encode('utf-8')
+
+
+# -------------------------------
+# CLIENT (used by the web workers)
+# -------------------------------
+def predict_remote(address, tickers, refresh=False, mc_samples=0, confidence=0.95):
+    """
+    Ask the inference server for LSTM forecasts. Returns (forecasts, errors) like
+    stock_7_14.forecast_many. Raises ConnectionError if the server is unreachable and
+    InferenceBusy if it is reachable but has not answered within CLIENT_TIMEOUT, or is
+    still training the model of every requested ticker. Tickers still training in a
+    multi-ticker request are reported in errors.
+    """
+    try:
+        conn = Client(parse_address(address), authkey=_authkey())
+    except OSError as e:
+        raise ConnectionError(f"Inference server unavailable at {address}: {e}") from e
+
+    with conn:
+        conn.send({
+            'op': 'predict',
+            'tickers': list(tickers),
+            'refresh': bool(refresh),
+            'mc_samples': int(mc_samples),
+            'confidence': float(confidence),
+        })
+        if not conn.poll(CLIENT_TIMEOUT):
+            raise InferenceBusy(f"Inference server did not answer within {CLIENT_TIMEOUT}s")
+        reply = conn.recv()
+
+    if 'error' in reply:
+        raise RuntimeError(reply['error'])
+    busy = reply.get('busy', [])
+    if busy and not reply['forecasts'] and not reply['errors']:
+        raise InferenceBusy(f"Inference server is preparing models for {', '.join(busy)}")
+    errors = dict(reply['errors'], **{t: BUSY_MESSAGE for t in busy})
+    return reply['forecasts'], errors
+
+
+# -------------------------------
+# SERVER
+# -------------------------------
+class _Pending:
+    """A request waiting for its slice of a batch result."""
+
+    def __init__(self, message):
+        self.message = message
+        self.reply = None
+        self.done = threading.Event()
+
+
+class InferenceServer:
+    def __init__(self, address):
+        self.address = parse_address(address)
+        self.pending = queue.Queue()
+        self.trainer = ThreadPoolExecutor(max_workers=TRAIN_WORKERS, thread_name_prefix='train')
+        self.training = set()           # tickers queued or being trained
+        self.failed = {}                # ticker -> (monotonic time, error) of the last failed training
+        self.training_lock = threading.Lock()
+        self.stats = {'requests': 0, 'batches': 0, 'groups': 0, 'trainings': 0, 'started_at': time.time()}
+
+    # --- connection handling ---
+    def serve_forever(self):
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        with Listener(self.address, authkey=_authkey()) as listener:
+            print(f"[INFERENCE_SERVER] Listening on {self.address[0]}:{self.address[1]}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    print(f"[INFERENCE_SERVER] Rejected connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            try:
+                message = conn.recv()
+            except EOFError:
+                return
+            if message.get('op') == 'ping':
+                reply = dict(self.stats)
+            else:
+                item = _Pending(message)
+                self.pending.put(item)
+                item.done.wait()
+                reply = item.reply
+            try:
+                conn.send(reply)
+            except OSError as e:
+                # The web worker gave up (CLIENT_TIMEOUT) and closed its end
+                print(f"[INFERENCE_SERVER] Client went away before the reply: {e}")
+
+    # --- micro-batching ---
+    def _collect(self):
+        batch = [self.pending.get()]
+        deadline = time.monotonic() + BATCH_WINDOW
+        while len(batch) < MAX_BATCH_REQUESTS:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.pending.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _batch_loop(self):
+        # All TensorFlow work happens on this one thread
+        while True:
+            batch = self._collect()
+            groups = {}
+            for item in batch:
+                m = item.message
+                key = (m.get('refresh', False), m.get('mc_samples', 0), m.get('confidence', 0.95))
+                groups.setdefault(key, []).append(item)
+
+            for (refresh, mc_samples, confidence), items in groups.items():
+                self._run_group(items, refresh, mc_samples, confidence)
+            self.stats['batches'] += 1
+            self.stats['requests'] += len(batch)
+
+    def _run_group(self, items, refresh, mc_samples, confidence):
+        from applications.price_store import get_history
+        from applications.stock_7_14 import START_DATE, forecast_ready, resolve_models
+
+        tickers = list(dict.fromkeys(t for item in items for t in item.message['tickers']))
+        try:
+            frames = get_history(tickers, START_DATE)
+            ready, errors, cold = resolve_models(frames, train=False)
+            busy = self._train_later(cold, frames, refresh, errors)
+            if refresh:
+                # Warm tickers answer with the current model while the forced retrain runs
+                self._train_later([r[0] for r in ready], frames, refresh, {})
+            try:
+                forecasts = forecast_ready(ready, mc_samples=mc_samples, confidence=confidence)
+            except Exception as e:
+                print(f"[INFERENCE_SERVER] Forecast failed for {[r[0] for r in ready]}: {e}")
+                forecasts = {}
+                errors.update({r[0]: f"Prediction failed: {str(e)}" for r in ready})
+            self.stats['groups'] += 1
+            for t in tickers:
+                if t not in frames:
+                    errors[t] = "Ticker not found or has no data"
+            for item in items:
+                wanted = item.message['tickers']
+                item.reply = {
+                    'forecasts': {t: forecasts[t] for t in wanted if t in forecasts},
+                    'errors': {t: errors[t] for t in wanted if t in errors},
+                    'busy': [t for t in wanted if t in busy],
+                    'batch_size': len(items),
+                }
+        except Exception as e:
+            print(f"[INFERENCE_SERVER] Batch failed: {e}")
+            for item in items:
+                item.reply = {'error': str(e)}
+        finally:
+            for item in items:
+                item.done.set()
+
+    # --- training (off the batch thread) ---
+    def _train_later(self, tickers, frames, force, errors):
+        """Queue training for `tickers`; returns those to answer as busy."""
+        busy = set()
+        now = time.monotonic()
+        with self.training_lock:
+            for ticker in tickers:
+                failed_at, error = self.failed.get(ticker, (None, None))
+                if failed_at is not None and now - failed_at < TRAIN_RETRY_AFTER:
+                    errors[ticker] = f"Model unavailable: {error}"
+                    continue
+                busy.add(ticker)
+                if ticker not in self.training:
+                    self.training.add(ticker)
+                    self.trainer.submit(self._train, ticker, frames[ticker], force)
+        return busy
+
+    def _train(self, ticker, df, force):
+        from applications import model_registry
+        from applications.stock_7_14 import MODEL_VERSION, fine_tune_model, prepare_closes, train_model
+
+        try:
+            closes, _ = prepare_closes(df)
+            _, source = model_registry.get_or_train(ticker, closes, train_model, model_version=MODEL_VERSION,
+                                                    force=force, update_fn=fine_tune_model)
+            print(f"[INFERENCE_SERVER] {ticker} ready ({source})")
+            with self.training_lock:
+                self.failed.pop(ticker, None)
+                self.stats['trainings'] += 1
+        except Exception as e:
+            print(f"[INFERENCE_SERVER] Training {ticker} failed: {e}")
+            with self.training_lock:
+                self.failed[ticker] = (time.monotonic(), str(e))
+        finally:
+            with self.training_lock:
+                self.training.discard(ticker)
+
+
+if __name__ == '__main__':
+    try:
+        _authkey()
+    except RuntimeError as e:
+        sys.exit(f"[INFERENCE_SERVER] Refusing to start: {e}")
+    address = Config.INFERENCE_SERVER_ADDRESS or '127.0.0.1:6001'
+    InferenceServer(address).serve_forever()
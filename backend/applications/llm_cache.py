@@ -0,0 +1,70 @@
+# -- coding: utf-8 --
+"""
+💬 LLM response cache (on the cross-process shared cache)
+→ Key = SHA-256 of (model name, system instruction, prompt), namespaced per endpoint
+→ TTL per endpoint from Config.LLM_CACHE_TTLS (0 = never cached)
+→ Scoped entries (e.g. a user's portfolio advice) carry a generation number;
+  invalidate() bumps it so every earlier answer for that scope is unreachable
+  (an evicted counter restarts at a fresh value, never at one used before)
+→ A hit returns the stored text with the generated_at of the original answer
+"""
+
+import hashlib
+import json
+from datetime import datetime
+
+from applications.config import Config
+from applications.shared_cache import bump_generation, generation, get_shared_cache
+
+
+def prompt_digest(model_name, system_instruction, prompt):
+    payload = json.dumps([model_name, system_instruction or '', prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def user_scope(user_id):
+    return f"user:{int(user_id)}"
+
+
+def _generation_name(endpoint, scope):
+    return f"llm:{endpoint}:{scope}"
+
+
+def _entry_key(endpoint, digest, scope):
+    if scope is None:
+        return f"llm:{endpoint}:{digest}"
+    return f"llm:{endpoint}:{scope}@{generation(_generation_name(endpoint, scope))}:{digest}"
+
+
+def lookup(endpoint, model_name, prompt, system_instruction=None, scope=None):
+    """(key, entry): key is None when the endpoint is not cached; entry is None on a miss."""
+    if Config.LLM_CACHE_TTLS.get(endpoint, 0) <= 0:
+        return None, None
+    key = _entry_key(endpoint, prompt_digest(model_name, system_instruction, prompt), scope)
+    return key, get_shared_cache().get(key)
+
+
+def store(endpoint, key, text):
+    """Remember a freshly generated answer under `key`; returns its generated_at."""
+    generated_at = datetime.now().isoformat()
+    if key is not None and text:
+        get_shared_cache().set(key, {'text': text, 'generated_at': generated_at},
+                               timeout=Config.LLM_CACHE_TTLS[endpoint])
+    return generated_at
+
+
+def cached_generate(endpoint, model_name, prompt, generate, system_instruction=None, scope=None):
+    """
+    Return (text, generated_at, hit). `generate()` produces the text on a miss;
+    empty answers are returned but not stored.
+    """
+    key, entry = lookup(endpoint, model_name, prompt, system_instruction, scope)
+    if entry is not None:
+        return entry['text'], entry['generated_at'], True
+    text = generate()
+    return text, store(endpoint, key, text), False
+
+
+def invalidate(endpoint, scope):
+    """Forget every cached answer of `endpoint` for `scope`."""
+    bump_generation(_generation_name(endpoint, scope))
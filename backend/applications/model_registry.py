@@ -0,0 +1,279 @@
+"""
+🗄️ Per-ticker forecasting model registry
+→ Persists trained Keras weights, the fitted MinMaxScaler and training metadata
+→ Serves predictions from the stored model (memory first, then disk)
+→ Retrains only when the model is too old or the price data has drifted
+→ Stale models are warm-started on new bars when possible, with a full retrain fallback
+→ Training holds a cross-process lock, so one worker trains while the others wait and load
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+import joblib
+
+from applications.config import Config
+from applications.shared_cache import shared_lock
+from applications.symbol_master import canonical_symbol
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+REGISTRY_DIR = Config.MODEL_REGISTRY_DIR
+MAX_MODEL_AGE = timedelta(hours=24)   # retrain at most once a day per ticker
+DRIFT_THRESHOLD = 0.15                # relative move of last close vs. training-time close
+RANGE_TOLERANCE = 0.05                # allowed overshoot of the scaler's fitted price range
+MAX_FINE_TUNES = 30                   # incremental updates allowed before a full retrain
+MODEL_FILE = 'model.keras'
+SCALER_FILE = 'scaler.joblib'
+META_FILE = 'meta.json'
+TRAIN_LOCK_TTL = 30 * 60              # a crashed trainer releases the lock after this long
+TRAIN_LOCK_WAIT = 10 * 60             # then train anyway rather than fail the request
+
+
+class ModelEntry:
+    """A loaded model with its scaler and metadata."""
+
+    def __init__(self, model, scaler, meta):
+        self.model = model
+        self.scaler = scaler
+        self.meta = meta
+
+
+_loaded = {}                 # ticker -> ModelEntry
+_ticker_locks = {}
+_registry_lock = threading.Lock()
+
+
+# -------------------------------
+# STORAGE
+# -------------------------------
+def _ticker_dir(ticker):
+    safe = re.sub(r'[^A-Za-z0-9._^-]', '_', ticker.upper())
+    return os.path.join(REGISTRY_DIR, safe)
+
+
+def _ticker_lock(ticker):
+    with _registry_lock:
+        return _ticker_locks.setdefault(ticker, threading.Lock())
+
+
+def save(ticker, model, scaler, meta):
+    """Write model, scaler and metadata; each file is replaced atomically."""
+    path = _ticker_dir(ticker)
+    os.makedirs(path, exist_ok=True)
+
+    tmp_model = os.path.join(path, f'.tmp-{os.getpid()}-{MODEL_FILE}')
+    model.save(tmp_model)
+    os.replace(tmp_model, os.path.join(path, MODEL_FILE))
+
+    tmp_scaler = os.path.join(path, f'.tmp-{os.getpid()}-{SCALER_FILE}')
+    joblib.dump(scaler, tmp_scaler)
+    os.replace(tmp_scaler, os.path.join(path, SCALER_FILE))
+
+    # Metadata last: its presence marks a complete entry
+    tmp_meta = os.path.join(path, f'.tmp-{os.getpid()}-{META_FILE}')
+    with open(tmp_meta, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_meta, os.path.join(path, META_FILE))
+
+    entry = ModelEntry(model, scaler, meta)
+    with _registry_lock:
+        _loaded[ticker] = entry
+    return entry
+
+
+def save_meta(ticker, entry, meta):
+    """Re-stamp a stored model's metadata without rewriting its weights or scaler."""
+    path = _ticker_dir(ticker)
+    tmp_meta = os.path.join(path, f'.tmp-{os.getpid()}-{META_FILE}')
+    with open(tmp_meta, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_meta, os.path.join(path, META_FILE))
+
+    entry = ModelEntry(entry.model, entry.scaler, meta)
+    with _registry_lock:
+        _loaded[ticker] = entry
+    return entry
+
+
+def load(ticker):
+    """Return the ModelEntry for `ticker` from memory or disk, or None."""
+    with _registry_lock:
+        entry = _loaded.get(ticker)
+    path = _ticker_dir(ticker)
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        return entry
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+
+    # Another worker may have retrained since we loaded it
+    if entry is not None and entry.meta.get('trained_at') == meta.get('trained_at'):
+        return entry
+
+    try:
+        from tensorflow.keras.models import load_model  # deferred: TensorFlow is heavy
+
+        model = load_model(os.path.join(path, MODEL_FILE), compile=True)
+        scaler = joblib.load(os.path.join(path, SCALER_FILE))
+    except Exception as e:
+        print(f"[MODEL_REGISTRY] Could not load stored model for {ticker}: {e}")
+        return None
+
+    entry = ModelEntry(model, scaler, meta)
+    with _registry_lock:
+        _loaded[ticker] = entry
+    return entry
+
+
+def list_models():
+    """Metadata of every stored model."""
+    if not os.path.isdir(REGISTRY_DIR):
+        return []
+    metas = []
+    for name in sorted(os.listdir(REGISTRY_DIR)):
+        meta_path = os.path.join(REGISTRY_DIR, name, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                metas.append(json.load(f))
+    return metas
+
+
+# -------------------------------
+# RETRAIN POLICY
+# -------------------------------
+def stale_reason(meta, closes, model_version=None, max_age=MAX_MODEL_AGE):
+    """Why a stored model should be retrained on `closes` (1-D array), or None if still valid."""
+    if model_version is not None and meta.get('model_version') != model_version:
+        return 'model_version_changed'
+
+    trained_at = datetime.fromisoformat(meta['trained_at'])
+    if datetime.utcnow() - trained_at > max_age:
+        return 'expired'
+
+    last_close = float(closes[-1])
+    if abs(last_close / meta['last_close'] - 1) > DRIFT_THRESHOLD:
+        return 'price_drift'
+
+    lo, hi = meta['scaler_min'], meta['scaler_max']
+    span = hi - lo
+    if last_close < lo - RANGE_TOLERANCE * span or last_close > hi + RANGE_TOLERANCE * span:
+        return 'out_of_range'
+
+    return None
+
+
+def _can_fine_tune(entry, reason):
+    """
+    Version changes need a fresh architecture and prices outside the scaler's range a
+    fresh scaler; expired or drifted models can warm-start.
+    """
+    return (
+        entry is not None
+        and reason in ('expired', 'price_drift')
+        and entry.meta.get('fine_tunes_since_full', 0) < MAX_FINE_TUNES
+    )
+
+
+def get_or_train(ticker, closes, train_fn, model_version=None, force=False,
+                 update_fn=None, max_age=MAX_MODEL_AGE):
+    """
+    Return (ModelEntry, source) for `ticker`.
+    source is 'memory'/'disk' when served from the registry, otherwise how it was rebuilt.
+    `train_fn(closes)` must return (model, scaler, meta); it runs at most once per ticker
+    at a time across all workers, so concurrent cold-start requests wait for the first
+    training to finish. With force=True, callers that were waiting while another
+    caller's forced rebuild finished take that model instead of retraining again.
+    `update_fn(entry, closes)` optionally warm-starts a stale model and returns
+    (model, scaler, meta), or None when a full retrain is needed. Returning the
+    entry's own model means nothing was learned: only the metadata is re-stamped.
+    """
+    ticker = canonical_symbol(ticker)
+    # Noted before any waiting: a different value afterwards means someone rebuilt meanwhile
+    trained_before = _stored_trained_at(ticker) if force else None
+    with _ticker_lock(ticker):
+        entry, reason, in_memory = _current(ticker, closes, model_version, force, max_age)
+        if reason is None:
+            return entry, 'memory' if in_memory else 'disk'
+        # Only rebuilds take the cross-process lock; afterwards re-check, since
+        # another worker may have saved a fresh model while we waited
+        with shared_lock(f"train:{ticker}", TRAIN_LOCK_TTL, TRAIN_LOCK_WAIT) as locked:
+            if not locked:
+                print(f"[MODEL_REGISTRY] Gave up waiting for another worker to train {ticker}")
+            rebuilt = force and _stored_trained_at(ticker) != trained_before
+            entry, reason, in_memory = _current(ticker, closes, model_version, force and not rebuilt, max_age)
+            if reason is None:
+                return entry, 'memory' if in_memory else 'disk'
+            return _rebuild(ticker, closes, entry, reason, train_fn, update_fn, model_version)
+
+
+def get_current(ticker, closes, model_version=None, max_age=MAX_MODEL_AGE):
+    """The stored ModelEntry if it is still valid for `closes`, else None. Never trains."""
+    ticker = canonical_symbol(ticker)
+    entry, reason, _ = _current(ticker, closes, model_version, False, max_age)
+    return entry if reason is None else None
+
+
+def _stored_trained_at(ticker):
+    """trained_at of the model on disk (without loading it), or None."""
+    meta_path = os.path.join(_ticker_dir(ticker), META_FILE)
+    try:
+        with open(meta_path) as f:
+            return json.load(f).get('trained_at')
+    except (OSError, ValueError):
+        return None
+
+
+def _current(ticker, closes, model_version, force, max_age):
+    """(entry, stale reason or None, was_in_memory) for the stored model."""
+    with _registry_lock:
+        in_memory = ticker in _loaded
+    entry = None if force else load(ticker)
+    if entry is None:
+        return None, 'forced' if force else 'cold_start', in_memory
+    return entry, stale_reason(entry.meta, closes, model_version, max_age), in_memory
+
+
+def _rebuild(ticker, closes, entry, reason, train_fn, update_fn, model_version):
+    started = time.perf_counter()
+    updated = None
+    if update_fn is not None and _can_fine_tune(entry, reason):
+        print(f"[MODEL_REGISTRY] Fine-tuning {ticker} ({reason})")
+        updated = update_fn(entry, closes)
+        if updated is None:
+            reason = 'degraded'
+
+    revalidated = updated is not None and updated[0] is entry.model
+    if revalidated:
+        model, scaler, meta = updated
+        source = f'revalidated:{reason}'
+    elif updated is not None:
+        model, scaler, meta = updated
+        meta['fine_tunes_since_full'] = entry.meta.get('fine_tunes_since_full', 0) + 1
+        source = f'fine_tune:{reason}'
+    else:
+        print(f"[MODEL_REGISTRY] Training {ticker} ({reason})")
+        model, scaler, meta = train_fn(closes)
+        meta['fine_tunes_since_full'] = 0
+        meta['baseline_val_loss'] = meta.get('val_loss')
+        source = reason
+
+    meta.update({
+        'ticker': ticker,
+        'model_version': model_version,
+        'trained_at': datetime.utcnow().isoformat(),
+        'train_seconds': round(time.perf_counter() - started, 2),
+        'retrain_reason': source,
+        'last_close': float(closes[-1]),
+        'scaler_min': float(scaler.data_min_[0]),
+        'scaler_max': float(scaler.data_max_[0]),
+    })
+    if revalidated:
+        return save_meta(ticker, entry, meta), source
+    return save(ticker, model, scaler, meta), source
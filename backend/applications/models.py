@@ -7,7 +7,8 @@ from applications.database import db
 # Association Table for User-Role Many-to-Many relationship (Required by Flask-Security)
 user_roles = db.Table('user_roles',
     db.Column('user_id', db.Integer(), db.ForeignKey('user.id')),
-    db.Column('role_id', db.Integer(), db.ForeignKey('role.id'))
+    db.Column('role_id', db.Integer(), db.ForeignKey('role.id')),
+    db.Index('_user_roles_user_idx', 'user_id'),
 )
 
 class Role(db.Model, RoleMixin):
@@ -70,6 +71,7 @@ class Watchlist(db.Model):
     added_at = db.Column(db.DateTime, default=datetime.datetime.utcnow) # Track when added
 
     # Ensure a specific user cannot add the same ticker multiple times
+    # (its index leads with user_id, so it also serves per-user lookups)
     __table_args__ = (db.UniqueConstraint('user_id', 'ticker', name='_user_ticker_uc'),)
 
     def to_dict(self):
@@ -104,30 +106,37 @@ class PortfolioHolding(db.Model):
 
     # Allow multiple purchases of same stock (no unique constraint on symbol)
     # Each transaction is a separate record
+    # Every read filters on user_id; symbol second lets per-symbol grouping use the index
+    __table_args__ = (db.Index('_holding_user_symbol_idx', 'user_id', 'symbol'),)
 
     def to_dict(self, current_price=None):
         """
         Convert to dictionary with calculated values.
         current_price: Current market price per share (fetched from yfinance)
         """
-        total_invested = round(self.quantity * self.purchase_price, 2)
-        current_value = round(self.quantity * current_price, 2) if current_price else total_invested
+        return PortfolioHolding.row_to_dict(self, current_price)
+
+    @staticmethod
+    def row_to_dict(lot, current_price=None):
+        """to_dict for anything with the lot columns, e.g. a portfolio_queries.lot_rows row."""
+        total_invested = round(lot.quantity * lot.purchase_price, 2)
+        current_value = round(lot.quantity * current_price, 2) if current_price else total_invested
         gain_loss = round(current_value - total_invested, 2)
         gain_loss_percent = round((gain_loss / total_invested * 100), 2) if total_invested != 0 else 0
 
         return {
-            'id': self.id,
-            'symbol': self.symbol,
-            'quantity': self.quantity,
-            'purchase_price': self.purchase_price,
-            'purchase_date': self.purchase_date.isoformat() if self.purchase_date else None,
-            'notes': self.notes,
+            'id': lot.id,
+            'symbol': lot.symbol,
+            'quantity': lot.quantity,
+            'purchase_price': lot.purchase_price,
+            'purchase_date': lot.purchase_date.isoformat() if lot.purchase_date else None,
+            'notes': lot.notes,
             'current_price': current_price,
             'total_invested': total_invested,
             'current_value': current_value,
             'gain_loss': gain_loss,
             'gain_loss_percent': gain_loss_percent,
-            'added_at': self.added_at.isoformat() if self.added_at else None,
+            'added_at': lot.added_at.isoformat() if lot.added_at else None,
         }
 
     def __repr__(self):
@@ -160,6 +169,43 @@ class PortfolioSnapshot(db.Model):
         return f'<PortfolioSnapshot UserID:{self.user_id} Value:{self.total_value} Date:{self.snapshot_date}>'
 
 
+class PriceBar(db.Model):
+    """
+    One daily OHLCV bar per symbol, the durable tier under price_store's memory cache.
+    Written with batched upserts and read back as NumPy arrays (see price_db).
+    """
+    __tablename__ = 'price_bar'
+
+    symbol = db.Column(db.String(20), primary_key=True)  # Canonical yfinance symbol (e.g., 'TCS.NS')
+    date = db.Column(db.Date, primary_key=True)
+    open = db.Column(db.Float)
+    high = db.Column(db.Float)
+    low = db.Column(db.Float)
+    close = db.Column(db.Float, nullable=False)
+    volume = db.Column(db.Float)
+    adjusted = db.Column(db.Boolean, nullable=False, default=True)  # Split/dividend adjusted prices
+    fetched_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f'<PriceBar {self.symbol} {self.date} Close:{self.close}>'
+
+
+class PriceCoverage(db.Model):
+    """
+    How far back price_bar holds a symbol's complete history: the earliest start a
+    full download was made from. A symbol listed later simply has no bars before
+    its listing date, so its first bar can be well after covered_from.
+    """
+    __tablename__ = 'price_coverage'
+
+    symbol = db.Column(db.String(20), primary_key=True)  # Canonical yfinance symbol
+    covered_from = db.Column(db.Date, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    def __repr__(self):
+        return f'<PriceCoverage {self.symbol} from {self.covered_from}>'
+
+
 class InvestmentGoal(db.Model):
     """
     Represents a financial goal for the user.
@@ -177,6 +223,8 @@ class InvestmentGoal(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
+    __table_args__ = (db.Index('_goal_user_idx', 'user_id'),)
+
     def to_dict(self):
         import datetime as dt
         now = datetime.datetime.utcnow()
@@ -9,9 +9,11 @@ from flask import Flask, request
 from flask_restful import Api, Resource
 import numpy as np
 import pandas as pd
-import yfinance as yf
 from scipy.stats import norm
 
+from applications.price_store import get_close_matrix
+from applications.symbol_master import canonical_symbols
+
 # -------------------------------
 # CONFIG
 # -------------------------------
@@ -30,15 +32,11 @@ def monte_carlo_portfolio(stocks, start_date='2021-01-01'):
 
     # Fetch data
     try:
-        data = yf.download(stocks, start=start_date, progress=False, auto_adjust=True)
-        if isinstance(data.columns, pd.MultiIndex):
-            data = data['Close']
-        elif 'Close' in data.columns:
-            data = data[['Close']]
-        else:
-            raise ValueError("Unexpected data structure from yfinance")
+        data, missing = get_close_matrix(stocks, start_date)
         if data.empty:
             return {"error": "No data downloaded. Check tickers or internet connection."}, 400
+        if missing:
+            return {"error": f"No price data for: {', '.join(missing)}"}, 400
     except Exception as e:
         return {"error": f"Failed to download data: {str(e)}"}, 500
 
@@ -94,7 +92,7 @@ api = Api(app)
 class MonteCarlo(Resource):
     def post(self):
         data = request.get_json(force=True)
-        stocks = data.get("stocks")
+        stocks = canonical_symbols(data.get("stocks") or [])
         return monte_carlo_portfolio(stocks)
 
 # -- coding: utf-8 --
@@ -108,9 +106,10 @@ from flask import Flask, request
 from flask_restful import Api, Resource
 import numpy as np
 import pandas as pd
-import yfinance as yf
 from scipy.stats import norm
 
+from applications.price_store import get_close_matrix
+
 # -------------------------------
 # CONFIG
 # -------------------------------
@@ -129,15 +128,11 @@ def monte_carlo_portfolio(stocks, start_date='2021-01-01'):
 
     # Fetch data
     try:
-        data = yf.download(stocks, start=start_date, progress=False, auto_adjust=True)
-        if isinstance(data.columns, pd.MultiIndex):
-            data = data['Close']
-        elif 'Close' in data.columns:
-            data = data[['Close']]
-        else:
-            raise ValueError("Unexpected data structure from yfinance")
+        data, missing = get_close_matrix(stocks, start_date)
         if data.empty:
             return {"error": "No data downloaded. Check tickers or internet connection."}, 400
+        if missing:
+            return {"error": f"No price data for: {', '.join(missing)}"}, 400
     except Exception as e:
         return {"error": f"Failed to download data: {str(e)}"}, 500
 
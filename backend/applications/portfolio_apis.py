@@ -8,9 +8,12 @@ from sqlalchemy.sql import exists
 from sqlalchemy.exc import IntegrityError
 import uuid
 import pandas as pd
-import yfinance as yf
 from flask_security import auth_token_required, current_user
 from datetime import datetime, timedelta
+from applications import symbol_master
+from applications.dashboard_cache import get_materialized, mark_to_market, on_holdings_changed
+from applications.portfolio_queries import lot_rows
+from applications.price_store import get_info, latest_prices, to_yf_symbol
 
 # --- PORTFOLIO CRUD ENDPOINTS ---
 
@@ -57,17 +60,20 @@ class AddPortfolio(Resource):
             except ValueError:
                 return make_response(jsonify({'message': 'Invalid date format. Use YYYY-MM-DD'}), 400)
             
-            # Validate stock exists
-            try:
-                yf_symbol = f"{symbol}.NS" if '.' not in symbol else symbol
-                ticker = yf.Ticker(yf_symbol)
-                info = ticker.info
-                
-                if not info.get('currentPrice') and not info.get('regularMarketPrice'):
+            # Validate stock exists (local symbol master; network lookup only if it isn't installed)
+            if symbol_master.is_available():
+                if symbol_master.lookup(to_yf_symbol(symbol)) is None:
                     return make_response(jsonify({'message': f'Stock symbol {symbol} not found'}), 404)
-                
-            except Exception as e:
-                return make_response(jsonify({'message': f'Unable to validate stock: {str(e)}'}), 400)
+                info = {}
+            else:
+                try:
+                    info = get_info(to_yf_symbol(symbol))
+                    
+                    if not info.get('currentPrice') and not info.get('regularMarketPrice'):
+                        return make_response(jsonify({'message': f'Stock symbol {symbol} not found'}), 404)
+                    
+                except Exception as e:
+                    return make_response(jsonify({'message': f'Unable to validate stock: {str(e)}'}), 400)
             
             # Create holding
             holding = PortfolioHolding(
@@ -81,8 +87,10 @@ class AddPortfolio(Resource):
             
             db.session.add(holding)
             db.session.commit()
+            on_holdings_changed(user_id)
             
-            current_price = info.get('currentPrice') or info.get('regularMarketPrice') or float(purchase_price)
+            current_price = (info.get('currentPrice') or info.get('regularMarketPrice')
+                             or current_prices([symbol]).get(to_yf_symbol(symbol)) or float(purchase_price))
             
             return make_response(jsonify({
                 'message': 'Stock added to portfolio successfully',
@@ -104,7 +112,7 @@ class GetPortfolio(Resource):
             if not user:
                 return make_response(jsonify({'message': 'User not found'}), 404)
             
-            holdings = PortfolioHolding.query.filter_by(user_id=user_id).all()
+            holdings = lot_rows(user_id)
             
             if not holdings:
                 return make_response(jsonify({
@@ -118,23 +126,12 @@ class GetPortfolio(Resource):
                     }
                 }), 200)
             
-            # Fetch current prices
-            holdings_data = []
-            for holding in holdings:
-                try:
-                    yf_symbol = f"{holding.symbol}.NS" if '.' not in holding.symbol else holding.symbol
-                    ticker = yf.Ticker(yf_symbol)
-                    # Use history() for real-time price, not cached .info
-                    history = ticker.history(period='5d')
-                    if not history.empty:
-                        current_price = history['Close'].iloc[-1]
-                    else:
-                        current_price = holding.purchase_price
-                except Exception as e:
-                    print(f"[PRICE_FETCH_ERROR] {holding.symbol}: {e}")
-                    current_price = holding.purchase_price
-                
-                holdings_data.append(holding.to_dict(current_price=current_price))
+            # Fetch current prices (one batched download for all symbols)
+            prices = current_prices(h.symbol for h in holdings)
+            holdings_data = [
+                PortfolioHolding.row_to_dict(h, current_price=prices.get(to_yf_symbol(h.symbol), h.purchase_price))
+                for h in holdings
+            ]
             
             # Calculate summary
             total_value = sum(h['current_value'] for h in holdings_data)
@@ -203,12 +200,11 @@ class UpdatePortfolio(Resource):
                 holding.notes = data['notes'].strip() if data['notes'] else None
             
             db.session.commit()
+            on_holdings_changed(user_id)
             
             # Get current price
             try:
-                yf_symbol = f"{holding.symbol}.NS" if '.' not in holding.symbol else holding.symbol
-                ticker = yf.Ticker(yf_symbol)
-                info = ticker.info
+                info = get_info(to_yf_symbol(holding.symbol))
                 current_price = info.get('currentPrice') or info.get('regularMarketPrice') or holding.purchase_price
             except:
                 current_price = holding.purchase_price
@@ -250,6 +246,7 @@ class DeletePortfolio(Resource):
             symbol = holding.symbol
             db.session.delete(holding)
             db.session.commit()
+            on_holdings_changed(user_id)
             
             return make_response(jsonify({
                 'message': f'{symbol} removed from portfolio successfully'
@@ -267,9 +264,10 @@ class PortfolioDashboard(Resource):
             if not user:
                 return make_response(jsonify({'message': 'User not found'}), 404)
             
-            holdings = PortfolioHolding.query.filter_by(user_id=user_id).all()
+            # Holdings-derived parts are materialized until the next add / update / delete
+            dashboard = get_materialized(user_id)
             
-            if not holdings:
+            if dashboard is None:
                 return make_response(jsonify({
                     'summary': {
                         'total_value': 0,
@@ -289,34 +287,18 @@ class PortfolioDashboard(Resource):
                     'worst_performer': None
                 }), 200)
             
-            # Fetch current prices and build holdings data
-            holdings_data = []
-            for holding in holdings:
-                try:
-                    yf_symbol = f"{holding.symbol}.NS" if '.' not in holding.symbol else holding.symbol
-                    ticker = yf.Ticker(yf_symbol)
-                    # Use history() for real-time price, not cached .info
-                    history = ticker.history(period='5d')
-                    if not history.empty:
-                        current_price = history['Close'].iloc[-1]
-                    else:
-                        current_price = holding.purchase_price
-                except Exception as e:
-                    print(f"[PRICE_FETCH_ERROR] {holding.symbol}: {e}")
-                    current_price = holding.purchase_price
-                
-                holding_dict = holding.to_dict(current_price=current_price)
-                holding_dict['symbol'] = holding.symbol
-                holdings_data.append(holding_dict)
+            # Re-mark per-lot and per-symbol values against the cached quotes
+            prices = current_prices(dashboard.symbols)
+            holdings_data, positions_data = mark_to_market(dashboard, prices)
             
             # Calculate summary
-            total_value = sum(h['current_value'] for h in holdings_data)
-            total_invested = sum(h['total_invested'] for h in holdings_data)
+            total_value = sum(p['current_value'] for p in positions_data)
+            total_invested = sum(p['total_invested'] for p in positions_data)
             total_gain_loss = total_value - total_invested
             total_gain_loss_percent = (total_gain_loss / total_invested * 100) if total_invested != 0 else 0
             
-            # Calculate health score (1-10)
-            health_score = calculate_health_score(holdings_data, total_invested)
+            # Calculate health score (1-10) on the consolidated positions
+            health_score = calculate_health_score(positions_data, total_invested)
             
             # Determine health status
             if health_score >= 8:
@@ -329,22 +311,20 @@ class PortfolioDashboard(Resource):
                 health_status = 'Poor'
             
             # Build doughnut chart data (Stock-wise allocation & percentages)
-            doughnut_labels = []
-            doughnut_values = []
-            doughnut_percentages = []
-            
-            for holding in holdings_data:
-                doughnut_labels.append(holding['symbol'])
-                doughnut_values.append(holding['total_invested'])
-                percentage = (holding['total_invested'] / total_invested * 100) if total_invested > 0 else 0
-                doughnut_percentages.append(round(percentage, 2))
+            doughnut_labels = [p['symbol'] for p in positions_data]
+            doughnut_values = [p['total_invested'] for p in positions_data]
+            doughnut_percentages = [
+                round((p['total_invested'] / total_invested * 100) if total_invested > 0 else 0, 2)
+                for p in positions_data
+            ]
             
             # Find top and worst performers
-            top_performer = max(holdings_data, key=lambda x: x.get('gain_loss_percent', 0), default=None)
-            worst_performer = min(holdings_data, key=lambda x: x.get('gain_loss_percent', 0), default=None)
+            top_performer = max(positions_data, key=lambda x: x.get('gain_loss_percent', 0), default=None)
+            worst_performer = min(positions_data, key=lambda x: x.get('gain_loss_percent', 0), default=None)
             
             return make_response(jsonify({
                 'holdings': holdings_data,
+                'positions': positions_data,
                 'summary': {
                     'total_value': round(total_value, 2),
                     'total_invested': round(total_invested, 2),
@@ -375,6 +355,15 @@ class PortfolioDashboard(Resource):
 
 # --- HELPER FUNCTION ---
 
+def current_prices(symbols):
+    """Latest close per yfinance symbol from one batched fetch; callers fall back to cost."""
+    try:
+        return latest_prices(sorted({to_yf_symbol(s) for s in symbols}))
+    except Exception as e:
+        print(f"[PRICE_FETCH_ERROR] {e}")
+        return {}
+
+
 def calculate_health_score(holdings_data, total_invested):
     """Calculate portfolio health score (1-10)"""
     if not holdings_data or total_invested == 0:
@@ -0,0 +1,269 @@
+# -- coding: utf-8 --
+"""
+📈 Portfolio value history
+→ Daily snapshot job: every user's portfolio valued from one batched price fetch
+→ One PortfolioSnapshot row per user per day, re-runs replace that day's rows
+→ History endpoint reads a date range straight off the (user_id, snapshot_date) index
+→ Optional weekly / monthly downsampling (last value of each period)
+→ Vectorized reconstruction from lots for users without snapshots (backfill + on-the-fly chart),
+  and for the days before a user's first snapshot
+"""
+
+import datetime
+
+from flask import request
+from flask_restful import Resource
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, insert
+
+from applications.database import db
+from applications.models import PortfolioHolding, PortfolioSnapshot
+from applications.price_store import get_close_matrix, get_history, latest_prices, to_yf_symbol
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+INTERVALS = {'daily': None, 'weekly': 'W', 'monthly': 'M'}
+SOURCES = ('auto', 'snapshots', 'reconstructed')
+DEFAULT_HISTORY_DAYS = 365
+
+
+# -------------------------------
+# SNAPSHOT JOB
+# -------------------------------
+def snapshot_day(when=None):
+    """Snapshots are keyed on midnight so a day has exactly one timestamp."""
+    when = when or datetime.datetime.utcnow()
+    return datetime.datetime(when.year, when.month, when.day)
+
+
+def portfolio_values(rows, prices):
+    """
+    rows: (user_id, symbol, quantity, purchase_price) tuples
+    Lots without a price are valued at cost, as the dashboard does.
+    """
+    totals = {}
+    for user_id, symbol, quantity, purchase_price in rows:
+        price = prices.get(to_yf_symbol(symbol), purchase_price)
+        totals[user_id] = totals.get(user_id, 0.0) + quantity * price
+    return totals
+
+
+def write_snapshots(when=None):
+    """
+    Value every portfolio and store today's rows in a single transaction.
+    Idempotent: existing snapshots for the same day are replaced.
+    Returns {user_id: total_value}.
+    """
+    day = snapshot_day(when)
+    rows = PortfolioHolding.query.with_entities(
+        PortfolioHolding.user_id, PortfolioHolding.symbol,
+        PortfolioHolding.quantity, PortfolioHolding.purchase_price,
+    ).all()
+    if not rows:
+        return {}
+
+    prices = latest_prices(sorted({to_yf_symbol(r.symbol) for r in rows}))
+    totals = portfolio_values(rows, prices)
+
+    try:
+        PortfolioSnapshot.query.filter(
+            PortfolioSnapshot.snapshot_date == day,
+            PortfolioSnapshot.user_id.in_(list(totals)),
+        ).delete(synchronize_session=False)
+        db.session.execute(
+            insert(PortfolioSnapshot),
+            [{'user_id': u, 'total_value': round(v, 2), 'snapshot_date': day} for u, v in totals.items()],
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return totals
+
+
+# -------------------------------
+# RECONSTRUCTION FROM LOTS
+# -------------------------------
+def user_lots(user_id):
+    return PortfolioHolding.query.with_entities(
+        PortfolioHolding.symbol, PortfolioHolding.quantity,
+        PortfolioHolding.purchase_price, PortfolioHolding.purchase_date,
+    ).filter(PortfolioHolding.user_id == user_id).all()
+
+
+def reconstruct_history(lots, start=None, end=None):
+    """
+    Daily portfolio value implied by the lots, from `start` (default: first
+    purchase) to `end`. lots: (symbol, quantity, purchase_price, purchase_date).
+
+    positions[d, s] = shares of s held on trading day d, built by scattering each
+    lot's quantity onto the first trading day on/after its purchase date and
+    taking a cumulative sum; value = row-wise dot product with the close matrix.
+    Symbols without price data are carried at cost.
+    Returns a DataFrame indexed by date with 'value' and 'invested' columns.
+    """
+    if not lots:
+        return pd.DataFrame(columns=['value', 'invested'])
+
+    symbols = sorted({to_yf_symbol(lot[0]) for lot in lots})
+    column = {s: i for i, s in enumerate(symbols)}
+    sym_idx = np.array([column[to_yf_symbol(lot[0])] for lot in lots])
+    quantity = np.array([lot[1] for lot in lots], dtype=float)
+    cost = quantity * np.array([lot[2] for lot in lots], dtype=float)
+    bought = pd.DatetimeIndex([lot[3] for lot in lots]).normalize()
+
+    start = pd.Timestamp(start).normalize() if start is not None else bought.min()
+    closes, missing = get_close_matrix(symbols, start.strftime('%Y-%m-%d'), fill=True)
+    if end is not None:
+        closes = closes.loc[closes.index <= pd.Timestamp(end)]
+    if closes.empty:
+        return pd.DataFrame(columns=['value', 'invested'])
+
+    dates = closes.index
+    prices = np.zeros((len(dates), len(symbols)))
+    priced = [column[s] for s in closes.columns]
+    prices[:, priced] = closes.to_numpy(dtype=float)
+
+    # Lots bought before `start` land on row 0; after the last date on the dropped extra row
+    rows = dates.searchsorted(bought)
+    delta = np.zeros((len(dates) + 1, len(symbols)))
+    np.add.at(delta, (rows, sym_idx), quantity)
+    positions = np.cumsum(delta[:-1], axis=0)
+
+    invested_delta = np.zeros((len(dates) + 1, len(symbols)))
+    np.add.at(invested_delta, (rows, sym_idx), cost)
+    invested = np.cumsum(invested_delta[:-1], axis=0)
+
+    unpriced = np.array([column[s] for s in missing], dtype=int)
+    value = np.einsum('ij,ij->i', positions, prices) + invested[:, unpriced].sum(axis=1)
+
+    return pd.DataFrame({'value': value, 'invested': invested.sum(axis=1)}, index=dates)
+
+
+def backfill_snapshots(user_ids=None):
+    """
+    Reconstruct history for users up to the day before their first stored
+    snapshot (all of it if they have none) and bulk-insert it.
+    Returns {user_id: rows_inserted}.
+    """
+    if user_ids is None:
+        user_ids = [u for (u,) in PortfolioHolding.query.with_entities(PortfolioHolding.user_id).distinct()]
+    first_snapshot = dict(
+        PortfolioSnapshot.query.with_entities(PortfolioSnapshot.user_id, func.min(PortfolioSnapshot.snapshot_date))
+        .filter(PortfolioSnapshot.user_id.in_(user_ids))
+        .group_by(PortfolioSnapshot.user_id).all()
+    )
+
+    lots = {u: user_lots(u) for u in user_ids}
+    all_lots = [lot for user in lots.values() for lot in user]
+    if all_lots:
+        # Warm the price cache once from the earliest purchase so per-user reads are slices
+        earliest = min(lot.purchase_date for lot in all_lots).strftime('%Y-%m-%d')
+        get_history(sorted({to_yf_symbol(lot.symbol) for lot in all_lots}), earliest)
+
+    records, inserted = [], {}
+    for user_id in user_ids:
+        history = reconstruct_history(lots[user_id])
+        if user_id in first_snapshot:
+            history = history.loc[history.index < pd.Timestamp(first_snapshot[user_id])]
+        inserted[user_id] = len(history)
+        records.extend(
+            {'user_id': user_id, 'total_value': round(float(v), 2), 'snapshot_date': d.to_pydatetime()}
+            for d, v in history['value'].items()
+        )
+
+    if records:
+        try:
+            db.session.execute(insert(PortfolioSnapshot), records)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+    return inserted
+
+
+# -------------------------------
+# HISTORY
+# -------------------------------
+def downsample(series, interval):
+    """Keep the last snapshot of each week / month."""
+    freq = INTERVALS[interval]
+    if freq is None or series.empty:
+        return series
+    periods = series.index.to_period(freq)
+    return series[~periods.duplicated(keep='last')]
+
+
+def _parse_date(value, default):
+    return datetime.datetime.strptime(value, '%Y-%m-%d') if value else default
+
+
+class PortfolioHistory(Resource):
+    """
+    GET /api/v1/portfolio/history/<user_id>?start=YYYY-MM-DD&end=YYYY-MM-DD&interval=daily|weekly|monthly
+    Optional: source=auto|snapshots|reconstructed. auto serves snapshots and reconstructs from
+    lots whatever they do not cover: the whole range without snapshots ('reconstructed'), or the
+    days before the first snapshot in range ('merged').
+    """
+    def get(self, user_id):
+        interval = request.args.get('interval', 'daily').lower()
+        source = request.args.get('source', 'auto').lower()
+        if interval not in INTERVALS:
+            return {"error": f"interval must be one of: {', '.join(INTERVALS)}"}, 400
+        if source not in SOURCES:
+            return {"error": f"source must be one of: {', '.join(SOURCES)}"}, 400
+        try:
+            end = _parse_date(request.args.get('end'), datetime.datetime.utcnow())
+            start = _parse_date(request.args.get('start'), end - datetime.timedelta(days=DEFAULT_HISTORY_DAYS))
+        except ValueError:
+            return {"error": "start and end must be YYYY-MM-DD"}, 400
+        if start > end:
+            return {"error": "start must be before end"}, 400
+
+        rows = []
+        if source != 'reconstructed':
+            rows = PortfolioSnapshot.query.with_entities(
+                PortfolioSnapshot.snapshot_date, PortfolioSnapshot.total_value,
+            ).filter(
+                PortfolioSnapshot.user_id == user_id,
+                PortfolioSnapshot.snapshot_date >= snapshot_day(start),
+                PortfolioSnapshot.snapshot_date <= end,
+            ).order_by(PortfolioSnapshot.snapshot_date).all()
+
+        snapshots = pd.Series([r.total_value for r in rows],
+                              index=pd.DatetimeIndex([r.snapshot_date for r in rows]), dtype=float)
+        # First day the snapshots cover; None = reconstruct the whole range
+        covered_from = snapshots.index[0] if rows else None
+
+        if source == 'snapshots' or (rows and covered_from <= snapshot_day(start)):
+            source, series = 'snapshots', snapshots
+        else:
+            try:
+                lots = user_lots(user_id)
+                first = max(start, min((lot.purchase_date for lot in lots), default=start))
+                gap_end = end if covered_from is None else covered_from - datetime.timedelta(days=1)
+                rebuilt = pd.Series(dtype=float)
+                if lots and first <= gap_end:
+                    rebuilt = reconstruct_history(lots, first, gap_end)['value']
+            except Exception as e:
+                print(f"[PORTFOLIO_HISTORY_ERROR]: {e}")
+                return {"error": f"History reconstruction failed: {str(e)}"}, 500
+            if covered_from is None:
+                source, series = 'reconstructed', rebuilt
+            elif rebuilt.empty:
+                source, series = 'snapshots', snapshots
+            else:
+                source, series = 'merged', pd.concat([rebuilt[rebuilt.index < covered_from], snapshots])
+        series = downsample(series, interval)
+
+        return {
+            "user_id": user_id,
+            "interval": interval,
+            "source": source,
+            "start": start.strftime('%Y-%m-%d'),
+            "end": end.strftime('%Y-%m-%d'),
+            "dates": series.index.strftime('%Y-%m-%d').tolist(),
+            "values": [round(v, 2) for v in series.tolist()],
+        }, 200
@@ -0,0 +1,216 @@
+# -- coding: utf-8 --
+"""
+📥 Bulk portfolio import from a broker CSV
+→ Streams the upload through csv.DictReader, validating rows in chunks
+→ Resolves every distinct symbol locally (symbol master) or with one batched price lookup
+→ Inserts all valid lots with a single bulk insert in one transaction
+→ Returns a per-row error report (row number, reason, raw values)
+"""
+
+import codecs
+import csv
+from datetime import datetime
+
+from flask import jsonify, make_response, request
+from flask_restful import Resource
+from sqlalchemy import insert
+
+from applications import symbol_master
+from applications.dashboard_cache import on_holdings_changed
+from applications.database import db
+from applications.models import PortfolioHolding, User
+from applications.price_store import latest_prices, to_yf_symbol
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+CHUNK_ROWS = 500
+MAX_IMPORT_ROWS = 10000
+SYMBOL_LOOKBACK_DAYS = 14
+EXTRA_VALUES_KEY = '_extra'     # DictReader restkey: values beyond the header's columns
+
+# Accepted header spellings (lower-cased, spaces/underscores stripped) -> field
+COLUMN_ALIASES = {
+    'symbol': 'symbol', 'ticker': 'symbol', 'scrip': 'symbol', 'scripname': 'symbol',
+    'tradingsymbol': 'symbol', 'instrument': 'symbol', 'stock': 'symbol',
+    'quantity': 'quantity', 'qty': 'quantity', 'shares': 'quantity',
+    'purchaseprice': 'purchase_price', 'price': 'purchase_price', 'rate': 'purchase_price',
+    'avgprice': 'purchase_price', 'tradeprice': 'purchase_price', 'buyprice': 'purchase_price',
+    'purchasedate': 'purchase_date', 'date': 'purchase_date', 'tradedate': 'purchase_date',
+    'orderexecutiontime': 'purchase_date',
+    'tradetype': 'trade_type', 'type': 'trade_type', 'side': 'trade_type', 'buysell': 'trade_type',
+    'notes': 'notes', 'remarks': 'notes',
+}
+REQUIRED_FIELDS = ('symbol', 'quantity', 'purchase_price', 'purchase_date')
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%d-%b-%Y', '%d %b %Y', '%Y-%m-%dT%H:%M:%S',
+                '%Y-%m-%d %H:%M:%S')
+
+
+# -------------------------------
+# PARSING
+# -------------------------------
+def map_columns(fieldnames):
+    """CSV header -> field name for the columns we recognise."""
+    mapping = {}
+    for name in fieldnames or []:
+        key = name.strip().lower().replace(' ', '').replace('_', '').replace('.', '')
+        if key in COLUMN_ALIASES and COLUMN_ALIASES[key] not in mapping.values():
+            mapping[name] = COLUMN_ALIASES[key]
+    return mapping
+
+
+def parse_date(value):
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date '{value}'")
+
+
+def parse_row(raw, columns, now):
+    """One CSV row -> lot dict, or raise ValueError with the reason."""
+    if raw.get(EXTRA_VALUES_KEY):
+        raise ValueError(f"Row has {len(raw[EXTRA_VALUES_KEY])} more value(s) than the header")
+    row = {field: (raw.get(name) or '').strip() for name, field in columns.items()}
+
+    if row.get('trade_type') and row['trade_type'].lower() not in ('buy', 'b'):
+        raise ValueError(f"Only buy trades can be imported (got '{row['trade_type']}')")
+    if not row.get('symbol'):
+        raise ValueError('Stock symbol is required')
+
+    try:
+        quantity = float(row.get('quantity', '').replace(',', ''))
+        purchase_price = float(row.get('purchase_price', '').replace(',', ''))
+    except ValueError:
+        raise ValueError('Quantity and price must be numeric')
+    if quantity <= 0:
+        raise ValueError('Quantity must be positive')
+    if purchase_price <= 0:
+        raise ValueError('Purchase price must be positive')
+
+    purchase_date = parse_date(row.get('purchase_date', ''))
+    if purchase_date > now:
+        raise ValueError('Purchase date cannot be in future')
+
+    return {
+        'symbol': row['symbol'].upper(),
+        'quantity': quantity,
+        'purchase_price': purchase_price,
+        'purchase_date': purchase_date,
+        'notes': row.get('notes', ''),
+    }
+
+
+def read_chunks(reader, size=CHUNK_ROWS):
+    """Yield lists of (csv line number, raw row) without holding the whole file."""
+    chunk = []
+    for raw in reader:
+        chunk.append((reader.line_num, raw))
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_upload(stream, now=None):
+    """
+    Parse a CSV byte stream. Returns (lots, errors) where each lot carries its
+    CSV row number; symbols are not checked here.
+    """
+    now = now or datetime.now()
+    reader = csv.DictReader(codecs.getreader('utf-8-sig')(stream), restkey=EXTRA_VALUES_KEY)
+    columns = map_columns(reader.fieldnames)
+    missing = [f for f in REQUIRED_FIELDS if f not in columns.values()]
+    if missing:
+        raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+
+    lots, errors, seen = [], [], 0
+    for chunk in read_chunks(reader):
+        seen += len(chunk)
+        if seen > MAX_IMPORT_ROWS:
+            raise ValueError(f"At most {MAX_IMPORT_ROWS} rows per import")
+        for line, raw in chunk:
+            try:
+                lot = parse_row(raw, columns, now)
+            except ValueError as e:
+                errors.append({'row': line, 'error': str(e), 'data': raw})
+                continue
+            lot['row'] = line
+            lots.append(lot)
+    return lots, errors
+
+
+def resolve_symbols(symbols):
+    """
+    Symbols that exist: checked against the local symbol master, or with one
+    batched download of recent prices when no listing file is installed.
+    """
+    if symbol_master.is_available():
+        return {s for s in symbols if symbol_master.lookup(to_yf_symbol(s)) is not None}
+    quoted = latest_prices([to_yf_symbol(s) for s in symbols], lookback_days=SYMBOL_LOOKBACK_DAYS)
+    return {s for s in symbols if to_yf_symbol(s) in quoted}
+
+
+# -------------------------------
+# API
+# -------------------------------
+class ImportPortfolio(Resource):
+    """
+    POST /api/v1/portfolio/import - multipart form with `file` (CSV) and `user_id`
+    Columns: symbol, quantity, purchase_price, purchase_date (+ optional trade_type, notes);
+    common broker header spellings are accepted. ?dry_run=true validates without saving.
+    """
+    def post(self):
+        user_id = request.form.get('user_id', type=int)
+        if not user_id:
+            return make_response(jsonify({'message': 'User ID is required'}), 400)
+        if not User.query.get(user_id):
+            return make_response(jsonify({'message': 'User not found'}), 404)
+        upload = request.files.get('file')
+        if upload is None:
+            return make_response(jsonify({'message': 'CSV file is required'}), 400)
+        dry_run = request.args.get('dry_run', '').lower() in ('1', 'true', 'yes')
+
+        try:
+            lots, errors = validate_upload(upload.stream)
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            return make_response(jsonify({'message': f'Invalid CSV: {str(e)}'}), 400)
+
+        try:
+            known = resolve_symbols(sorted({lot['symbol'] for lot in lots}))
+        except Exception as e:
+            return make_response(jsonify({'message': f'Unable to validate symbols: {str(e)}'}), 502)
+
+        records = []
+        for lot in lots:
+            row = lot.pop('row')
+            if lot['symbol'] not in known:
+                errors.append({'row': row, 'error': f"Stock symbol {lot['symbol']} not found", 'data': lot})
+                continue
+            records.append(dict(lot, user_id=user_id))
+        errors.sort(key=lambda e: e['row'])
+        for e in errors:
+            if isinstance(e['data'].get('purchase_date'), datetime):
+                e['data'] = dict(e['data'], purchase_date=e['data']['purchase_date'].strftime('%Y-%m-%d'))
+
+        if records and not dry_run:
+            try:
+                db.session.execute(insert(PortfolioHolding), records)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                return make_response(jsonify({'message': f'Error importing holdings: {str(e)}'}), 500)
+            on_holdings_changed(user_id)
+
+        return make_response(jsonify({
+            'message': f"{'Validated' if dry_run else 'Imported'} {len(records)} lot(s), rejected {len(errors)}",
+            'dry_run': dry_run,
+            'imported': 0 if dry_run else len(records),
+            'valid': len(records),
+            'rejected': len(errors),
+            'symbols': sorted({r['symbol'] for r in records}),
+            'errors': errors,
+        }), 201 if records and not dry_run else 200)
@@ -0,0 +1,221 @@
+# -- coding: utf-8 --
+"""
+📈 Efficient-Frontier Portfolio Optimizer API
+→ Accepts a user's holdings or an arbitrary list of stocks
+→ Estimates mean/covariance once, scores thousands of random portfolios in one matrix op
+→ Solves min-variance & max-Sharpe points, returns frontier curve and rebalance plan
+"""
+
+from flask import request
+from flask_restful import Resource
+import numpy as np
+from scipy.optimize import minimize
+
+from applications.models import PortfolioHolding
+from applications.price_store import get_log_returns, latest_prices, to_yf_symbol
+from applications.symbol_master import canonical_symbols
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+NUM_PORTFOLIOS = 20000
+MAX_PORTFOLIOS = 100000
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.065        # annual, approx. Indian 10Y G-Sec yield
+FRONTIER_POINTS = 30
+SCATTER_POINTS = 500           # simulated portfolios returned for plotting
+DEFAULT_START_DATE = '2021-01-01'
+
+
+# -------------------------------
+# HELPER FUNCTIONS
+# -------------------------------
+def estimate_moments(log_returns):
+    """Annualized mean vector and covariance matrix from daily log returns."""
+    mu = log_returns.mean(axis=0) * TRADING_DAYS
+    cov = np.atleast_2d(np.cov(log_returns, rowvar=False)) * TRADING_DAYS
+    return mu, cov
+
+
+def simulate_portfolios(mu, cov, num_portfolios, risk_free_rate=RISK_FREE_RATE, seed=None):
+    """Score `num_portfolios` random long-only weight vectors in a single batch."""
+    rng = np.random.default_rng(seed)
+    weights = rng.dirichlet(np.ones(len(mu)), size=num_portfolios)
+    returns = weights @ mu
+    volatility = np.sqrt(np.einsum('ij,ij->i', weights @ cov, weights))
+    sharpe = (returns - risk_free_rate) / volatility
+    return weights, returns, volatility, sharpe
+
+
+def _solve(objective, jac, n, extra_constraints=(), x0=None):
+    constraints = [{'type': 'eq', 'fun': lambda w: w.sum() - 1.0, 'jac': lambda w: np.ones_like(w)}]
+    constraints.extend(extra_constraints)
+    result = minimize(
+        objective,
+        x0 if x0 is not None else np.ones(n) / n,
+        jac=jac,
+        method='SLSQP',
+        bounds=[(0.0, 1.0)] * n,
+        constraints=constraints,
+    )
+    weights = np.clip(result.x, 0.0, None)
+    return weights / weights.sum()
+
+
+def min_variance_weights(cov):
+    return _solve(lambda w: w @ cov @ w, lambda w: 2 * cov @ w, cov.shape[0])
+
+
+def max_sharpe_weights(mu, cov, risk_free_rate=RISK_FREE_RATE):
+    def neg_sharpe(w):
+        return -(w @ mu - risk_free_rate) / np.sqrt(w @ cov @ w)
+
+    def neg_sharpe_jac(w):
+        var = w @ cov @ w
+        vol = np.sqrt(var)
+        excess = w @ mu - risk_free_rate
+        return -(mu * vol - excess * (cov @ w) / vol) / var
+
+    return _solve(neg_sharpe, neg_sharpe_jac, len(mu))
+
+
+def frontier_curve(mu, cov, w_min_var, points=FRONTIER_POINTS):
+    """Minimum-variance weights for evenly spaced target returns above the min-variance point."""
+    targets = np.linspace(w_min_var @ mu, mu.max(), points)
+    curve, x0 = [], w_min_var
+    for target in targets:
+        cons = ({'type': 'eq', 'fun': lambda w, t=target: w @ mu - t, 'jac': lambda w: mu},)
+        w = _solve(lambda w: w @ cov @ w, lambda w: 2 * cov @ w, len(mu), cons, x0=x0)
+        curve.append(w)
+        x0 = w
+    return np.array(curve)
+
+
+def _describe(weights, symbols, mu, cov, risk_free_rate):
+    ret = float(weights @ mu)
+    vol = float(np.sqrt(weights @ cov @ weights))
+    return {
+        'weights': {s: round(float(w), 4) for s, w in zip(symbols, weights)},
+        'expected_return': round(ret, 4),
+        'volatility': round(vol, 4),
+        'sharpe_ratio': round((ret - risk_free_rate) / vol, 4) if vol > 0 else None,
+    }
+
+
+def rebalance_plan(symbols, target_weights, quantities, prices):
+    """Trades needed to move current market-value allocation to `target_weights`."""
+    qty = np.array([quantities.get(s, 0.0) for s in symbols])
+    px = np.array([prices[s] for s in symbols])
+    current_values = qty * px
+    total_value = current_values.sum()
+    if total_value <= 0:
+        return None
+
+    target_values = target_weights * total_value
+    trade_values = target_values - current_values
+    return {
+        'total_value': round(float(total_value), 2),
+        'positions': [
+            {
+                'symbol': s,
+                'price': round(float(px[i]), 2),
+                'current_quantity': float(qty[i]),
+                'current_weight': round(float(current_values[i] / total_value), 4),
+                'target_weight': round(float(target_weights[i]), 4),
+                'trade_value': round(float(trade_values[i]), 2),
+                'trade_quantity': round(float(trade_values[i] / px[i]), 4),
+                'action': 'BUY' if trade_values[i] > 0 else 'SELL' if trade_values[i] < 0 else 'HOLD',
+            }
+            for i, s in enumerate(symbols)
+        ],
+    }
+
+
+def optimize_portfolio(stocks, start_date=DEFAULT_START_DATE, num_portfolios=NUM_PORTFOLIOS,
+                       risk_free_rate=RISK_FREE_RATE, quantities=None, target='max_sharpe'):
+    if not stocks:
+        return {"error": "No stocks provided"}, 400
+
+    try:
+        log_returns, symbols, dates, missing = get_log_returns(stocks, start_date)
+    except Exception as e:
+        return {"error": f"Failed to download data: {str(e)}"}, 500
+
+    if len(symbols) < 2 or len(log_returns) < 30:
+        return {"error": "Need at least two stocks with 30+ days of overlapping history", "missing": missing}, 400
+
+    mu, cov = estimate_moments(log_returns)
+
+    weights, returns, volatility, sharpe = simulate_portfolios(mu, cov, num_portfolios, risk_free_rate)
+    w_min_var = min_variance_weights(cov)
+    w_max_sharpe = max_sharpe_weights(mu, cov, risk_free_rate)
+    curve = frontier_curve(mu, cov, w_min_var)
+
+    step = max(1, num_portfolios // SCATTER_POINTS)
+    result = {
+        "stocks": symbols,
+        "missing": missing,
+        "observations": int(len(log_returns)),
+        "start_date": dates[0].strftime('%Y-%m-%d'),
+        "expected_returns": {s: round(float(m), 4) for s, m in zip(symbols, mu)},
+        "min_variance": _describe(w_min_var, symbols, mu, cov, risk_free_rate),
+        "max_sharpe": _describe(w_max_sharpe, symbols, mu, cov, risk_free_rate),
+        "best_simulated": _describe(weights[np.argmax(sharpe)], symbols, mu, cov, risk_free_rate),
+        "frontier": [
+            {
+                "expected_return": round(float(w @ mu), 4),
+                "volatility": round(float(np.sqrt(w @ cov @ w)), 4),
+            }
+            for w in curve
+        ],
+        "simulated": {
+            "expected_return": np.round(returns[::step], 4).tolist(),
+            "volatility": np.round(volatility[::step], 4).tolist(),
+            "sharpe_ratio": np.round(sharpe[::step], 4).tolist(),
+        },
+    }
+
+    if quantities:
+        prices = latest_prices(symbols)
+        if all(s in prices for s in symbols):
+            target_weights = w_min_var if target == 'min_variance' else w_max_sharpe
+            result["rebalance"] = rebalance_plan(symbols, target_weights, quantities, prices)
+
+    return result, 200
+
+
+# -------------------------------
+# OPTIMIZER RESOURCE
+# -------------------------------
+class PortfolioOptimizer(Resource):
+    """POST /api/v1/portfolio/optimize - {"user_id": 1} or {"stocks": [...]}"""
+    def post(self):
+        data = request.get_json(force=True) or {}
+        user_id = data.get("user_id")
+        stocks = canonical_symbols(data.get("stocks") or [])
+        quantities = None
+
+        if user_id:
+            holdings = PortfolioHolding.query.filter_by(user_id=user_id).all()
+            if not holdings:
+                return {"error": "No portfolio holdings to optimize"}, 400
+            quantities = {}
+            for h in holdings:
+                symbol = to_yf_symbol(h.symbol)
+                quantities[symbol] = quantities.get(symbol, 0.0) + h.quantity
+            stocks = list(quantities)
+
+        try:
+            num_portfolios = max(1, min(int(data.get("num_portfolios", NUM_PORTFOLIOS)), MAX_PORTFOLIOS))
+            risk_free_rate = float(data.get("risk_free_rate", RISK_FREE_RATE))
+        except (TypeError, ValueError):
+            return {"error": "num_portfolios and risk_free_rate must be numeric"}, 400
+
+        return optimize_portfolio(
+            stocks,
+            start_date=data.get("start_date", DEFAULT_START_DATE),
+            num_portfolios=num_portfolios,
+            risk_free_rate=risk_free_rate,
+            quantities=quantities,
+            target=data.get("target", "max_sharpe"),
+        )
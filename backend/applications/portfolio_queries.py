@@ -0,0 +1,44 @@
+# -- coding: utf-8 --
+"""
+🗂️ Read-only portfolio queries
+→ Consolidated positions: lots grouped by symbol in SQL (quantity, weighted average cost, first/last buy)
+→ Plain column rows instead of hydrated ORM objects for read paths
+→ Shared by the dashboard, the AI chatbot context and the portfolio advisor
+"""
+
+from sqlalchemy import func
+
+from applications.models import PortfolioHolding
+
+LOT_COLUMNS = (
+    PortfolioHolding.id, PortfolioHolding.symbol, PortfolioHolding.quantity,
+    PortfolioHolding.purchase_price, PortfolioHolding.purchase_date,
+    PortfolioHolding.notes, PortfolioHolding.added_at,
+)
+
+
+def consolidated_positions(user_id):
+    """
+    One row per symbol, largest investment first. Row fields:
+    symbol, quantity, invested, avg_cost, lots, first_purchase, last_purchase
+    """
+    invested = func.sum(PortfolioHolding.quantity * PortfolioHolding.purchase_price)
+    quantity = func.sum(PortfolioHolding.quantity)
+    return PortfolioHolding.query.with_entities(
+        PortfolioHolding.symbol,
+        quantity.label('quantity'),
+        invested.label('invested'),
+        (invested / func.nullif(quantity, 0)).label('avg_cost'),
+        func.count(PortfolioHolding.id).label('lots'),
+        func.min(PortfolioHolding.purchase_date).label('first_purchase'),
+        func.max(PortfolioHolding.purchase_date).label('last_purchase'),
+    ).filter(
+        PortfolioHolding.user_id == user_id
+    ).group_by(PortfolioHolding.symbol).order_by(invested.desc()).all()
+
+
+def lot_rows(user_id):
+    """Individual lots as column rows, accepted by PortfolioHolding.row_to_dict."""
+    return PortfolioHolding.query.with_entities(*LOT_COLUMNS).filter(
+        PortfolioHolding.user_id == user_id
+    ).order_by(PortfolioHolding.id).all()
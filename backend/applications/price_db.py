@@ -0,0 +1,159 @@
+# -- coding: utf-8 --
+"""
+🗄️ Durable price-history tier (price_bar table in finance_app.sqlite3)
+→ Survives restarts and is shared by every worker process, unlike price_store's memory cache
+→ Writes are batched INSERT ... ON CONFLICT DO UPDATE upserts in one transaction
+→ Reads are primary-key range scans turned straight into NumPy arrays (no ORM objects)
+→ price_coverage records the earliest start each symbol was fully downloaded from, so
+  late listings (first bar after the requested start) are not re-downloaded every time
+→ Uses its own engine, so CLIs, the inference server and pool workers need no app context
+"""
+
+import datetime
+import threading
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from applications.config import Config
+from applications.db_setup import configure_engine
+from applications.models import PriceBar, PriceCoverage
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+UPSERT_BATCH = 500
+OHLCV_FIELDS = ['open', 'high', 'low', 'close', 'volume']
+FRAME_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+_table = PriceBar.__table__
+_coverage = PriceCoverage.__table__
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Engine on the app database; creates the price tables on first use (existing DBs predate them)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = configure_engine(create_engine(Config.SQLALCHEMY_DATABASE_URI))
+                _table.create(engine, checkfirst=True)
+                _coverage.create(engine, checkfirst=True)
+                _engine = engine
+    return _engine
+
+
+# -------------------------------
+# WRITE
+# -------------------------------
+def _frame_rows(symbol, df, adjusted, fetched_at):
+    df = df.reindex(columns=FRAME_COLUMNS)
+    values = df.to_numpy(dtype=float)
+    values = np.where(np.isnan(values), None, values).tolist()   # NaN -> NULL
+    return [
+        dict(zip(OHLCV_FIELDS, row), symbol=symbol, date=day, adjusted=adjusted, fetched_at=fetched_at)
+        for day, row in zip(df.index.date, values)
+        if row[3] is not None
+    ]
+
+
+def upsert_frames(frames, adjusted=True):
+    """Store {symbol: OHLCV DataFrame}; existing (symbol, date) bars are overwritten."""
+    fetched_at = datetime.datetime.utcnow()
+    rows = [r for symbol, df in frames.items() for r in _frame_rows(symbol, df, adjusted, fetched_at)]
+    if not rows:
+        return 0
+
+    stmt = sqlite_insert(_table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_table.c.symbol, _table.c.date],
+        set_={name: stmt.excluded[name] for name in OHLCV_FIELDS + ['adjusted', 'fetched_at']},
+    )
+    with get_engine().begin() as conn:
+        for i in range(0, len(rows), UPSERT_BATCH):
+            conn.execute(stmt, rows[i:i + UPSERT_BATCH])
+    return len(rows)
+
+
+def mark_covered(symbols, start, replace=False):
+    """
+    Record that `symbols` were fully downloaded from `start`. Keeps the earlier of
+    the stored and new start unless `replace` (the stored bars were re-based).
+    """
+    if not symbols:
+        return
+    start = pd.Timestamp(start).date()
+    now = datetime.datetime.utcnow()
+    stmt = sqlite_insert(_coverage)
+    covered_from = stmt.excluded.covered_from if replace else func.min(_coverage.c.covered_from,
+                                                                        stmt.excluded.covered_from)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_coverage.c.symbol],
+        set_={'covered_from': covered_from, 'updated_at': stmt.excluded.updated_at},
+    )
+    with get_engine().begin() as conn:
+        conn.execute(stmt, [{'symbol': s, 'covered_from': start, 'updated_at': now} for s in symbols])
+
+
+# -------------------------------
+# READ
+# -------------------------------
+def coverage(symbols):
+    """
+    {symbol: (first_date, last_date, last_fetched_at, covered_from)} for symbols with
+    stored bars; covered_from is None when no full download was recorded.
+    """
+    if not symbols:
+        return {}
+    query = select(
+        _table.c.symbol, func.min(_table.c.date), func.max(_table.c.date), func.max(_table.c.fetched_at),
+        func.min(_coverage.c.covered_from),
+    ).select_from(
+        _table.outerjoin(_coverage, _coverage.c.symbol == _table.c.symbol)
+    ).where(_table.c.symbol.in_(list(symbols))).group_by(_table.c.symbol)
+    with get_engine().connect() as conn:
+        return {row[0]: tuple(row[1:]) for row in conn.execute(query)}
+
+
+def read_bars(symbols, start, end=None):
+    """
+    {symbol: (dates, ohlcv)} where dates is datetime64[D] and ohlcv an (n, 5)
+    float array (NaN for missing fields), ascending by date.
+    """
+    if not symbols:
+        return {}
+    start = pd.Timestamp(start).date()
+    query = select(_table.c.symbol, _table.c.date, *[_table.c[f] for f in OHLCV_FIELDS]).where(
+        _table.c.symbol.in_(list(symbols)), _table.c.date >= start,
+    )
+    if end is not None:
+        query = query.where(_table.c.date <= pd.Timestamp(end).date())
+    query = query.order_by(_table.c.symbol, _table.c.date)
+
+    with get_engine().connect() as conn:
+        rows = conn.execute(query).all()
+    if not rows:
+        return {}
+
+    columns = list(zip(*rows))
+    names = np.array(columns[0])
+    dates = np.array(columns[1], dtype='datetime64[D]')
+    values = np.array(columns[2:], dtype=float).T        # None -> nan
+    # rows are sorted by symbol, so each symbol is one contiguous slice
+    bounds = np.flatnonzero(names[1:] != names[:-1]) + 1
+    out = {}
+    for lo, hi in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(names)]))):
+        out[str(names[lo])] = (dates[lo:hi], values[lo:hi])
+    return out
+
+
+def read_frames(symbols, start, end=None):
+    """read_bars as OHLCV DataFrames shaped like a yfinance download."""
+    return {
+        symbol: pd.DataFrame(values, index=pd.DatetimeIndex(dates, name='Date'), columns=FRAME_COLUMNS)
+        for symbol, (dates, values) in read_bars(symbols, start, end).items()
+    }
@@ -0,0 +1,244 @@
+"""
+📦 Cached price store shared by the analytics modules
+→ Downloads OHLCV history for many symbols in one batched yfinance call
+→ Keeps each symbol's history in a process-local TTL cache, sliced per request
+→ Second tier: the price_bar table (price_db), shared across processes and restarts;
+  stale symbols are topped up with a short incremental download instead of a full one,
+  and a symbol is re-downloaded in full only for a start before its recorded coverage
+→ Builds aligned close / return matrices for portfolio analytics
+→ Quote/fundamentals snapshots (Ticker.info) are kept in the cross-process shared cache
+"""
+
+import datetime
+import threading
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from cachetools import TTLCache
+
+from applications import price_db
+from applications.shared_cache import get_or_set
+from applications.symbol_master import DEFAULT_SUFFIX, canonical_symbol
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+PRICE_CACHE_TTL = 15 * 60      # seconds a downloaded history stays fresh
+PRICE_CACHE_SIZE = 512         # max symbols kept in memory
+INFO_TTL = 5 * 60              # seconds a Ticker.info snapshot is shared between workers
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+DB_START_TOLERANCE_DAYS = 7    # bars without recorded coverage may begin this long after `start` (holidays)
+INCREMENTAL_OVERLAP_DAYS = 5   # re-fetch this many days before the newest stored bar
+ADJUSTMENT_TOLERANCE = 0.005   # overlap close drift that signals a split/dividend re-adjustment
+
+# symbol -> (start_date, DataFrame); the widest frame is kept and sliced per request
+_history_cache = TTLCache(maxsize=PRICE_CACHE_SIZE, ttl=PRICE_CACHE_TTL)
+_cache_lock = threading.Lock()
+
+
+# -------------------------------
+# HELPERS
+# -------------------------------
+def to_yf_symbol(symbol):
+    """Portfolio convention: bare holding symbols are NSE listings (see symbol_master.canonical_symbol)."""
+    return canonical_symbol(symbol, DEFAULT_SUFFIX)
+
+
+def _extract_frame(data, symbol):
+    """Pull one symbol's OHLCV frame out of a (possibly multi-ticker) download."""
+    if data is None or data.empty:
+        return None
+
+    if isinstance(data.columns, pd.MultiIndex):
+        if symbol not in data.columns.get_level_values(1):
+            return None
+        df = data.xs(symbol, axis=1, level=1)
+    else:
+        df = data
+
+    df = df[[c for c in OHLCV_COLUMNS if c in df.columns]].dropna(how='all')
+    if df.empty or 'Close' not in df.columns:
+        return None
+    return df.rename_axis('Date')   # same shape as frames read back from price_db
+
+
+def _cached_frame(symbol, start):
+    """Return a cached frame covering `start`, or None on miss."""
+    with _cache_lock:
+        entry = _history_cache.get(symbol)
+    if entry is None:
+        return None
+    cached_start, df = entry
+    if pd.Timestamp(cached_start) > pd.Timestamp(start):
+        return None
+    return df.loc[df.index >= pd.Timestamp(start)]
+
+
+def _remember(symbol, start, df):
+    """Cache a loaded frame unless a wider one (earlier start) is already cached."""
+    with _cache_lock:
+        entry = _history_cache.get(symbol)
+        if entry is None or pd.Timestamp(start) <= pd.Timestamp(entry[0]):
+            _history_cache[symbol] = (start, df)
+
+
+# -------------------------------
+# PUBLIC API
+# -------------------------------
+def get_history(symbols, start):
+    """
+    Return {symbol: OHLCV DataFrame} from `start` to today.
+    Cache misses are fetched together in a single yfinance download.
+    Symbols with no data are left out of the result. Any spelling of a symbol
+    ('TCS', 'tcs', 'TCS.NS') shares one cache entry and one download; the
+    result is keyed by the spellings the caller passed.
+    """
+    requested = {s: canonical_symbol(s) for s in symbols}
+    frames = _get_canonical_history(list(dict.fromkeys(requested.values())), start)
+    return {s: frames[c] for s, c in requested.items() if c in frames}
+
+
+def _download(symbols, start):
+    """One batched yfinance download -> {symbol: frame} for symbols with data."""
+    if not symbols:
+        return {}
+    data = yf.download(symbols, start=start, progress=False, auto_adjust=True, group_by='column')
+    frames = {s: _extract_frame(data, s) for s in symbols}
+    return {s: df for s, df in frames.items() if df is not None}
+
+
+def _readjusted(fetched):
+    """
+    Symbols whose freshly downloaded closes disagree with the stored ones on the
+    overlapping days: a split or dividend re-based the adjusted series, so the
+    stored history must be replaced rather than appended to.
+    """
+    if not fetched:
+        return []
+    first = min(df.index[0] for df in fetched.values())
+    stored = price_db.read_bars(list(fetched), first)
+    drifted = []
+    for symbol, df in fetched.items():
+        if symbol not in stored:
+            continue
+        dates, bars = stored[symbol]
+        new_close = df['Close'].reindex(pd.DatetimeIndex(dates)).to_numpy(dtype=float)
+        overlap = ~np.isnan(new_close)
+        if overlap.any() and np.max(np.abs(new_close[overlap] / bars[overlap, 3] - 1)) > ADJUSTMENT_TOLERANCE:
+            drifted.append(symbol)
+    return drifted
+
+
+def _load_through_db(symbols, start):
+    """
+    Memory-cache misses: serve fresh symbols from price_bar, top up stale ones
+    with an incremental download, fetch the rest in full; store what was downloaded.
+    """
+    stored = price_db.coverage(symbols)
+    fresh_after = datetime.datetime.utcnow() - datetime.timedelta(seconds=PRICE_CACHE_TTL)
+    requested = pd.Timestamp(start).date()
+    latest_start = (pd.Timestamp(start) + pd.Timedelta(days=DB_START_TOLERANCE_DAYS)).date()
+
+    fresh, stale, full = [], {}, []
+    for symbol in symbols:
+        first, last, fetched_at, covered_from = stored.get(symbol, (None, None, None, None))
+        # Recorded coverage says no earlier data exists (e.g. listed after `start`);
+        # without a record, bars reaching back to about `start` are taken as complete
+        complete = first is not None and (
+            covered_from <= requested if covered_from is not None else first <= latest_start)
+        if not complete:
+            full.append(symbol)
+        elif fetched_at >= fresh_after:
+            fresh.append(symbol)
+        else:
+            stale[symbol] = last - datetime.timedelta(days=INCREMENTAL_OVERLAP_DAYS)
+
+    downloaded, redo = {}, []
+    if stale:
+        topped_up = _download(list(stale), min(stale.values()))
+        redo = _readjusted(topped_up)
+        for symbol in redo:
+            topped_up.pop(symbol)
+        full.extend(redo)
+        downloaded.update(topped_up)
+        # a failed top-up still serves the stored (slightly stale) bars
+        fresh.extend(s for s in stale if s not in redo)
+    full_frames = _download(full, start)
+    downloaded.update(full_frames)
+
+    if downloaded:
+        price_db.upsert_frames(downloaded)
+        # bars before `start` from an earlier basis no longer match re-based ones
+        price_db.mark_covered([s for s in full_frames if s in redo], start, replace=True)
+        price_db.mark_covered([s for s in full_frames if s not in redo], start)
+    frames = price_db.read_frames(fresh, start) if fresh else {}
+    frames.update(full_frames)
+    return frames
+
+
+def _get_canonical_history(symbols, start):
+    frames, missing = {}, []
+
+    for symbol in symbols:
+        df = _cached_frame(symbol, start)
+        if df is None:
+            missing.append(symbol)
+        else:
+            frames[symbol] = df
+
+    if missing:
+        try:
+            loaded = _load_through_db(missing, start)
+        except Exception as e:
+            print(f"[PRICE_DB_ERROR] {e}; downloading without the price_bar tier")
+            loaded = _download(missing, start)
+        for symbol, df in loaded.items():
+            frames[symbol] = df
+            _remember(symbol, start, df)
+
+    return frames
+
+
+def get_close_matrix(symbols, start, fill=False):
+    """
+    Aligned (dates x symbols) close-price DataFrame, restricted to dates
+    where every returned symbol traded. Returns (DataFrame, missing_symbols).
+    With fill=True every trading date of any symbol is kept and gaps are
+    forward-filled (back-filled before a symbol's first bar).
+    """
+    frames = get_history(symbols, start)
+    missing = [s for s in symbols if s not in frames]
+    if not frames:
+        return pd.DataFrame(), missing
+
+    closes = pd.DataFrame({s: frames[s]['Close'] for s in symbols if s in frames})
+    if fill:
+        return closes.ffill().bfill(), missing
+    return closes.dropna(how='any'), missing
+
+
+def get_log_returns(symbols, start):
+    """Aligned daily log-return matrix as (ndarray, column_symbols, dates, missing)."""
+    closes, missing = get_close_matrix(symbols, start)
+    if closes.empty or len(closes) < 2:
+        return np.empty((0, len(closes.columns))), list(closes.columns), closes.index[:0], missing
+
+    values = closes.to_numpy(dtype=float)
+    log_returns = np.diff(np.log(values), axis=0)
+    return log_returns, list(closes.columns), closes.index[1:], missing
+
+
+def latest_prices(symbols, lookback_days=10):
+    """Most recent close for each symbol that has data."""
+    start = (pd.Timestamp.today().normalize() - pd.Timedelta(days=lookback_days)).strftime('%Y-%m-%d')
+    frames = get_history(symbols, start)
+    return {s: float(df['Close'].dropna().iloc[-1]) for s, df in frames.items() if not df['Close'].dropna().empty}
+
+
+def get_info(symbol):
+    """
+    yfinance Ticker.info for `symbol` exactly as given (callers decide the
+    suffix), fetched once per INFO_TTL for all workers. Empty answers are not cached.
+    """
+    symbol = symbol.upper().strip()
+    return get_or_set(f"info:{symbol}", lambda: dict(yf.Ticker(symbol).info or {}) or None, INFO_TTL) or {}
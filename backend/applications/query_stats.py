@@ -0,0 +1,174 @@
+# -- coding: utf-8 --
+"""
+🔬 Per-request SQL instrumentation
+→ SQLAlchemy cursor events count statements, DB time and the slowest statement per request
+→ X-DB-Queries response header (count, total ms, slowest ms) when enabled
+→ [QUERY_BUDGET] warning past Config.QUERY_BUDGET statements in one request
+→ [N+1] warning when one statement shape repeats QUERY_REPEAT_LIMIT times in one request
+→ Aggregated per-endpoint report at GET /debug/queries for admins (?reset=true clears it)
+"""
+
+import re
+import threading
+import time
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from flask_restful import Resource
+from flask_security import auth_token_required, roles_required
+from sqlalchemy import event
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+HEADER = 'X-DB-Queries'
+STATEMENT_PREVIEW = 300     # characters of SQL kept in warnings and the report
+
+_IN_LIST = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')    # expanded IN (?, ?, ?) -> (?)
+_SPACES = re.compile(r'\s+')
+
+_report = {}
+_report_lock = threading.Lock()
+
+
+def statement_shape(statement):
+    """Statements that differ only by bound values or IN-list length share a shape."""
+    return _IN_LIST.sub('(?)', _SPACES.sub(' ', statement).strip())
+
+
+class RequestQueries:
+    """Statements seen during one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest = (0.0, None)
+        self.shapes = Counter()
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.seconds += elapsed
+        if elapsed > self.slowest[0]:
+            self.slowest = (elapsed, statement)
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, limit):
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= limit]
+
+
+# -------------------------------
+# EVENT HOOKS
+# -------------------------------
+# The start time lives on the execution context, which is discarded with the statement,
+# so a statement that raises leaves nothing behind on the pooled connection
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_started', None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+    if has_request_context():
+        queries = g.get('_queries')
+        if queries is not None:
+            queries.record(statement, elapsed)
+
+
+def instrument_engine(engine):
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    return engine
+
+
+# -------------------------------
+# REQUEST LIFECYCLE
+# -------------------------------
+def _start_request():
+    g._queries = RequestQueries()
+
+
+def _finish_request(response):
+    queries = g.pop('_queries', None)
+    if queries is None:
+        return response
+
+    config = current_app.config
+    endpoint = request.endpoint or request.path
+    over_budget = queries.count > config['QUERY_BUDGET']
+    repeated = queries.repeated(config['QUERY_REPEAT_LIMIT'])
+
+    if over_budget:
+        print(f"[QUERY_BUDGET] {request.method} {request.path}: {queries.count} statements "
+              f"(budget {config['QUERY_BUDGET']}), {queries.seconds * 1000:.1f} ms in DB")
+    for shape, n in repeated:
+        print(f"[N+1] {request.method} {request.path}: {n}x {shape[:STATEMENT_PREVIEW]}")
+
+    if config['QUERY_STATS_HEADER']:
+        response.headers[HEADER] = (f"count={queries.count}; time_ms={queries.seconds * 1000:.2f}; "
+                                    f"slowest_ms={queries.slowest[0] * 1000:.2f}")
+    _aggregate(endpoint, queries, over_budget, repeated)
+    return response
+
+
+def _aggregate(endpoint, queries, over_budget, repeated):
+    with _report_lock:
+        entry = _report.setdefault(endpoint, {
+            'requests': 0, 'statements': 0, 'db_ms': 0.0, 'max_statements': 0,
+            'over_budget': 0, 'repeated_shapes': 0, 'slowest_ms': 0.0, 'slowest_statement': None,
+        })
+        entry['requests'] += 1
+        entry['statements'] += queries.count
+        entry['db_ms'] += queries.seconds * 1000
+        entry['max_statements'] = max(entry['max_statements'], queries.count)
+        entry['over_budget'] += over_budget
+        entry['repeated_shapes'] += bool(repeated)
+        slowest_ms, statement = queries.slowest[0] * 1000, queries.slowest[1]
+        if statement is not None and slowest_ms > entry['slowest_ms']:
+            entry['slowest_ms'] = slowest_ms
+            entry['slowest_statement'] = statement_shape(statement)[:STATEMENT_PREVIEW]
+
+
+def report(reset=False):
+    """Per-endpoint totals, busiest endpoints (by total DB time) first."""
+    with _report_lock:
+        rows = [
+            dict(entry, endpoint=endpoint,
+                 db_ms=round(entry['db_ms'], 2), slowest_ms=round(entry['slowest_ms'], 2),
+                 avg_statements=round(entry['statements'] / entry['requests'], 2),
+                 avg_db_ms=round(entry['db_ms'] / entry['requests'], 3))
+            for endpoint, entry in _report.items()
+        ]
+        if reset:
+            _report.clear()
+    return sorted(rows, key=lambda r: r['db_ms'], reverse=True)
+
+
+def init_query_stats(app, engine):
+    """Hook the engine and the request lifecycle; no-op unless QUERY_STATS_ENABLED."""
+    if not app.config.get('QUERY_STATS_ENABLED'):
+        return
+    instrument_engine(engine)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+# -------------------------------
+# API
+# -------------------------------
+class QueryReport(Resource):
+    """GET /api/v1/debug/queries?reset=false - aggregated SQL statistics per endpoint (admin only)"""
+    @auth_token_required
+    @roles_required('admin')
+    def get(self):
+        if not current_app.config.get('QUERY_STATS_ENABLED'):
+            return {"error": "Query statistics are disabled (QUERY_STATS_ENABLED)"}, 404
+        reset = request.args.get('reset', '').lower() in ('1', 'true', 'yes')
+        return {
+            "budget": current_app.config['QUERY_BUDGET'],
+            "repeat_limit": current_app.config['QUERY_REPEAT_LIMIT'],
+            "endpoints": report(reset),
+        }, 200
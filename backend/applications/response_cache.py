@@ -0,0 +1,231 @@
+# -- coding: utf-8 --
+"""
+🧊 Response cache for the read-heavy market-data endpoints (Flask-Caching)
+→ Initialized in the app factory from Config (CACHE_TYPE, CACHE_DEFAULT_TIMEOUT, ...)
+→ Declarative per-resource policies: TTL, key over path params / query / user,
+  which query args vary the response, and whether to serve stale on upstream failure
+→ Symbol arguments are canonicalized, so 'tcs' and 'TCS.NS' share one entry
+→ Per-user entries carry a generation number; invalidate() bumps it after writes
+→ X-Cache: HIT | MISS | STALE on every cached response; hit ratios at GET /debug/cache
+  (admins only, with QUERY_STATS_ENABLED)
+"""
+
+import hashlib
+import threading
+import time
+from collections import Counter, namedtuple
+from functools import wraps
+
+from flask import Response, current_app, request
+from flask_caching import Cache
+from flask_restful import Resource
+from flask_security import auth_token_required, roles_required
+
+from applications.shared_cache import bump_generation, generation
+from applications.symbol_master import canonical_symbol, canonical_symbols
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+STALE_GRACE = 30 * 60       # seconds an expired entry is kept for serve-stale fallbacks
+HEADER = 'X-Cache'
+
+cache = Cache()
+
+CachePolicy = namedtuple(
+    'CachePolicy',
+    ['name', 'ttl', 'vary', 'symbol_args', 'per_user', 'serve_stale', 'key', 'methods'],
+    defaults=[None, (), False, True, None, ('get',)],
+)
+CachePolicy.__doc__ = """
+name         cache namespace and stats label
+ttl          seconds a response is fresh
+vary         query args that change the response (None = all of them)
+symbol_args  path params / query args holding ticker symbols, canonicalized in the key
+per_user     key includes the user (user_id path param or user-id header) and its generation
+serve_stale  on an exception or 5xx, answer with the expired entry if one is kept
+key          optional callable(view_kwargs) -> str replacing the default key
+methods      HTTP methods the policy applies to
+"""
+
+
+def _analyze_key(view_kwargs):
+    ticker = request.args.get('ticker', '').upper()
+    exchange = request.args.get('exchange', 'NS').upper()
+    return canonical_symbol(ticker if '.' in ticker else f"{ticker}.{exchange}")
+
+
+def _montecarlo_key(view_kwargs):
+    data = request.get_json(force=True, silent=True) or {}
+    return ','.join(sorted(canonical_symbols(data.get('stocks') or [])))
+
+
+# Resource class name -> policy (applied by init_cache)
+POLICIES = {
+    'PriceChartAPI': CachePolicy('chart_price', 300, vary=('stock',), symbol_args=('stock',)),
+    'VolumeChartAPI': CachePolicy('chart_volume', 300, vary=('stock',), symbol_args=('stock',)),
+    'DMAChartAPI': CachePolicy('chart_dma', 300, vary=('stock',), symbol_args=('stock',)),
+    'CandleData': CachePolicy('candle', 300, vary=(), symbol_args=('symbol',)),
+    'TechnicalSignal': CachePolicy('signal', 600, vary=('stock',), symbol_args=('stock',)),
+    'StockAnalyzer': CachePolicy('analyze', 120, key=_analyze_key),
+    'UserWatchlist': CachePolicy('watchlist', 60, vary=(), per_user=True),
+    'MonteCarlo': CachePolicy('montecarlo', 3600, key=_montecarlo_key, serve_stale=False, methods=('post',)),
+}
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+# -------------------------------
+# KEYS
+# -------------------------------
+def _normalize(policy, name, value):
+    if name in policy.symbol_args:
+        return ','.join(canonical_symbols(str(value).split(',')))
+    return str(value)
+
+
+def _user_of(view_kwargs):
+    return view_kwargs.get('user_id') or request.headers.get('user-id', '')
+
+
+def _generation_name(name, user_id):
+    return f"resp:{name}:{user_id}"
+
+
+def cache_key(policy, view_kwargs):
+    if policy.key is not None:
+        parts = [policy.key(view_kwargs)]
+    else:
+        parts = [f"{k}={_normalize(policy, k, v)}" for k, v in sorted(view_kwargs.items())]
+        names = sorted(request.args) if policy.vary is None else policy.vary
+        parts += [f"{n}={_normalize(policy, n, request.args.get(n, ''))}" for n in names]
+    if policy.per_user:
+        user_id = _user_of(view_kwargs)
+        parts.append(f"user={user_id}@{generation(_generation_name(policy.name, user_id))}")
+    digest = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+    return f"resp:{policy.name}:{digest}"
+
+
+def invalidate(name, user_id):
+    """Drop every cached per-user response of policy `name` for this user."""
+    bump_generation(_generation_name(name, user_id))
+
+
+# -------------------------------
+# ENTRIES
+# -------------------------------
+def _status_of(result):
+    if isinstance(result, Response):
+        return result.status_code
+    if isinstance(result, tuple) and len(result) > 1:
+        return result[1]
+    return 200
+
+
+def _freeze(result):
+    """Picklable form of a handler's return value."""
+    if isinstance(result, Response):
+        return ('response', result.get_data(), result.status_code, result.mimetype)
+    data = result[0] if isinstance(result, tuple) else result
+    return ('data', data)
+
+
+def _thaw(payload, state):
+    if payload[0] == 'response':
+        _, body, status, mimetype = payload
+        response = Response(body, status=status, mimetype=mimetype)
+        response.headers[HEADER] = state
+        return response
+    return payload[1], 200, {HEADER: state}
+
+
+def _tag(result, state):
+    if isinstance(result, Response):
+        result.headers[HEADER] = state
+        return result
+    if isinstance(result, tuple):
+        data, status = result[0], result[1]
+        headers = dict(result[2]) if len(result) > 2 else {}
+        headers[HEADER] = state
+        return data, status, headers
+    return result, 200, {HEADER: state}
+
+
+def _count(name, outcome):
+    with _stats_lock:
+        _stats.setdefault(name, Counter())[outcome] += 1
+
+
+def cached(policy):
+    """Decorator for a Resource method (see init_cache)."""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            key = cache_key(policy, kwargs)
+            bypass = 'no-cache' in request.headers.get('Cache-Control', '')
+            entry = cache.get(key)
+            if entry is not None and not bypass and time.time() - entry['stored'] < policy.ttl:
+                _count(policy.name, 'hit')
+                return _thaw(entry['payload'], 'HIT')
+
+            stale = entry if policy.serve_stale else None
+            try:
+                result = method(*args, **kwargs)
+            except Exception as e:
+                if stale is None:
+                    raise
+                print(f"[CACHE] {policy.name}: serving stale response after error: {e}")
+                _count(policy.name, 'stale')
+                return _thaw(stale['payload'], 'STALE')
+
+            status = _status_of(result)
+            if status >= 500 and stale is not None:
+                _count(policy.name, 'stale')
+                return _thaw(stale['payload'], 'STALE')
+
+            _count(policy.name, 'miss')
+            if status == 200:
+                timeout = policy.ttl + (STALE_GRACE if policy.serve_stale else 0)
+                cache.set(key, {'stored': time.time(), 'payload': _freeze(result)}, timeout=timeout)
+            return _tag(result, 'MISS')
+        return wrapper
+    return decorator
+
+
+# -------------------------------
+# SETUP & STATS
+# -------------------------------
+def init_cache(app):
+    """Initialize the cache extension and attach policies to the registered resources."""
+    cache.init_app(app)
+    for view in app.view_functions.values():
+        resource = getattr(view, 'view_class', None)
+        policy = POLICIES.get(getattr(resource, '__name__', None))
+        if policy is not None:
+            resource.method_decorators = {m: [cached(policy)] for m in policy.methods}
+
+
+def stats():
+    with _stats_lock:
+        snapshot = {name: dict(counts) for name, counts in _stats.items()}
+    out = {}
+    for policy in POLICIES.values():
+        counts = snapshot.get(policy.name, {})
+        hits, misses, stale = counts.get('hit', 0), counts.get('miss', 0), counts.get('stale', 0)
+        served = hits + misses + stale
+        out[policy.name] = {
+            'ttl': policy.ttl, 'hits': hits, 'misses': misses, 'stale': stale,
+            'hit_ratio': round((hits + stale) / served, 4) if served else None,
+        }
+    return out
+
+
+class CacheStats(Resource):
+    """GET /api/v1/debug/cache - per-endpoint hit ratios (admin only)"""
+    @auth_token_required
+    @roles_required('admin')
+    def get(self):
+        if not current_app.config.get('QUERY_STATS_ENABLED'):
+            return {"error": "Debug statistics are disabled (QUERY_STATS_ENABLED)"}, 404
+        return {"backend": current_app.config['CACHE_TYPE'], "endpoints": stats()}, 200
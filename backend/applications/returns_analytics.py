@@ -0,0 +1,240 @@
+# -- coding: utf-8 --
+"""
+💹 Portfolio return analytics
+→ Money-weighted return (XIRR) over the lot cash flows, for the portfolio and each symbol
+→ All XIRRs solved together by a vectorized Newton iteration, brentq for the stragglers
+→ Time-weighted return (TWR) from the reconstructed daily value curve
+→ Lot-derived cash-flow matrices cached per user until the holdings change
+"""
+
+import threading
+
+from flask_restful import Resource
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache, TTLCache
+from scipy.optimize import brentq
+from sqlalchemy import func
+
+from applications.models import PortfolioHolding
+from applications.portfolio_history import reconstruct_history, user_lots
+from applications.price_store import PRICE_CACHE_TTL, latest_prices, to_yf_symbol
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+DAYS_PER_YEAR = 365.0
+NEWTON_GUESS = 0.1
+NEWTON_MAX_ITER = 50
+NEWTON_TOL = 1e-10
+RATE_FLOOR = -0.9999           # (1 + r) must stay positive
+BRENT_UPPER = 1e3
+
+# user_id -> (fingerprint, flows); results additionally expire with the price cache
+_flow_cache = LRUCache(maxsize=1024)
+_result_cache = TTLCache(maxsize=1024, ttl=PRICE_CACHE_TTL)
+_cache_lock = threading.Lock()
+
+
+# -------------------------------
+# XIRR
+# -------------------------------
+def _npv(rates, amounts, years):
+    """NPV and its derivative for each row of `amounts` at the matching rate."""
+    discount = np.exp(-years[np.newaxis, :] * np.log1p(rates)[:, np.newaxis])
+    npv = (amounts * discount).sum(axis=1)
+    d_npv = -(amounts * years * discount).sum(axis=1) / (1 + rates)
+    return npv, d_npv
+
+
+def xirr_many(amounts, years):
+    """
+    Annualized IRR for every row of `amounts` (K x D cash flows on shared dates
+    `years` after the first date). Rows with no sign change come back NaN.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    years = np.asarray(years, dtype=float)
+    k = amounts.shape[0]
+    solvable = (amounts > 0).any(axis=1) & (amounts < 0).any(axis=1)
+
+    rates = np.full(k, NEWTON_GUESS)
+    done = ~solvable
+    with np.errstate(all='ignore'):
+        for _ in range(NEWTON_MAX_ITER):
+            active = ~done
+            if not active.any():
+                break
+            npv, d_npv = _npv(rates[active], amounts[active], years)
+            step = npv / d_npv
+            new = np.maximum(rates[active] - step, RATE_FLOOR)
+            rates[active] = new
+            done[np.flatnonzero(active)[np.abs(step) < NEWTON_TOL]] = True
+        npv, _ = _npv(rates, amounts, years)
+
+    result = np.full(k, np.nan)
+    converged = solvable & done & np.isfinite(rates) & (np.abs(npv) < 1e-6 * np.abs(amounts).sum(axis=1))
+    result[converged] = rates[converged]
+
+    # Bracketing fallback where Newton diverged or stalled
+    for i in np.flatnonzero(solvable & ~converged):
+        f = lambda r, a=amounts[i]: float(np.sum(a * np.exp(-years * np.log1p(r))))
+        try:
+            result[i] = brentq(f, RATE_FLOOR, BRENT_UPPER, xtol=NEWTON_TOL)
+        except ValueError:
+            pass
+    return result
+
+
+# -------------------------------
+# CASH FLOWS
+# -------------------------------
+def holdings_fingerprint(user_id):
+    """Changes whenever a lot is added, edited or removed."""
+    row = PortfolioHolding.query.with_entities(
+        func.count(PortfolioHolding.id), func.max(PortfolioHolding.id),
+        func.max(PortfolioHolding.updated_at),
+        func.sum(PortfolioHolding.quantity * PortfolioHolding.purchase_price),
+    ).filter(PortfolioHolding.user_id == user_id).one()
+    return tuple(str(v) for v in row)
+
+
+def build_flows(lots):
+    """
+    Purchase outflows aggregated onto unique dates: row 0 is the whole portfolio,
+    row i+1 is symbols[i]. The terminal market value is added at valuation time.
+    """
+    symbols = sorted({to_yf_symbol(lot.symbol) for lot in lots})
+    column = {s: i + 1 for i, s in enumerate(symbols)}
+    bought = pd.DatetimeIndex([lot.purchase_date for lot in lots]).normalize()
+    dates, date_idx = np.unique(bought.values, return_inverse=True)
+    row_idx = np.array([column[to_yf_symbol(lot.symbol)] for lot in lots])
+    quantity = np.array([lot.quantity for lot in lots], dtype=float)
+    cost = quantity * np.array([lot.purchase_price for lot in lots], dtype=float)
+
+    outflows = np.zeros((len(symbols) + 1, len(dates)))
+    np.add.at(outflows, (row_idx, date_idx), -cost)
+    outflows[0] = outflows[1:].sum(axis=0)
+
+    shares = np.zeros(len(symbols))
+    np.add.at(shares, row_idx - 1, quantity)
+    invested = -outflows.sum(axis=1)
+    return {
+        'symbols': symbols,
+        'dates': pd.DatetimeIndex(dates),
+        'outflows': outflows,
+        'shares': shares,
+        'invested': invested,
+        'lot_counts': np.bincount(row_idx - 1, minlength=len(symbols)),
+    }
+
+
+def _cached_flows(user_id, fingerprint):
+    with _cache_lock:
+        entry = _flow_cache.get(user_id)
+    if entry and entry[0] == fingerprint:
+        return entry[1]
+    flows = build_flows(user_lots(user_id))
+    with _cache_lock:
+        _flow_cache[user_id] = (fingerprint, flows)
+    return flows
+
+
+# -------------------------------
+# TWR
+# -------------------------------
+def time_weighted_return(history):
+    """
+    Chain daily sub-period returns, treating each day's new purchases as an
+    external cash flow at that day's close. Returns (total, annualized).
+    """
+    value = history['value'].to_numpy(dtype=float)
+    invested = history['invested'].to_numpy(dtype=float)
+    if len(value) < 2:
+        return None, None
+    cash_flow = np.diff(invested)
+    previous = value[:-1]
+    held = previous > 0
+    growth = np.ones_like(previous)
+    growth[held] = (value[1:][held] - cash_flow[held]) / previous[held]
+    total = float(np.prod(growth) - 1)
+    years = (history.index[-1] - history.index[0]).days / DAYS_PER_YEAR
+    annualized = float((1 + total) ** (1 / years) - 1) if years > 0 and total > -1 else None
+    return total, annualized
+
+
+# -------------------------------
+# ANALYTICS
+# -------------------------------
+def _pct(x):
+    return None if x is None or not np.isfinite(x) else round(float(x) * 100, 2)
+
+
+def portfolio_returns(user_id, flows):
+    today = pd.Timestamp.today().normalize()
+    symbols = flows['symbols']
+    prices = latest_prices(symbols)
+    # Unpriced symbols are carried at cost, as on the dashboard
+    values = np.array([
+        flows['shares'][i] * prices[s] if s in prices else flows['invested'][i + 1]
+        for i, s in enumerate(symbols)
+    ])
+    terminal = np.concatenate(([values.sum()], values))
+
+    dates = flows['dates'].append(pd.DatetimeIndex([today]))
+    amounts = np.column_stack([flows['outflows'], terminal])
+    years = (dates - dates[0]).days.to_numpy(dtype=float) / DAYS_PER_YEAR
+    irr = xirr_many(amounts, years)
+
+    twr, twr_annualized = time_weighted_return(reconstruct_history(user_lots(user_id)))
+    invested = flows['invested']
+    simple = np.divide(terminal - invested, invested, out=np.full_like(invested, np.nan), where=invested != 0)
+
+    return {
+        'user_id': user_id,
+        'as_of': today.strftime('%Y-%m-%d'),
+        'portfolio': {
+            'total_invested': round(float(invested[0]), 2),
+            'current_value': round(float(terminal[0]), 2),
+            'simple_return_percent': _pct(simple[0]),
+            'xirr_percent': _pct(irr[0]),
+            'twr_percent': _pct(twr),
+            'twr_annualized_percent': _pct(twr_annualized),
+            'first_purchase': flows['dates'][0].strftime('%Y-%m-%d'),
+        },
+        'symbols': [
+            {
+                'symbol': s,
+                'lots': int(flows['lot_counts'][i]),
+                'total_invested': round(float(invested[i + 1]), 2),
+                'current_value': round(float(terminal[i + 1]), 2),
+                'simple_return_percent': _pct(simple[i + 1]),
+                'annualized_return_percent': _pct(irr[i + 1]),
+                'priced': s in prices,
+            }
+            for i, s in enumerate(symbols)
+        ],
+    }
+
+
+class PortfolioReturns(Resource):
+    """GET /api/v1/portfolio/returns/<user_id> - TWR, XIRR and per-symbol annualized returns"""
+    def get(self, user_id):
+        fingerprint = holdings_fingerprint(user_id)
+        if fingerprint[0] == '0':
+            return {"error": "No portfolio holdings to analyze"}, 400
+
+        key = (user_id, fingerprint)
+        with _cache_lock:
+            cached = _result_cache.get(key)
+        if cached is not None:
+            return dict(cached, cached=True), 200
+
+        try:
+            result = portfolio_returns(user_id, _cached_flows(user_id, fingerprint))
+        except Exception as e:
+            print(f"[RETURNS_ERROR]: {e}")
+            return {"error": f"Return calculation failed: {str(e)}"}, 500
+
+        with _cache_lock:
+            _result_cache[key] = result
+        return dict(result, cached=False), 200
@@ -0,0 +1,184 @@
+# -- coding: utf-8 --
+"""
+🛡️ Portfolio Risk Engine API (VaR / Expected Shortfall)
+→ Values the user's actual weighted holdings from one aligned return matrix
+→ Historical simulation, parametric (normal) and filtered-bootstrap methods
+→ 1-day and 10-day horizons plus a rolling historical-VaR backtest
+"""
+
+from flask import request
+from flask_restful import Resource
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+from scipy.stats import norm
+
+from applications.models import PortfolioHolding
+from applications.price_store import get_close_matrix, to_yf_symbol
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+HORIZONS = (1, 10)
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_YEARS = 10
+EWMA_LAMBDA = 0.94            # RiskMetrics decay for filtered bootstrap
+BOOTSTRAP_PATHS = 20000
+ROLLING_WINDOW = 250          # trading days in the rolling VaR backtest
+MIN_OBSERVATIONS = 60
+
+
+# -------------------------------
+# HELPER FUNCTIONS
+# -------------------------------
+def horizon_log_returns(log_returns, horizon):
+    """Overlapping `horizon`-day log returns via a single cumulative sum."""
+    if horizon == 1:
+        return log_returns
+    csum = np.concatenate(([0.0], np.cumsum(log_returns)))
+    return csum[horizon:] - csum[:-horizon]
+
+
+def _tail_stats(losses, confidence):
+    var = np.quantile(losses, confidence)
+    tail = losses[losses >= var]
+    return float(var), float(tail.mean()) if tail.size else float(var)
+
+
+def historical_var(log_returns, confidence, horizon):
+    losses = -np.expm1(horizon_log_returns(log_returns, horizon))
+    return _tail_stats(losses, confidence)
+
+
+def parametric_var(log_returns, confidence, horizon):
+    mu = log_returns.mean() * horizon
+    sigma = log_returns.std(ddof=1) * np.sqrt(horizon)
+    z = norm.ppf(confidence)
+    var = -(mu - z * sigma)
+    es = -mu + sigma * norm.pdf(z) / (1 - confidence)
+    # log-return quantiles -> simple-return losses
+    return float(-np.expm1(-var)), float(-np.expm1(-es))
+
+
+def ewma_volatility(log_returns, lam=EWMA_LAMBDA):
+    """
+    EWMA conditional volatility for each day (using information up to the day before),
+    plus the one-step-ahead forecast. Computed with a single IIR filter pass.
+    """
+    squared = log_returns ** 2
+    seed = squared[:min(30, len(squared))].mean()
+    # sigma2[t] = lam * sigma2[t-1] + (1 - lam) * r[t-1]^2
+    filtered, _ = lfilter([1 - lam], [1, -lam], squared, zi=[lam * seed])
+    sigma2 = np.concatenate(([seed], filtered))
+    sigma = np.sqrt(sigma2)
+    return sigma[:-1], float(sigma[-1])
+
+
+def filtered_bootstrap_var(log_returns, confidence, horizon, paths=BOOTSTRAP_PATHS, seed=None):
+    """Resample EWMA-standardized residuals and rescale by the current volatility forecast."""
+    sigma, sigma_next = ewma_volatility(log_returns)
+    residuals = log_returns / sigma
+    rng = np.random.default_rng(seed)
+    draws = residuals[rng.integers(0, residuals.size, size=(paths, horizon))]
+    simulated = sigma_next * draws.sum(axis=1)
+    return _tail_stats(-np.expm1(simulated), confidence)
+
+
+def rolling_historical_var(log_returns, confidence, window=ROLLING_WINDOW):
+    """Trailing-window 1-day VaR for every day and the realised breach rate."""
+    if log_returns.size <= window:
+        return None
+    windows = sliding_window_view(-np.expm1(log_returns[:-1]), window)
+    var_series = np.quantile(windows, confidence, axis=1)
+    realised = -np.expm1(log_returns[window:])
+    breaches = realised > var_series
+    return {
+        'window': window,
+        'observations': int(breaches.size),
+        'breaches': int(breaches.sum()),
+        'breach_rate': round(float(breaches.mean()), 4),
+        'expected_rate': round(1 - confidence, 4),
+        'latest_var_percent': round(float(var_series[-1]) * 100, 2),
+    }
+
+
+def portfolio_risk(quantities, confidence=DEFAULT_CONFIDENCE, years=DEFAULT_YEARS):
+    """
+    quantities: {yf_symbol: total_quantity}
+    Builds the aligned close matrix once and evaluates every method on it.
+    """
+    start = (pd.Timestamp.today() - pd.DateOffset(years=years)).strftime('%Y-%m-%d')
+    closes, missing = get_close_matrix(list(quantities), start)
+    if closes.empty or len(closes) <= MIN_OBSERVATIONS:
+        return {"error": "Not enough overlapping price history for these holdings", "missing": missing}, 400
+
+    prices = closes.to_numpy(dtype=float)
+    symbols = list(closes.columns)
+    qty = np.array([quantities[s] for s in symbols])
+
+    position_values = qty * prices[-1]
+    portfolio_value = float(position_values.sum())
+    weights = position_values / portfolio_value
+
+    # Portfolio simple return = weighted sum of asset simple returns
+    asset_returns = prices[1:] / prices[:-1] - 1.0
+    portfolio_log_returns = np.log1p(asset_returns @ weights)
+
+    methods = {
+        'historical': historical_var,
+        'parametric': parametric_var,
+        'filtered_bootstrap': filtered_bootstrap_var,
+    }
+    risk = {}
+    for name, method in methods.items():
+        risk[name] = {}
+        for horizon in HORIZONS:
+            var, es = method(portfolio_log_returns, confidence, horizon)
+            risk[name][f'{horizon}d'] = {
+                'var_percent': round(var * 100, 2),
+                'var_amount': round(var * portfolio_value, 2),
+                'expected_shortfall_percent': round(es * 100, 2),
+                'expected_shortfall_amount': round(es * portfolio_value, 2),
+            }
+
+    return {
+        'confidence': confidence,
+        'portfolio_value': round(portfolio_value, 2),
+        'weights': {s: round(float(w), 4) for s, w in zip(symbols, weights)},
+        'missing': missing,
+        'history_start': closes.index[0].strftime('%Y-%m-%d'),
+        'observations': int(portfolio_log_returns.size),
+        'risk': risk,
+        'rolling_backtest': rolling_historical_var(portfolio_log_returns, confidence),
+    }, 200
+
+
+# -------------------------------
+# RISK RESOURCE
+# -------------------------------
+class PortfolioRisk(Resource):
+    """GET /api/v1/portfolio/risk/<user_id>?confidence=0.95&years=10"""
+    def get(self, user_id):
+        try:
+            confidence = float(request.args.get('confidence', DEFAULT_CONFIDENCE))
+            years = int(request.args.get('years', DEFAULT_YEARS))
+        except ValueError:
+            return {"error": "confidence and years must be numeric"}, 400
+        if not 0.5 < confidence < 1:
+            return {"error": "confidence must be between 0.5 and 1"}, 400
+
+        holdings = PortfolioHolding.query.filter_by(user_id=user_id).all()
+        if not holdings:
+            return {"error": "No portfolio holdings to analyze"}, 400
+
+        quantities = {}
+        for h in holdings:
+            symbol = to_yf_symbol(h.symbol)
+            quantities[symbol] = quantities.get(symbol, 0.0) + h.quantity
+
+        try:
+            return portfolio_risk(quantities, confidence, max(1, years))
+        except Exception as e:
+            print(f"[RISK_ENGINE_ERROR]: {e}")
+            return {"error": f"Risk calculation failed: {str(e)}"}, 500
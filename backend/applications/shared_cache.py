@@ -0,0 +1,257 @@
+# -- coding: utf-8 --
+"""
+🔗 Cache shared by every worker process on the host (no external service)
+→ SQLiteCache: a cachelib-style backend on a WAL-mode SQLite file; each write is one atomic
+  upsert, entries carry an expiry, and the file is kept under a byte budget by
+  evicting expired and then least-recently-used entries
+→ Usable as the Flask-Caching backend (CACHE_TYPE) and directly via get_shared_cache()
+→ Config.SHARED_CACHE_BACKEND selects 'sqlite' (shared) or 'memory' (per process)
+→ shared_lock(): cross-process mutual exclusion built on the atomic add()
+→ generation() / bump_generation(): invalidation counters shared by all workers
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from cachelib import SimpleCache
+from flask_caching.backends.base import BaseCache   # cachelib BaseCache + Flask-Caching factory hook
+
+from applications.config import Config
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+BUSY_TIMEOUT = 5.0          # seconds a writer waits for the file lock
+ACCESS_RESOLUTION = 60      # seconds between recency updates of an entry on reads
+EVICT_EVERY = 200           # writes between size checks
+EVICT_TARGET = 0.9          # shrink to this share of max_bytes when over budget
+MEMORY_THRESHOLD = 2000     # entries kept by the per-process fallback
+LOCK_POLL = 0.2
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS cache_entry ("
+    " key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL,"
+    " size INTEGER NOT NULL, accessed REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS cache_entry_accessed_idx ON cache_entry (accessed)",
+]
+LIVE = "(expires = 0 OR expires > ?)"   # expires = 0 means no expiry
+
+
+class SQLiteCache(BaseCache):
+    """cachelib cache on one SQLite file, safe for concurrent threads and processes."""
+
+    def __init__(self, path, default_timeout=300, max_bytes=256 * 1024 * 1024):
+        super().__init__(default_timeout)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        conn = self._conn()
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        """Flask-Caching entry point (CACHE_TYPE = 'applications.shared_cache.SQLiteCache')."""
+        return cls(config.get('SHARED_CACHE_PATH', Config.SHARED_CACHE_PATH),
+                   default_timeout=config.get('CACHE_DEFAULT_TIMEOUT', 300),
+                   max_bytes=config.get('SHARED_CACHE_MAX_BYTES', Config.SHARED_CACHE_MAX_BYTES))
+
+    def _conn(self):
+        # One connection per thread, reopened after fork
+        if getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return self._local.conn
+
+    def _expires(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout > 0 else 0
+
+    # --- reads ---
+    def get(self, key):
+        now = time.time()
+        row = self._conn().execute(
+            f"SELECT value, accessed FROM cache_entry WHERE key = ? AND {LIVE}", (key, now),
+        ).fetchone()
+        if row is None:
+            return None
+        if now - row[1] > ACCESS_RESOLUTION:
+            self._conn().execute("UPDATE cache_entry SET accessed = ? WHERE key = ?", (now, key))
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            return None
+
+    def has(self, key):
+        return self._conn().execute(
+            f"SELECT 1 FROM cache_entry WHERE key = ? AND {LIVE}", (key, time.time()),
+        ).fetchone() is not None
+
+    # --- writes ---
+    def set(self, key, value, timeout=None):
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache_entry (key, value, expires, size, accessed) VALUES (?, ?, ?, ?, ?)",
+            (key, blob, self._expires(timeout), len(blob), now),
+        )
+        self._maybe_evict()
+        return True
+
+    def add(self, key, value, timeout=None):
+        """Store only if no live entry exists; atomic across processes."""
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO cache_entry (key, value, expires, size, accessed) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires, "
+            "size = excluded.size, accessed = excluded.accessed "
+            "WHERE cache_entry.expires != 0 AND cache_entry.expires <= ?",
+            (key, blob, self._expires(timeout), len(blob), now, now),
+        )
+        added = cursor.rowcount == 1
+        if added:
+            self._maybe_evict()
+        return added
+
+    def delete(self, key):
+        return self._conn().execute("DELETE FROM cache_entry WHERE key = ?", (key,)).rowcount > 0
+
+    def delete_if(self, key, value):
+        """Delete `key` only while it still holds `value`; atomic across processes."""
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return self._conn().execute(
+            "DELETE FROM cache_entry WHERE key = ? AND value = ?", (key, blob)).rowcount > 0
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache_entry")
+        return True
+
+    # --- eviction ---
+    def _maybe_evict(self):
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % EVICT_EVERY == 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least-recently-used ones until under budget."""
+        conn = self._conn()
+        conn.execute("DELETE FROM cache_entry WHERE expires != 0 AND expires <= ?", (time.time(),))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entry").fetchone()[0]
+        if total > self.max_bytes:
+            conn.execute(
+                "DELETE FROM cache_entry WHERE key IN ("
+                " SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed DESC, key) AS kept"
+                " FROM cache_entry) WHERE kept > ?)",
+                (int(self.max_bytes * EVICT_TARGET),),
+            )
+
+    def stats(self):
+        entries, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entry").fetchone()
+        return {'entries': entries, 'bytes': size, 'max_bytes': self.max_bytes}
+
+
+# -------------------------------
+# PROCESS-WIDE INSTANCE
+# -------------------------------
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """The cache selected by Config.SHARED_CACHE_BACKEND."""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                if Config.SHARED_CACHE_BACKEND == 'sqlite':
+                    _shared = SQLiteCache(Config.SHARED_CACHE_PATH, max_bytes=Config.SHARED_CACHE_MAX_BYTES)
+                else:
+                    _shared = SimpleCache(threshold=MEMORY_THRESHOLD)
+    return _shared
+
+
+def get_or_set(key, compute, timeout):
+    """Cached value for `key`, computing and storing it on a miss (None is not cached)."""
+    cache = get_shared_cache()
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        if value is not None:
+            cache.set(key, value, timeout=timeout)
+    return value
+
+
+def _generation_key(name):
+    return f"gen:{name}"
+
+
+def generation(name):
+    """
+    Current generation of `name`. A counter that was never set, or was evicted,
+    starts at a fresh time_ns value so it never falls back to one used before.
+    """
+    cache = get_shared_cache()
+    key = _generation_key(name)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time_ns(), timeout=0)
+        value = cache.get(key) or time.time_ns()
+    return value
+
+
+def bump_generation(name):
+    """Start a new generation of `name`; everything keyed by an earlier one is unreachable."""
+    get_shared_cache().set(_generation_key(name), time.time_ns(), timeout=0)
+
+
+_release_lock = threading.Lock()
+
+
+def _release(cache, key, token):
+    if isinstance(cache, SQLiteCache):
+        cache.delete_if(key, token)
+        return
+    # Per-process fallback: no other process can hold the lock, a thread lock suffices
+    with _release_lock:
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+@contextmanager
+def shared_lock(name, ttl, wait):
+    """
+    Hold `name` across all workers for at most `ttl` seconds (a crashed holder
+    cannot block forever). Waits up to `wait` seconds; yields whether the lock
+    was acquired, so callers can carry on without it after a timeout.
+    The lock holds a token unique to this acquisition, and release only deletes
+    it while that token is still there: a holder that overran `ttl` cannot
+    release the next owner's lock.
+    """
+    cache = get_shared_cache()
+    key = f"lock:{name}"
+    token = f"{os.getpid()}:{uuid.uuid4().hex}"
+    deadline = time.monotonic() + wait
+    acquired = cache.add(key, token, timeout=ttl)
+    while not acquired and time.monotonic() < deadline:
+        time.sleep(LOCK_POLL)
+        acquired = cache.add(key, token, timeout=ttl)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            _release(cache, key, token)
@@ -0,0 +1,105 @@
+# -- coding: utf-8 --
+"""
+⚡ Lightweight statistical forecasters (NumPy / SciPy only)
+→ Simple exponential smoothing, AR(p) on log returns, drift with volatility bands
+→ Each fits in milliseconds and returns a point path with confidence intervals
+→ All work on log prices, so bands are asymmetric in price space
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+from scipy.stats import norm
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+DEFAULT_HORIZON = 14
+DEFAULT_CONFIDENCE = 0.95
+SES_ALPHAS = np.linspace(0.05, 1.0, 20)   # smoothing grid searched in one pass each
+AR_ORDER = 5
+AR_HISTORY = 750                            # ~3 years of returns for AR fitting
+DRIFT_WINDOW = 252                          # trailing year for drift / volatility
+
+
+def _bands(log_point, log_std, confidence):
+    z = norm.ppf(0.5 + confidence / 2)
+    return np.exp(log_point), np.exp(log_point - z * log_std), np.exp(log_point + z * log_std)
+
+
+# -------------------------------
+# FORECASTERS
+# -------------------------------
+def ses_forecast(closes, horizon=DEFAULT_HORIZON, confidence=DEFAULT_CONFIDENCE):
+    """
+    Simple exponential smoothing of log prices. The level recursion is a first-order
+    IIR filter, so every alpha in SES_ALPHAS is scored with one lfilter call.
+    """
+    y = np.log(np.asarray(closes, dtype=float))
+    best = None
+    for alpha in SES_ALPHAS:
+        # level[t] = alpha * y[t] + (1 - alpha) * level[t-1], seeded with y[0]
+        level, _ = lfilter([alpha], [1, alpha - 1], y[1:], zi=[(1 - alpha) * y[0]])
+        errors = y[1:] - np.concatenate(([y[0]], level[:-1]))
+        sse = float(errors @ errors)
+        if best is None or sse < best[0]:
+            best = (sse, alpha, level[-1], errors)
+
+    _, alpha, last_level, errors = best
+    sigma = errors.std(ddof=1)
+    h = np.arange(1, horizon + 1)
+    log_std = sigma * np.sqrt(1 + (h - 1) * alpha ** 2)
+    point, lower, upper = _bands(np.full(horizon, last_level), log_std, confidence)
+    return {'point': point, 'lower': lower, 'upper': upper, 'params': {'alpha': round(float(alpha), 3)}}
+
+
+def ar_forecast(closes, horizon=DEFAULT_HORIZON, confidence=DEFAULT_CONFIDENCE, order=AR_ORDER):
+    """AR(p) on daily log returns fitted by least squares; bands from the MA(inf) weights."""
+    log_prices = np.log(np.asarray(closes, dtype=float))
+    r = np.diff(log_prices)[-AR_HISTORY:]
+
+    lagged = sliding_window_view(r, order + 1)          # each row: r[t-p..t]
+    X = np.column_stack([np.ones(len(lagged)), lagged[:, :-1][:, ::-1]])
+    y = lagged[:, -1]
+    coef, *_ = np.linalg.lstsq(X, y, rcond=None)
+    const, phi = coef[0], coef[1:]
+    sigma = (y - X @ coef).std(ddof=order + 1)
+
+    history = list(r[-order:][::-1])                    # most recent first
+    forecast_returns = np.empty(horizon)
+    for i in range(horizon):
+        nxt = const + phi @ np.array(history[:order])
+        forecast_returns[i] = nxt
+        history.insert(0, nxt)
+
+    # psi weights of the AR process, then variance of cumulative returns
+    psi = np.zeros(horizon)
+    psi[0] = 1.0
+    for j in range(1, horizon):
+        k = min(j, order)
+        psi[j] = phi[:k] @ psi[j - 1::-1][:k]
+    cum_psi = np.cumsum(psi)
+    log_var = sigma ** 2 * np.cumsum(cum_psi ** 2)
+
+    log_point = log_prices[-1] + np.cumsum(forecast_returns)
+    point, lower, upper = _bands(log_point, np.sqrt(log_var), confidence)
+    return {'point': point, 'lower': lower, 'upper': upper,
+            'params': {'order': order, 'phi': np.round(phi, 4).tolist()}}
+
+
+def drift_forecast(closes, horizon=DEFAULT_HORIZON, confidence=DEFAULT_CONFIDENCE, window=DRIFT_WINDOW):
+    """Random walk with drift on log prices, volatility bands widening with sqrt(h)."""
+    log_prices = np.log(np.asarray(closes, dtype=float))
+    r = np.diff(log_prices)[-window:]
+    mu, sigma = r.mean(), r.std(ddof=1)
+    h = np.arange(1, horizon + 1)
+    point, lower, upper = _bands(log_prices[-1] + mu * h, sigma * np.sqrt(h), confidence)
+    return {'point': point, 'lower': lower, 'upper': upper,
+            'params': {'daily_drift': round(float(mu), 6), 'daily_volatility': round(float(sigma), 6)}}
+
+
+FORECASTERS = {
+    'ets': ses_forecast,
+    'ar': ar_forecast,
+    'drift': drift_forecast,
+}
@@ -1,18 +1,40 @@
 from flask import Flask, request
 from flask_restful import Api, Resource, reqparse
+from flask_security import current_user
 import numpy as np
 import pandas as pd
-import yfinance as yf
-from datetime import datetime
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from sklearn.preprocessing import MinMaxScaler
+import time
+from numpy.lib.stride_tricks import sliding_window_view
+
+from applications import model_registry
+from applications.config import Config
+from applications.inference_server import InferenceBusy, predict_remote
+from applications.price_store import get_history
+from applications.symbol_master import canonical_symbols
+from applications.stat_forecasters import DEFAULT_CONFIDENCE, FORECASTERS
+
+# TensorFlow and scikit-learn are imported inside the functions that need them so
+# that importing this module (and therefore starting the app) stays cheap; only the
+# first /predict request pays their import cost.
 
 # -------------------------------
 # CONFIG
 # -------------------------------
 LOOK_BACK = 60
 FORECAST_DAYS = 14
+EPOCHS = 12
+MODEL_VERSION = 'lstm-direct-v1'   # bump to invalidate stored models
+START_DATE = '2015-01-01'
+MAX_BATCH_TICKERS = 50
+FUSED_CACHE_SIZE = 16
+VALIDATION_WINDOWS = 20          # most recent windows held out to score a model
+FINE_TUNE_EPOCHS = 3
+FINE_TUNE_CONTEXT = 250          # extra history replayed with new bars when fine-tuning
+DEGRADE_RATIO = 1.5              # fine-tuned val loss vs. last full retrain before falling back
+MIN_HISTORY = LOOK_BACK + 2 * FORECAST_DAYS + 2 * VALIDATION_WINDOWS
+MAX_MC_SAMPLES = 1000            # Monte Carlo dropout passes per request
+MC_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+BUSY_RETRY_AFTER = 30            # seconds clients should wait when the inference server is busy
 
 app = Flask(__name__)
 api = Api(app)
@@ -20,13 +42,17 @@ api = Api(app)
 # -------------------------------
 # MODEL CREATION
 # -------------------------------
-def build_model(input_shape=(LOOK_BACK, 1)):
+def build_model(input_shape=(LOOK_BACK, 1), horizon=FORECAST_DAYS):
+    """Direct multi-horizon LSTM: one forward pass predicts all `horizon` days."""
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense, Dropout
+
     model = Sequential([
         LSTM(32, return_sequences=True, input_shape=input_shape),
         Dropout(0.1),
         LSTM(32),
         Dropout(0.1),
-        Dense(1)
+        Dense(horizon)
     ])
     model.compile(optimizer='adam', loss='mse')
     return model
@@ -34,93 +60,444 @@ def build_model(input_shape=(LOOK_BACK, 1)):
 # -------------------------------
 # CREATE SEQUENCES
 # -------------------------------
-def create_sequences(data, look_back):
-    X, Y = [], []
-    for i in range(look_back, len(data)):
-        X.append(data[i - look_back:i, 0])
-        Y.append(data[i, 0])
-    return np.array(X), np.array(Y)
+def create_sequences(data, look_back, horizon=1):
+    """
+    Training windows as zero-copy strided views over `data`.
+    X[i] = data[i : i+look_back], Y[i] = the following `horizon` values
+    (a 1-D target when horizon == 1).
+    """
+    series = np.asarray(data).reshape(-1)
+    windows = sliding_window_view(series, look_back + horizon)
+    X, Y = windows[:, :look_back], windows[:, look_back:]
+    return X, (Y[:, 0] if horizon == 1 else Y)
 
 # -------------------------------
-# FORECAST FUNCTION
+# TRAINING
 # -------------------------------
-def forecast_stock(df):
-    """Forecast next FORECAST_DAYS prices based on 'Close' prices."""
-    df = df[['Close']].dropna()
-    if df.empty or len(df) <= LOOK_BACK:
-        return {"error": f"Not enough data to forecast. Need at least {LOOK_BACK + 1} days."}, 400
+def _split_windows(scaled_data):
+    """
+    (train, validation) windows. The last VALIDATION_WINDOWS windows are held out and
+    the FORECAST_DAYS windows before them are purged, so no training target falls on
+    a day the validation windows are scored on.
+    """
+    X, Y = create_sequences(scaled_data, LOOK_BACK, FORECAST_DAYS)
+    X = X[..., np.newaxis]
+    cut = VALIDATION_WINDOWS + FORECAST_DAYS
+    return (X[:-cut], Y[:-cut]), (X[-VALIDATION_WINDOWS:], Y[-VALIDATION_WINDOWS:])
 
-    data = df.values
+
+def train_model(closes):
+    """Fit a fresh scaler + LSTM on a 1-D array of closes. Returns (model, scaler, meta)."""
+    from sklearn.preprocessing import MinMaxScaler
+
+    data = np.asarray(closes, dtype=float).reshape(-1, 1)
     scaler = MinMaxScaler(feature_range=(0, 1))
     scaled_data = scaler.fit_transform(data)
 
-    X_train, Y_train = create_sequences(scaled_data, LOOK_BACK)
-    X_train = X_train.reshape((X_train.shape[0], X_train.shape[1], 1))
+    (X_train, Y_train), validation = _split_windows(scaled_data)
 
-    # Build and train model
     model = build_model()
-    model.fit(X_train, Y_train, epochs=12, batch_size=64, verbose=0)
-
-    # Forecast
-    forecast_input = scaled_data[-LOOK_BACK:].copy()
-    predicted_scaled = []
-    predicted_dates = []
-    last_date = df.index[-1]
-
-    for _ in range(FORECAST_DAYS):
-        batch = forecast_input[-LOOK_BACK:].reshape(1, LOOK_BACK, 1)
-        next_val = float(model(batch, training=False).numpy()[0, 0])
-        forecast_input = np.append(forecast_input, [[next_val]], axis=0)
-        predicted_scaled.append(next_val)
-
-        # Compute next trading day (skip weekends)
-        next_date = last_date
-        while True:
-            next_date += pd.Timedelta(days=1)
-            if next_date.weekday() < 5:
-                break
-        predicted_dates.append(next_date)
-        last_date = next_date
-
-    actual_predictions = scaler.inverse_transform(np.array(predicted_scaled).reshape(-1, 1))
-
-    # Format response
+    history = model.fit(X_train, Y_train, epochs=EPOCHS, batch_size=64, verbose=0,
+                        validation_data=validation)
+
+    meta = {
+        'mode': 'full',
+        'look_back': LOOK_BACK,
+        'horizon': FORECAST_DAYS,
+        'epochs': EPOCHS,
+        'observations': int(len(data)),
+        'train_loss': float(history.history['loss'][-1]),
+        'val_loss': float(history.history['val_loss'][-1]),
+    }
+    return model, scaler, meta
+
+
+def fine_tune_model(entry, closes):
+    """
+    Warm-start update for a stale registry entry: copy the stored weights and train a
+    few epochs on a recent slice that contains the bars appended since the last fit.
+    The scaler is frozen, so inputs are scaled exactly as the weights were trained on.
+    Returns (model, scaler, meta); the stored model and scaler themselves when there are
+    no new bars (only the metadata needs refreshing). Returns None when the caller should
+    retrain from scratch: new bars fall outside the scaler's fitted range, or the held-out
+    loss has degraded past DEGRADE_RATIO x the last full retrain.
+    """
+    from tensorflow import keras
+
+    meta = dict(entry.meta)
+    closes = np.asarray(closes, dtype=float)
+    new_bars = len(closes) - meta.get('observations', len(closes))
+    if new_bars <= 0:
+        # Nothing new to learn from: keep the weights, just re-stamp the entry
+        meta['mode'] = 'revalidated'
+        return entry.model, entry.scaler, meta
+
+    scaler = entry.scaler
+    lo, hi = float(scaler.data_min_[0]), float(scaler.data_max_[0])
+    latest = closes[-new_bars:]
+    if latest.min() < lo or latest.max() > hi:
+        print(f"[FINE_TUNE] new bars leave the fitted range [{lo:.2f}, {hi:.2f}]; full retrain")
+        return None
+
+    span = FINE_TUNE_CONTEXT + new_bars + LOOK_BACK + 2 * FORECAST_DAYS + VALIDATION_WINDOWS
+    scaled_recent = scaler.transform(closes[-span:].reshape(-1, 1))
+    (X_train, Y_train), (X_val, Y_val) = _split_windows(scaled_recent)
+
+    # Train a copy so requests keep using the stored model meanwhile
+    model = keras.models.clone_model(entry.model)
+    model.set_weights(entry.model.get_weights())
+    model.compile(optimizer='adam', loss='mse')
+    history = model.fit(X_train, Y_train, epochs=FINE_TUNE_EPOCHS, batch_size=32, verbose=0,
+                        validation_data=(X_val, Y_val))
+
+    val_loss = float(history.history['val_loss'][-1])
+    baseline = meta.get('baseline_val_loss')
+    if baseline and val_loss > baseline * DEGRADE_RATIO:
+        print(f"[FINE_TUNE] val loss {val_loss:.5f} > {DEGRADE_RATIO} x baseline {baseline:.5f}; full retrain")
+        return None
+
+    meta.update({
+        'mode': 'fine_tune',
+        'observations': int(len(closes)),
+        'new_bars': int(new_bars),
+        'epochs': FINE_TUNE_EPOCHS,
+        'train_loss': float(history.history['loss'][-1]),
+        'val_loss': val_loss,
+    })
+    return model, scaler, meta
+
+# -------------------------------
+# FORECAST FUNCTION
+# -------------------------------
+def next_trading_days(last_date, count):
+    """The next `count` weekdays after `last_date`."""
+    dates = []
+    next_date = last_date
+    while len(dates) < count:
+        next_date += pd.Timedelta(days=1)
+        if next_date.weekday() < 5:
+            dates.append(next_date)
+    return dates
+
+
+def last_window(scaler, closes):
+    """Scaled model input (LOOK_BACK, 1) built from the most recent closes."""
+    recent = np.asarray(closes[-LOOK_BACK:], dtype=float).reshape(-1, 1)
+    return scaler.transform(recent)
+
+
+def predict_prices(model, scaler, closes):
+    """All FORECAST_DAYS prices from a single forward pass."""
+    batch = last_window(scaler, closes)[np.newaxis]
+    predicted_scaled = model(batch, training=False).numpy()[0]
+    return scaler.inverse_transform(predicted_scaled.reshape(-1, 1))[:, 0]
+
+
+def mc_dropout_draws(model, window, samples):
+    """
+    `samples` stochastic forward passes (dropout active) for one scaled window,
+    stacked into a single batched call. Returns scaled draws of shape (samples, horizon).
+    """
+    batch = np.broadcast_to(window[np.newaxis], (samples,) + window.shape)
+    return np.asarray(model(batch, training=True))
+
+
+def summarize_draws(draws_scaled, scaler, confidence):
+    """Price-space point (mean), interval and per-day quantiles from MC dropout draws."""
+    draws = scaler.inverse_transform(draws_scaled.reshape(-1, 1)).reshape(draws_scaled.shape)
+    tail = (1 - confidence) / 2
+    lower, upper = np.quantile(draws, [tail, 1 - tail], axis=0)
+    quantiles = np.quantile(draws, MC_QUANTILES, axis=0)
+    uncertainty = {
+        "method": "mc_dropout",
+        "samples": int(draws.shape[0]),
+        "confidence": confidence,
+        "quantiles": {f"p{int(q * 100):02d}": np.round(row, 2).tolist() for q, row in zip(MC_QUANTILES, quantiles)},
+    }
+    return draws.mean(axis=0), lower, upper, uncertainty
+
+
+def prepare_closes(df):
+    df = df[['Close']].dropna()
+    if df.empty or len(df) < MIN_HISTORY:
+        return None, None
+    return df.values[:, 0].astype(float), df.index
+
+
+def _format_result(closes, dates, predictions, model_info, lower=None, upper=None):
+    predicted_dates = next_trading_days(dates[-1], FORECAST_DAYS)
     result = {
-        "last_price": float(scaler.inverse_transform(scaled_data[-1].reshape(-1, 1))[0][0]),
-        "last_date": df.index[-1].strftime('%Y-%m-%d'),
+        "last_price": float(closes[-1]),
+        "last_date": dates[-1].strftime('%Y-%m-%d'),
         "day_7": {
             "date": predicted_dates[6].strftime('%Y-%m-%d'),
-            "price": float(actual_predictions[6][0])
+            "price": float(predictions[6])
         },
         "day_14": {
             "date": predicted_dates[13].strftime('%Y-%m-%d'),
-            "price": float(actual_predictions[13][0])
-        }
+            "price": float(predictions[13])
+        },
+        "model": model_info
     }
+    if lower is not None:
+        for key, i in (("day_7", 6), ("day_14", 13)):
+            result[key]["lower"] = float(lower[i])
+            result[key]["upper"] = float(upper[i])
+        result["path"] = [
+            {"date": d.strftime('%Y-%m-%d'), "price": float(p), "lower": float(lo), "upper": float(hi)}
+            for d, p, lo, hi in zip(predicted_dates, predictions, lower, upper)
+        ]
+    return result
+
+
+def _lstm_info(source, meta):
+    return {"name": "lstm", "source": source, "trained_at": meta.get('trained_at')}
+
+
+def forecast_stock(df, ticker=None, refresh=False, mc_samples=0, confidence=DEFAULT_CONFIDENCE):
+    """
+    Forecast next FORECAST_DAYS prices based on 'Close' prices.
+    With a ticker the model comes from the registry (trained once, then reused);
+    without one a throwaway model is trained on `df`.
+    mc_samples > 0 adds Monte Carlo dropout prediction intervals.
+    """
+    closes, dates = prepare_closes(df)
+    if closes is None:
+        return {"error": f"Not enough data to forecast. Need at least {MIN_HISTORY} days."}, 400
+
+    if ticker:
+        entry, source = model_registry.get_or_train(
+            ticker, closes, train_model, model_version=MODEL_VERSION, force=refresh,
+            update_fn=fine_tune_model
+        )
+        model, scaler, meta = entry.model, entry.scaler, entry.meta
+    else:
+        model, scaler, meta = train_model(closes)
+        source = 'untracked'
+
+    if not mc_samples:
+        predictions = predict_prices(model, scaler, closes)
+        return _format_result(closes, dates, predictions, _lstm_info(source, meta)), 200
+
+    draws = mc_dropout_draws(model, last_window(scaler, closes), mc_samples)
+    predictions, lower, upper, uncertainty = summarize_draws(draws, scaler, confidence)
+    result = _format_result(closes, dates, predictions, _lstm_info(source, meta), lower, upper)
+    result["uncertainty"] = uncertainty
     return result, 200
 
+
+def forecast_statistical(df, model_name, confidence=DEFAULT_CONFIDENCE):
+    """Millisecond forecast with confidence bands from a stat_forecasters backend."""
+    closes, dates = prepare_closes(df)
+    if closes is None:
+        return {"error": f"Not enough data to forecast. Need at least {MIN_HISTORY} days."}, 400
+
+    started = time.perf_counter()
+    forecast = FORECASTERS[model_name](closes, FORECAST_DAYS, confidence)
+    model_info = {
+        "name": model_name,
+        "params": forecast['params'],
+        "confidence": confidence,
+        "fit_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+    return _format_result(closes, dates, forecast['point'], model_info,
+                          forecast['lower'], forecast['upper']), 200
+
+
+_fused_models = {}
+
+
+def _fused_model(tickers, entries):
+    """
+    One Keras model wrapping every ticker's model side by side, so a whole
+    watchlist is answered by a single invocation. Cached per model set.
+    """
+    from tensorflow import keras
+
+    key = tuple((t, e.meta.get('trained_at')) for t, e in zip(tickers, entries))
+    fused = _fused_models.get(key)
+    if fused is None:
+        inputs = [keras.Input(shape=(LOOK_BACK, 1)) for _ in entries]
+        # No fixed `training` flag: the outer call decides (False, or True for MC dropout)
+        outputs = [e.model(x) for e, x in zip(entries, inputs)]
+        fused = keras.Model(inputs=inputs, outputs=outputs)
+        if len(_fused_models) >= FUSED_CACHE_SIZE:
+            _fused_models.clear()
+        _fused_models[key] = fused
+    return fused
+
+
+def resolve_models(frames, refresh=False, train=True):
+    """
+    Registry models for {ticker: DataFrame}. Returns (ready, errors, cold):
+    ready  [(ticker, closes, dates, entry, source)] for tickers with a usable model
+    errors {ticker: message}; a failure for one ticker never affects the others
+    cold   tickers whose model is missing or stale; only filled when train=False,
+           otherwise such models are trained (or fine-tuned) here
+    With train=False the current model is used as is and `refresh` is left to the caller.
+    """
+    ready, errors, cold = [], {}, []
+    for ticker, df in frames.items():
+        closes, dates = prepare_closes(df)
+        if closes is None:
+            errors[ticker] = "Not enough data to forecast"
+            continue
+        try:
+            if train:
+                entry, source = model_registry.get_or_train(
+                    ticker, closes, train_model, model_version=MODEL_VERSION, force=refresh,
+                    update_fn=fine_tune_model
+                )
+            else:
+                entry = model_registry.get_current(ticker, closes, model_version=MODEL_VERSION)
+                if entry is None:
+                    cold.append(ticker)
+                    continue
+                source = 'memory'
+        except Exception as e:
+            print(f"[PREDICT] {ticker}: {e}")
+            errors[ticker] = f"Model unavailable: {str(e)}"
+            continue
+        ready.append((ticker, closes, dates, entry, source))
+    return ready, errors, cold
+
+
+def forecast_many(frames, refresh=False, mc_samples=0, confidence=DEFAULT_CONFIDENCE):
+    """
+    Forecast several tickers at once. `frames` is {ticker: DataFrame}.
+    Windows for every ticker are stacked and run through one fused model call;
+    with mc_samples each ticker's window is repeated mc_samples times in that call.
+    Returns ({ticker: result}, {ticker: error}).
+    """
+    ready, errors, _ = resolve_models(frames, refresh=refresh)
+    results = forecast_ready(ready, mc_samples, confidence)
+    return results, errors
+
+
+def forecast_ready(ready, mc_samples=0, confidence=DEFAULT_CONFIDENCE):
+    """{ticker: result} for resolve_models' ready list, from one fused model call."""
+    if not ready:
+        return {}
+
+    tickers = [r[0] for r in ready]
+    entries = [r[3] for r in ready]
+    repeats = mc_samples or 1
+    windows = [
+        np.broadcast_to(last_window(e.scaler, closes)[np.newaxis], (repeats, LOOK_BACK, 1))
+        for _, closes, _, e, _ in ready
+    ]
+
+    outputs = _fused_model(tickers, entries)(windows, training=bool(mc_samples))
+    if not isinstance(outputs, (list, tuple)):
+        outputs = [outputs]
+
+    results = {}
+    for (ticker, closes, dates, entry, source), out in zip(ready, outputs):
+        out = np.asarray(out)
+        info = _lstm_info(source, entry.meta)
+        if mc_samples:
+            predictions, lower, upper, uncertainty = summarize_draws(out, entry.scaler, confidence)
+            results[ticker] = _format_result(closes, dates, predictions, info, lower, upper)
+            results[ticker]["uncertainty"] = uncertainty
+        else:
+            predictions = entry.scaler.inverse_transform(out[0].reshape(-1, 1))[:, 0]
+            results[ticker] = _format_result(closes, dates, predictions, info)
+    return results
+
 # -------------------------------
 # PREDICT RESOURCE
 # -------------------------------
 class Predict(Resource):
+    """
+    GET /api/v1/predict?stock=TCS.NS  (or a comma-separated watchlist: ?stock=TCS.NS,INFY.NS)
+    Optional: model=lstm|ets|ar|drift (default lstm), confidence=0.95,
+    intervals=true&samples=200 for LSTM Monte Carlo dropout intervals.
+    refresh=true forces a retrain and is limited to admins (Authentication-Token);
+    scheduled retraining runs through refresh_models.py.
+    """
     def get(self):
         # Instead of reqparse, just read query param directly
-        stock_ticker = request.args.get('stock', '').upper()
+        tickers = canonical_symbols(request.args.get('stock', '').split(','))
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true', 'yes')
+        model_name = request.args.get('model', 'lstm').lower()
 
-        if not stock_ticker:
+        if not tickers:
             return {"error": "Stock ticker is required"}, 400
+        if refresh and not (current_user.is_authenticated and current_user.has_role('admin')):
+            return {"error": "refresh is restricted to administrators"}, 403
+        if model_name != 'lstm' and model_name not in FORECASTERS:
+            return {"error": f"Unknown model '{model_name}'. Use one of: lstm, {', '.join(FORECASTERS)}"}, 400
+        try:
+            confidence = float(request.args.get('confidence', DEFAULT_CONFIDENCE))
+        except ValueError:
+            return {"error": "confidence must be numeric"}, 400
+        if not 0 < confidence < 1:
+            return {"error": "confidence must be between 0 and 1"}, 400
+        if len(tickers) > MAX_BATCH_TICKERS:
+            return {"error": f"At most {MAX_BATCH_TICKERS} tickers per request"}, 400
+        mc_samples = 0
+        if request.args.get('intervals', '').lower() in ('1', 'true', 'yes'):
+            try:
+                mc_samples = max(2, min(int(request.args.get('samples', 200)), MAX_MC_SAMPLES))
+            except ValueError:
+                return {"error": "samples must be an integer"}, 400
 
-        START_DATE = '2015-01-01'
-        END_DATE = datetime.now().strftime('%Y-%m-%d')
+        # LSTM forecasts go to the shared inference server when one is configured
+        if model_name == 'lstm' and Config.INFERENCE_SERVER_ADDRESS:
+            try:
+                results, errors = predict_remote(Config.INFERENCE_SERVER_ADDRESS, tickers, refresh=refresh,
+                                                 mc_samples=mc_samples, confidence=confidence)
+                if len(tickers) == 1:
+                    if tickers[0] in errors:
+                        return {"error": f"{tickers[0]}: {errors[tickers[0]]}"}, 400
+                    return results[tickers[0]], 200
+                return {"forecasts": results, "errors": errors}, 200
+            except InferenceBusy as e:
+                # Reachable but busy (usually training this ticker): training it again here
+                # would duplicate the work the server exists to do
+                print(f"[PREDICT] {e}")
+                return {"error": "Model is being prepared, retry shortly"}, 503, {'Retry-After': str(BUSY_RETRY_AFTER)}
+            except ConnectionError as e:
+                print(f"[PREDICT] {e}; falling back to in-process inference")
+            except Exception as e:
+                return {"error": f"Prediction failed: {str(e)}"}, 500
 
-        # Download stock data safely
-        df = yf.download(stock_ticker, start=START_DATE, end=END_DATE, progress=False, auto_adjust=True)
-        if df.empty:
-            return {"error": f"Ticker '{stock_ticker}' not found or has no data"}, 400
+        # Download stock data safely (one batched fetch for all tickers)
+        try:
+            frames = get_history(tickers, START_DATE)
+        except Exception as e:
+            return {"error": f"Failed to download data: {str(e)}"}, 500
 
         try:
-            result, status = forecast_stock(df)
-            return result, status
+            if model_name != 'lstm':
+                if len(tickers) == 1:
+                    if tickers[0] not in frames:
+                        return {"error": f"Ticker '{tickers[0]}' not found or has no data"}, 400
+                    return forecast_statistical(frames[tickers[0]], model_name, confidence)
+                results, errors = {}, {}
+                for ticker in tickers:
+                    if ticker not in frames:
+                        errors[ticker] = "Ticker not found or has no data"
+                        continue
+                    result, status = forecast_statistical(frames[ticker], model_name, confidence)
+                    if status == 200:
+                        results[ticker] = result
+                    else:
+                        errors[ticker] = result["error"]
+                return {"forecasts": results, "errors": errors}, 200
+
+            if len(tickers) == 1:
+                stock_ticker = tickers[0]
+                if stock_ticker not in frames:
+                    return {"error": f"Ticker '{stock_ticker}' not found or has no data"}, 400
+                return forecast_stock(frames[stock_ticker], ticker=stock_ticker, refresh=refresh,
+                                      mc_samples=mc_samples, confidence=confidence)
+
+            results, errors = forecast_many(frames, refresh=refresh, mc_samples=mc_samples, confidence=confidence)
+            for ticker in tickers:
+                if ticker not in frames:
+                    errors[ticker] = "Ticker not found or has no data"
+            return {"forecasts": results, "errors": errors}, 200
         except Exception as e:
             import traceback
             print("❌ Prediction error:", e)
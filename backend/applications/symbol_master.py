@@ -0,0 +1,275 @@
+# -- coding: utf-8 --
+"""
+🔎 Local symbol master (NSE / BSE listings)
+→ Loaded once from the exchange listing files in the instance folder
+→ Sorted-array prefix index over symbols and company-name words (bisect, no scans)
+→ Trigram index for typo-tolerant fuzzy matches on symbol and name
+→ Network-free symbol validation; GET /symbols/search for autocomplete
+→ canonical_symbol(): the one memoized spelling every module uses for data and cache keys
+
+Listing files (refresh with `python update_symbols.py`):
+    instance/EQUITY_L.csv    NSE equity list  (SYMBOL, NAME OF COMPANY, ...)
+    instance/Equity.csv      BSE scrip list   (Security Id, Security Name / Issuer Name, Status, ...)
+"""
+
+import csv
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+
+from flask import request
+from flask_restful import Resource
+import numpy as np
+
+from applications.config import Config
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+MIN_FUZZY_SCORE = 0.4
+EXCHANGE_SUFFIX = {'NSE': '.NS', 'BSE': '.BO'}
+SUFFIX_ALIASES = {'NSE': 'NS', 'NS': 'NS', 'BSE': 'BO', 'BOM': 'BO', 'BO': 'BO'}
+DEFAULT_SUFFIX = '.NS'
+CANONICAL_CACHE_SIZE = 16384
+
+Listing = namedtuple('Listing', ['symbol', 'code', 'name', 'exchange'])   # symbol is the yfinance ticker
+
+
+# -------------------------------
+# LOADING
+# -------------------------------
+def _clean(row):
+    return {(k or '').strip().upper(): (v or '').strip() for k, v in row.items()}
+
+
+def read_listing_file(path):
+    """Parse an NSE or BSE listing CSV into Listing tuples (format detected from the header)."""
+    listings = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in map(_clean, csv.DictReader(f)):
+            if 'SYMBOL' in row and 'NAME OF COMPANY' in row:
+                code, name, exchange = row['SYMBOL'], row['NAME OF COMPANY'], 'NSE'
+                if row.get('SERIES', 'EQ') not in ('EQ', 'BE', 'BZ', 'SM', 'ST'):
+                    continue
+            elif 'SECURITY ID' in row:
+                if row.get('STATUS', 'Active').lower() != 'active':
+                    continue
+                code, exchange = row['SECURITY ID'], 'BSE'
+                name = row.get('ISSUER NAME') or row.get('SECURITY NAME', '')
+            else:
+                continue
+            if code:
+                code = code.upper()
+                listings.append(Listing(code + EXCHANGE_SUFFIX[exchange], code, name, exchange))
+    return listings
+
+
+def _trigrams(text):
+    text = f'  {text.lower()} '
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SymbolIndex:
+    """Immutable search structures over a list of listings."""
+
+    def __init__(self, listings):
+        # NSE first so it wins ties and bare-symbol lookups
+        self.listings = sorted(listings, key=lambda l: (l.exchange != 'NSE', l.code))
+        self.by_symbol = {}
+        self.by_code = {}
+        for i, listing in enumerate(self.listings):
+            self.by_symbol.setdefault(listing.symbol, i)
+            self.by_code.setdefault(listing.code, i)
+
+        # Prefix index: (key, rank, listing) sorted; rank 0 = symbol, 1 = name word
+        keys = []
+        for i, listing in enumerate(self.listings):
+            keys.append((listing.code.lower(), 0, i))
+            for word in listing.name.lower().split():
+                keys.append((word, 1, i))
+            keys.append((listing.name.lower(), 1, i))
+        keys.sort()
+        self.prefix_keys = [k for k, _, _ in keys]
+        self.prefix_entries = [(rank, i) for _, rank, i in keys]
+
+        # Trigram postings as numpy arrays so candidate scoring is one bincount
+        postings = {}
+        self.gram_counts = np.zeros(len(self.listings), dtype=np.int32)
+        for i, listing in enumerate(self.listings):
+            grams = _trigrams(listing.code) | _trigrams(listing.name)
+            self.gram_counts[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        self.postings = {g: np.array(ids, dtype=np.int32) for g, ids in postings.items()}
+
+    def __len__(self):
+        return len(self.listings)
+
+    def lookup(self, symbol):
+        symbol = symbol.upper().strip()
+        i = self.by_symbol.get(symbol, self.by_code.get(symbol))
+        return self.listings[i] if i is not None else None
+
+    def prefix(self, query, limit):
+        query = query.lower()
+        start = bisect_left(self.prefix_keys, query)
+        hits = {}
+        for pos in range(start, len(self.prefix_keys)):
+            if not self.prefix_keys[pos].startswith(query):
+                break
+            rank, i = self.prefix_entries[pos]
+            exact = self.prefix_keys[pos] == query
+            score = (rank, not exact, len(self.listings[i].code))
+            if i not in hits or score < hits[i]:
+                hits[i] = score
+            if len(hits) >= limit * 20:
+                break
+        return [i for i, _ in sorted(hits.items(), key=lambda kv: (kv[1], kv[0]))[:limit]]
+
+    def fuzzy(self, query, limit, exclude=()):
+        grams = [self.postings[g] for g in _trigrams(query) if g in self.postings]
+        if not grams:
+            return []
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.listings))
+        # Share of the query's trigrams found in the listing; shorter listings win ties
+        score = shared / len(_trigrams(query)) - self.gram_counts * 1e-4
+        score[list(exclude)] = 0
+        top = np.argpartition(-score, min(limit, len(score) - 1))[:limit]
+        top = top[np.argsort(-score[top], kind='stable')]
+        return [(int(i), float(score[i])) for i in top if score[i] >= MIN_FUZZY_SCORE]
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        query = query.strip()
+        if not query:
+            return []
+        results = [dict(self._as_dict(i), match='prefix') for i in self.prefix(query, limit)]
+        if len(results) < limit:
+            seen = {self.by_symbol[r['symbol']] for r in results}
+            results.extend(dict(self._as_dict(i), match='fuzzy', score=round(s, 3))
+                           for i, s in self.fuzzy(query, limit - len(results), seen))
+        return results
+
+    def _as_dict(self, i):
+        listing = self.listings[i]
+        return {'symbol': listing.symbol, 'code': listing.code, 'name': listing.name, 'exchange': listing.exchange}
+
+
+# -------------------------------
+# MODULE-LEVEL INDEX
+# -------------------------------
+_index = None
+_index_lock = threading.Lock()
+
+
+def listing_files():
+    return [p for p in Config.SYMBOL_MASTER_FILES if os.path.exists(p)]
+
+
+def get_index():
+    """The process-wide index, built from the listing files on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = build_index()
+    return _index
+
+
+def build_index():
+    started = time.perf_counter()
+    listings = []
+    for path in listing_files():
+        try:
+            listings.extend(read_listing_file(path))
+        except Exception as e:
+            print(f"[SYMBOL_MASTER] Could not read {path}: {e}")
+    index = SymbolIndex(listings)
+    if listings:
+        print(f"[SYMBOL_MASTER] Indexed {len(index)} listings in {time.perf_counter() - started:.2f}s")
+    return index
+
+
+def reload():
+    global _index
+    with _index_lock:
+        _index = build_index()
+    canonical_symbol.cache_clear()
+    return _index
+
+
+def is_available():
+    """False when no listing file is installed; callers then fall back to a network check."""
+    return len(get_index()) > 0
+
+
+def lookup(symbol):
+    return get_index().lookup(symbol)
+
+
+@lru_cache(maxsize=CANONICAL_CACHE_SIZE)
+def canonical_symbol(symbol, default_suffix=None):
+    """
+    The yfinance ticker for any user spelling of an instrument:
+    'tcs', 'TCS', 'NSE:TCS', 'TCS.NSE' -> 'TCS.NS'; 'BSE:RELIANCE' -> 'RELIANCE.BO'.
+    Bare codes resolve through the symbol master (NSE preferred). A bare code the
+    master does not know gets `default_suffix` if one is given, otherwise it is
+    passed through as a raw Yahoo ticker ('AAPL' stays 'AAPL').
+    Indices (^NSEI) and currency pairs (INR=X) pass through unchanged.
+    """
+    symbol = (symbol or '').strip().upper().replace(' ', '')
+    if not symbol or symbol.startswith('^') or '=' in symbol:
+        return symbol
+
+    if ':' in symbol:
+        exchange, _, code = symbol.partition(':')
+        if exchange in SUFFIX_ALIASES:
+            return f"{code}.{SUFFIX_ALIASES[exchange]}"
+        symbol = code
+
+    if '.' in symbol:
+        code, _, suffix = symbol.rpartition('.')
+        return f"{code}.{SUFFIX_ALIASES.get(suffix, suffix)}"
+
+    listing = get_index().lookup(symbol)
+    if listing:
+        return listing.symbol
+    return symbol + default_suffix if default_suffix else symbol
+
+
+def canonical_symbols(symbols):
+    """Canonicalize a list, dropping blanks and duplicates while keeping order."""
+    return list(dict.fromkeys(c for c in map(canonical_symbol, symbols) if c))
+
+
+def search(query, limit=DEFAULT_LIMIT):
+    return get_index().search(query, limit)
+
+
+# -------------------------------
+# API
+# -------------------------------
+class SymbolSearch(Resource):
+    """GET /api/v1/symbols/search?q=tata&limit=10 - autocomplete over the symbol master"""
+    def get(self):
+        query = request.args.get('q', '').strip()
+        try:
+            limit = max(1, min(int(request.args.get('limit', DEFAULT_LIMIT)), MAX_LIMIT))
+        except ValueError:
+            return {"error": "limit must be an integer"}, 400
+        if not query:
+            return {"error": "Query parameter q is required"}, 400
+        if not is_available():
+            return {"error": "Symbol master not installed. Run update_symbols.py"}, 503
+
+        started = time.perf_counter()
+        results = search(query, limit)
+        return {
+            "query": query,
+            "results": results,
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+        }, 200
@@ -0,0 +1,94 @@
+"""
+📊 Statistical forecasters vs. the LSTM: latency and accuracy side by side
+→ Holds out the last FORECAST_DAYS closes of each ticker
+→ Fits every backend on the remaining history and forecasts the held-out days
+→ Reports fit / inference latency, MAPE over the path and errors at day 7 and 14
+
+Usage (from backend/):
+    python benchmarks/forecast_compare.py TCS.NS INFY.NS RELIANCE.NS
+    python benchmarks/forecast_compare.py --skip-lstm TCS.NS   # statistical models only
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from applications.price_store import get_history  # noqa: E402
+from applications.stat_forecasters import FORECASTERS  # noqa: E402
+from applications.symbol_master import canonical_symbols  # noqa: E402
+from applications.stock_7_14 import (  # noqa: E402
+    FORECAST_DAYS, START_DATE, predict_prices, prepare_closes, train_model,
+)
+
+DEFAULT_TICKERS = ['TCS.NS', 'INFY.NS', 'RELIANCE.NS', 'HDFCBANK.NS']
+
+
+def _errors(predicted, actual):
+    pct = np.abs(predicted - actual) / actual * 100
+    return {
+        'mape': float(pct.mean()),
+        'ape_day_7': float(pct[6]),
+        'ape_day_14': float(pct[13]),
+    }
+
+
+def evaluate(closes, skip_lstm=False):
+    train, actual = closes[:-FORECAST_DAYS], closes[-FORECAST_DAYS:]
+    rows = {}
+
+    for name, forecaster in FORECASTERS.items():
+        started = time.perf_counter()
+        forecast = forecaster(train, FORECAST_DAYS)
+        elapsed = time.perf_counter() - started
+        covered = (actual >= forecast['lower']) & (actual <= forecast['upper'])
+        rows[name] = dict(_errors(forecast['point'], actual),
+                          fit_ms=elapsed * 1000, predict_ms=0.0, coverage=float(covered.mean()))
+
+    if not skip_lstm:
+        started = time.perf_counter()
+        model, scaler, _ = train_model(train)
+        fit = time.perf_counter() - started
+        started = time.perf_counter()
+        predicted = predict_prices(model, scaler, train)
+        rows['lstm'] = dict(_errors(predicted, actual), fit_ms=fit * 1000,
+                            predict_ms=(time.perf_counter() - started) * 1000, coverage=None)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('tickers', nargs='*', default=DEFAULT_TICKERS)
+    parser.add_argument('--skip-lstm', action='store_true')
+    args = parser.parse_args()
+
+    frames = get_history(canonical_symbols(args.tickers), START_DATE)
+    totals = {}
+
+    header = f"{'ticker':<14}{'model':<8}{'fit ms':>12}{'predict ms':>12}{'MAPE %':>9}{'d7 %':>8}{'d14 %':>8}{'cover':>7}"
+    print(header)
+    print('-' * len(header))
+    for ticker, df in frames.items():
+        closes, _ = prepare_closes(df)
+        if closes is None:
+            print(f"{ticker:<14}not enough data")
+            continue
+        for name, row in evaluate(closes, args.skip_lstm).items():
+            totals.setdefault(name, []).append(row)
+            cover = f"{row['coverage']:.2f}" if row['coverage'] is not None else '-'
+            print(f"{ticker:<14}{name:<8}{row['fit_ms']:>12.1f}{row['predict_ms']:>12.1f}"
+                  f"{row['mape']:>9.2f}{row['ape_day_7']:>8.2f}{row['ape_day_14']:>8.2f}{cover:>7}")
+
+    print('\nAverages across tickers')
+    for name, rows in totals.items():
+        print(f"  {name:<8} fit {np.mean([r['fit_ms'] for r in rows]):>10.1f} ms   "
+              f"MAPE {np.mean([r['mape'] for r in rows]):6.2f} %   "
+              f"day-14 APE {np.mean([r['ape_day_14'] for r in rows]):6.2f} %")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+⏱️ Cold-start import-time report for the Flask app
+→ Imports `main` in fresh interpreters and records wall time and peak RSS
+→ Lists the slowest modules from `python -X importtime`
+→ --against REV measures the backend as of another git revision on the same machine
+  (exported with git archive, the working tree is untouched) and compares the two
+→ Fails when cold start regresses past the baseline (--against, else the stored file)
+  or a heavy ML dependency (TensorFlow, scikit-learn, Gemini SDK) is imported eagerly
+
+Usage (from backend/):
+    python benchmarks/import_time.py                    # report + regression check
+    python benchmarks/import_time.py --against 307ff9b~1  # vs. the tree before lazy imports
+    python benchmarks/import_time.py --update-baseline  # record a new baseline file
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_time_baseline.json')
+RUNS = 5
+TOLERANCE = 0.20            # allowed slowdown vs. baseline before failing
+TOP_MODULES = 15
+LAZY_MODULES = ['tensorflow', 'keras', 'sklearn', 'google.generativeai']
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform != 'darwin':
+    rss *= 1024  # Linux reports KiB, macOS bytes
+print(json.dumps({
+    'seconds': elapsed,
+    'peak_rss_mb': rss / 2**20,
+    'eager': [m for m in %r if m in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def run_probe(backend_dir):
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=backend_dir,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def slowest_modules(backend_dir):
+    """Parse `-X importtime` output into (cumulative_us, module) pairs."""
+    out = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'], cwd=backend_dir,
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:TOP_MODULES]
+
+
+def measure(backend_dir, runs):
+    samples = [run_probe(backend_dir) for _ in range(runs)]
+    return {
+        'python': sys.version.split()[0],
+        'runs': runs,
+        'median_seconds': round(statistics.median(s['seconds'] for s in samples), 3),
+        'min_seconds': round(min(s['seconds'] for s in samples), 3),
+        'median_peak_rss_mb': round(statistics.median(s['peak_rss_mb'] for s in samples), 1),
+        'eager_heavy_modules': samples[0]['eager'],
+    }
+
+
+def export_revision(rev, workdir):
+    """backend/ as of `rev`, extracted under `workdir` via git archive. Returns its path."""
+    root = subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=BACKEND_DIR,
+                          capture_output=True, text=True, check=True).stdout.strip()
+    prefix = os.path.relpath(BACKEND_DIR, root)
+    archive = subprocess.run(['git', 'archive', '--format=tar', rev, prefix], cwd=root,
+                             capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(workdir)
+    return os.path.join(workdir, prefix)
+
+
+def print_report(title, report, backend_dir):
+    print(f"=== Cold start: import main ({title}) ===")
+    for key, value in report.items():
+        print(f"  {key}: {value}")
+    print(f"\n=== Top {TOP_MODULES} modules by cumulative import time ===")
+    for cumulative_us, name in slowest_modules(backend_dir):
+        print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=RUNS)
+    parser.add_argument('--against', metavar='REV', help='git revision to measure as the baseline')
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    report = measure(BACKEND_DIR, args.runs)
+    print_report('working tree', report, BACKEND_DIR)
+
+    baseline = None
+    if args.against:
+        with tempfile.TemporaryDirectory() as workdir:
+            base_dir = export_revision(args.against, workdir)
+            try:
+                baseline = measure(base_dir, args.runs)
+            except subprocess.CalledProcessError as e:
+                print(f"\nCould not import main at {args.against}:\n{e.stderr.strip()[-2000:]}")
+                return 1
+            print()
+            print_report(args.against, baseline, base_dir)
+        print(f"\n=== {args.against} -> working tree ===")
+        for key in ('median_seconds', 'median_peak_rss_mb'):
+            before, after = baseline[key], report[key]
+            change = f"{(after / before - 1) * 100:+.1f}%" if before else "n/a"
+            print(f"  {key}: {before} -> {after} ({change})")
+        print(f"  eager_heavy_modules: {baseline['eager_heavy_modules']} -> {report['eager_heavy_modules']}")
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {BASELINE_PATH}")
+        return 0
+
+    failures = []
+    if report['eager_heavy_modules']:
+        failures.append(f"heavy modules imported at startup: {report['eager_heavy_modules']}")
+
+    if baseline is None and os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+    if baseline is not None:
+        limit = baseline['median_seconds'] * (1 + TOLERANCE)
+        print(f"\nBaseline median: {baseline['median_seconds']}s (limit {limit:.3f}s)")
+        if report['median_seconds'] > limit:
+            failures.append(f"cold start {report['median_seconds']}s exceeds {limit:.3f}s")
+    else:
+        print("\nNo baseline: pass --against REV or record one with --update-baseline.")
+
+    for failure in failures:
+        print(f"[IMPORT_TIME_REGRESSION] {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
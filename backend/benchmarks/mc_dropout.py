@@ -0,0 +1,52 @@
+"""
+🎲 Monte Carlo dropout cost: N sequential passes vs. one batched pass
+→ Builds the /predict LSTM and a random scaled input window
+→ Times N separate `model(x, training=True)` calls against a single call on the
+  window broadcast to a batch of N, which is what /predict?intervals=true does
+
+Usage (from backend/):
+    python benchmarks/mc_dropout.py --samples 50 100 200 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from applications.stock_7_14 import LOOK_BACK, build_model, mc_dropout_draws  # noqa: E402
+
+REPEATS = 5
+
+
+def best_of(fn, repeats=REPEATS):
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, nargs='+', default=[50, 100, 200, 500])
+    args = parser.parse_args()
+
+    model = build_model()
+    window = np.random.default_rng(0).random((LOOK_BACK, 1)).astype('float32')
+    mc_dropout_draws(model, window, 2)  # warm up graph tracing
+
+    print(f"{'samples':>8}{'sequential ms':>16}{'batched ms':>14}{'speedup':>10}")
+    for n in args.samples:
+        single = window[np.newaxis]
+        sequential = best_of(lambda: [model(single, training=True) for _ in range(n)], repeats=1)
+        batched = best_of(lambda: mc_dropout_draws(model, window, n))
+        print(f"{n:>8}{sequential * 1000:>16.1f}{batched * 1000:>14.1f}{sequential / batched:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
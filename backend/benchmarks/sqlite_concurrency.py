@@ -0,0 +1,226 @@
+"""
+🗃️ Concurrent read/write benchmark for the SQLite database
+→ Builds a seeded throwaway database (users, lots, goals, watchlist, snapshots)
+→ Hammers per-user endpoints from reader and writer threads through the Flask test client
+→ Runs twice in fresh interpreters: `baseline` (rollback journal, default pragmas, no
+  per-user indexes) and `tuned` (Config.SQLITE_PRAGMAS + model indexes), then compares
+  throughput, latency percentiles and lock errors
+
+Prices are pre-seeded into price_store's memory cache so the run measures the database,
+not yfinance. The real instance database is never touched.
+
+Usage (from backend/):
+    python benchmarks/sqlite_concurrency.py
+    python benchmarks/sqlite_concurrency.py --users 2000 --readers 8 --writers 4 --seconds 20
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+# -------------------------------
+# CONFIG
+# -------------------------------
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+USERS = 1000
+LOTS_PER_USER = 20
+GOALS_PER_USER = 3
+WATCHLIST_PER_USER = 5
+SNAPSHOTS_PER_USER = 60
+READERS = 6
+WRITERS = 2
+SECONDS = 10
+SYMBOLS = ['TCS.NS', 'INFY.NS', 'RELIANCE.NS', 'HDFCBANK.NS', 'ITC.NS', 'SBIN.NS', 'LT.NS', 'WIPRO.NS']
+# Indexes added for per-user lookups; dropped to reproduce the old schema
+PER_USER_INDEXES = ['_holding_user_symbol_idx', '_goal_user_idx', '_user_roles_user_idx']
+
+READ_ENDPOINTS = [
+    ('portfolio', lambda uid: f'/api/v1/portfolio/{uid}'),
+    ('goals', lambda uid: f'/api/v1/goals?user_id={uid}'),
+    ('has_watchlist', lambda uid: f'/api/v1/has_watchlist/{uid}'),
+    ('history', lambda uid: f'/api/v1/portfolio/history/{uid}?source=snapshots'),
+]
+
+
+# -------------------------------
+# DATABASE
+# -------------------------------
+def build_database(path, users, with_indexes):
+    sys.path.insert(0, BACKEND_DIR)
+    from sqlalchemy import create_engine
+    from applications.database import db
+    import applications.models  # noqa: F401  (registers the tables)
+
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    engine.dispose()
+
+    now = datetime.utcnow()
+    rng = random.Random(7)
+    conn = sqlite3.connect(path)
+    conn.executemany(
+        "INSERT INTO user (id, username, password, email, active, fs_uniquifier) VALUES (?, ?, 'x', ?, 1, ?)",
+        [(u, f'user{u}', f'user{u}@example.com', f'fs{u}') for u in range(1, users + 1)],
+    )
+    conn.executemany(
+        "INSERT INTO portfolio_holding (id, user_id, symbol, quantity, purchase_price, purchase_date, added_at, updated_at)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [((u - 1) * LOTS_PER_USER + k + 1, u, rng.choice(SYMBOLS), rng.randint(1, 50), rng.uniform(100, 3000),
+          now - timedelta(days=rng.randint(30, 900)), now, now)
+         for u in range(1, users + 1) for k in range(LOTS_PER_USER)],
+    )
+    conn.executemany(
+        "INSERT INTO investment_goal (user_id, goal_name, target_amount, current_amount, target_date, created_at, updated_at)"
+        " VALUES (?, ?, ?, 0, ?, ?, ?)",
+        [(u, f'goal{g}', 500000.0, now + timedelta(days=900), now, now)
+         for u in range(1, users + 1) for g in range(GOALS_PER_USER)],
+    )
+    conn.executemany(
+        "INSERT INTO watchlist (user_id, ticker, added_at) VALUES (?, ?, ?)",
+        [(u, symbol, now) for u in range(1, users + 1) for symbol in SYMBOLS[:WATCHLIST_PER_USER]],
+    )
+    conn.executemany(
+        "INSERT INTO portfolio_snapshot (user_id, total_value, snapshot_date) VALUES (?, ?, ?)",
+        [(u, rng.uniform(1e5, 1e6), now - timedelta(days=d))
+         for u in range(1, users + 1) for d in range(SNAPSHOTS_PER_USER)],
+    )
+    if not with_indexes:
+        for name in PER_USER_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+    conn.commit()
+    conn.close()
+
+
+# -------------------------------
+# WORKER (runs in a fresh interpreter)
+# -------------------------------
+def seed_price_cache():
+    import numpy as np
+    import pandas as pd
+    from applications import price_store
+
+    start = (pd.Timestamp.today().normalize() - pd.Timedelta(days=400)).strftime('%Y-%m-%d')
+    index = pd.bdate_range(start=start, end=pd.Timestamp.today().normalize(), name='Date')
+    for i, symbol in enumerate(SYMBOLS):
+        close = 100.0 * (i + 1) * np.exp(np.linspace(0, 0.2, len(index)))
+        frame = pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1e6}, index=index)
+        price_store._history_cache[symbol] = (start, frame)
+
+
+def run_worker(mode, db_path, users, readers, writers, seconds):
+    sys.path.insert(0, BACKEND_DIR)
+    from applications.config import Config
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{db_path}"
+    if mode == 'baseline':
+        Config.SQLITE_PRAGMAS = {}
+    seed_price_cache()
+    from main import app
+
+    results = {'read': [], 'write': []}
+    errors = {'read': 0, 'write': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def read_loop(seed):
+        rng, client, samples, failed = random.Random(seed), app.test_client(), [], 0
+        while time.perf_counter() < deadline:
+            uid = rng.randint(1, users)
+            _, url = rng.choice(READ_ENDPOINTS)
+            started = time.perf_counter()
+            status = client.get(url(uid)).status_code
+            samples.append(time.perf_counter() - started)
+            failed += status >= 500
+        with lock:
+            results['read'].extend(samples)
+            errors['read'] += failed
+
+    def write_loop(seed):
+        rng, client, samples, failed = random.Random(seed), app.test_client(), [], 0
+        while time.perf_counter() < deadline:
+            uid = rng.randint(1, users)
+            started = time.perf_counter()
+            if rng.random() < 0.5:
+                holding_id = (uid - 1) * LOTS_PER_USER + rng.randint(1, LOTS_PER_USER)
+                response = client.put(f'/api/v1/portfolio/update/{holding_id}',
+                                      json={'user_id': uid, 'quantity': rng.randint(1, 50)})
+            else:
+                response = client.post('/api/v1/goals', json={
+                    'user_id': uid, 'goal_name': 'bench', 'target_amount': 100000.0, 'target_date': '2030-01-01'})
+            samples.append(time.perf_counter() - started)
+            failed += response.status_code >= 500
+        with lock:
+            results['write'].extend(samples)
+            errors['write'] += failed
+
+    threads = [threading.Thread(target=read_loop, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=write_loop, args=(100 + i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    report = {'mode': mode}
+    for kind, samples in results.items():
+        samples.sort()
+        report[kind] = {
+            'requests': len(samples),
+            'per_second': round(len(samples) / seconds, 1),
+            'p50_ms': round(statistics.median(samples) * 1000, 2) if samples else None,
+            'p95_ms': round(samples[int(len(samples) * 0.95)] * 1000, 2) if samples else None,
+            'errors': errors[kind],
+        }
+    print(json.dumps(report))
+
+
+# -------------------------------
+# DRIVER
+# -------------------------------
+def run_mode(mode, args, workdir):
+    db_path = os.path.join(workdir, f'{mode}.sqlite3')
+    build_database(db_path, args.users, with_indexes=(mode == 'tuned'))
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--worker', mode, db_path,
+         '--users', str(args.users), '--readers', str(args.readers),
+         '--writers', str(args.writers), '--seconds', str(args.seconds)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'DB_PATH'), help=argparse.SUPPRESS)
+    parser.add_argument('--users', type=int, default=USERS)
+    parser.add_argument('--readers', type=int, default=READERS)
+    parser.add_argument('--writers', type=int, default=WRITERS)
+    parser.add_argument('--seconds', type=float, default=SECONDS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker[0], args.worker[1], args.users, args.readers, args.writers, args.seconds)
+        return 0
+
+    print(f"{args.users} users x {LOTS_PER_USER} lots, {args.readers} readers / {args.writers} writers, "
+          f"{args.seconds:g}s per mode")
+    with tempfile.TemporaryDirectory() as workdir:
+        reports = [run_mode(mode, args, workdir) for mode in ('baseline', 'tuned')]
+
+    print(f"\n{'mode':<10}{'kind':<7}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for report in reports:
+        for kind in ('read', 'write'):
+            r = report[kind]
+            print(f"{report['mode']:<10}{kind:<7}{r['per_second']:>9}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['errors']:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
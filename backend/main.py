@@ -8,6 +8,9 @@ import os
 # Import configurations, db instance, models, datastore, and initialization function
 from applications.config import Config
 from applications.database import db
+from applications.db_setup import configure_engine, ensure_indexes
+from applications.query_stats import QueryReport, init_query_stats
+from applications.response_cache import CacheStats, init_cache
 from applications.models import User, Role # Ensure both are defined in models.py
 from applications.user_datastore import user_datastore # Ensure this is correctly initialized
 from create_initial_data import create_data
@@ -15,6 +18,12 @@ from applications.stock_7_14 import Predict
 from applications.monte_carlo import *
 from applications.bullish_berish import *
 from applications.portfolio_apis import *
+from applications.portfolio_optimizer import PortfolioOptimizer
+from applications.risk_engine import PortfolioRisk
+from applications.portfolio_history import PortfolioHistory
+from applications.returns_analytics import PortfolioReturns
+from applications.portfolio_import import ImportPortfolio
+from applications.symbol_master import SymbolSearch
 from applications.candle_stick import *
 
 from applications.Graphs_api import *
@@ -31,6 +40,9 @@ def create_app():
 
     # Initialize extensions that don't depend on others first
     db.init_app(app) # Initialize SQLAlchemy
+    with app.app_context():
+        configure_engine(db.engine)  # WAL + pragmas on every pooled connection
+        init_query_stats(app, db.engine)  # per-request statement counts / N+1 warnings
 
     # --- ADJUSTED INITIALIZATION ORDER ---
     # 1. Initialize Flask-Restful Api FIRST
@@ -46,7 +58,7 @@ def create_app():
         "http://127.0.0.1:5173"
     ],
     "supports_credentials": True,
-    "expose_headers": ["Content-Type", "Authorization"],
+    "expose_headers": ["Content-Type", "Authorization", "X-DB-Queries", "X-Cache"],
     "allow_headers": [
         "Content-Type",
         "Authorization",
@@ -54,6 +66,7 @@ def create_app():
         "Origin",
         "X-Auth-Token",
         "X-Requested-With",
+        "Cache-Control",
         "user-id"  # <-- Add your custom header here
     ],
     "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]
@@ -87,16 +100,22 @@ def create_app():
     api.add_resource(VolumeChartAPI, "/chart/volume")
     api.add_resource(DMAChartAPI,'/chart/dma')
     api.add_resource(CandleData, "/chart/candle/<string:symbol>")
+    api.add_resource(SymbolSearch, "/symbols/search")  # GET autocomplete over NSE/BSE listings
     #/api/v1/chart/price
     #/api/v1/chart/volume
     
      #protfolio apis
     
     api.add_resource(AddPortfolio, '/portfolio/add')  # POST to add stock
+    api.add_resource(ImportPortfolio, '/portfolio/import')  # POST broker CSV bulk import
     api.add_resource(PortfolioDashboard, '/portfolio/dashboard/<int:user_id>')  # GET dashboard with stats
     api.add_resource(UpdatePortfolio, '/portfolio/update/<int:holding_id>')  # PUT to update holding
     api.add_resource(DeletePortfolio, '/portfolio/<int:holding_id>')  # DELETE specific holding
     api.add_resource(GetPortfolio, '/portfolio/<int:user_id>')  # GET user's holdings
+    api.add_resource(PortfolioOptimizer, '/portfolio/optimize')  # POST efficient frontier & rebalance
+    api.add_resource(PortfolioRisk, '/portfolio/risk/<int:user_id>')  # GET VaR / Expected Shortfall
+    api.add_resource(PortfolioHistory, '/portfolio/history/<int:user_id>')  # GET value series from snapshots
+    api.add_resource(PortfolioReturns, '/portfolio/returns/<int:user_id>')  # GET TWR / XIRR analytics
     
     # Investment Goals APIs
     api.add_resource(InvestmentGoalListResource, '/goals')  # GET all goals, POST new goal
@@ -107,8 +126,19 @@ def create_app():
     api.add_resource(AIChatbot, '/ai/chat')
     api.add_resource(AIStockAnalyzer, '/ai/analyze-stock')
     api.add_resource(AIPortfolioAdvisor, '/ai/portfolio-advice')
+    api.add_resource(AIChatbotStream, '/ai/chat/stream')
+    api.add_resource(AIStockAnalyzerStream, '/ai/analyze-stock/stream')
+    api.add_resource(AIPortfolioAdvisorStream, '/ai/portfolio-advice/stream')
+
+    #debug apis
+    api.add_resource(QueryReport, '/debug/queries')  # GET per-endpoint SQL statistics
+    api.add_resource(CacheStats, '/debug/cache')  # GET per-endpoint cache hit ratios
     print("API resources registered under /api/v1 prefix.")
 
+    # 4. Response cache (after registration: policies attach to the registered resources)
+    init_cache(app)
+    print("Response cache initialized.")
+
     print("API resources registered under /api/v1 prefix.")
 
     return app, api # Return the configured app and api instances
@@ -152,6 +182,10 @@ if __name__ == '__main__':
                 print("Exiting application context for initial DB setup.")
     else:
         print(f"Database file already exists at '{db_path}'. Skipping initialization.")
+        with app.app_context():
+            created = ensure_indexes(db.engine)
+            if created:
+                print(f"Created missing indexes: {', '.join(created)}")
     # --- End Conditional DB Setup ---
 
     # --- Start the Flask Development Server ---
@@ -0,0 +1,23 @@
+"""
+Index migration for existing databases.
+
+main.py only runs db.create_all() when the database file is missing, so indexes
+declared on the models after a database was created never reach it. This issues
+CREATE INDEX IF NOT EXISTS for each of them; safe to re-run.
+
+Usage (from backend/):
+    python migrate_indexes.py
+"""
+
+from applications.db_setup import ensure_indexes
+
+
+if __name__ == '__main__':
+    from main import app
+    from applications.database import db
+
+    with app.app_context():
+        created = ensure_indexes(db.engine)
+        mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+    print(f"[MIGRATE] Created {len(created)} index(es){': ' + ', '.join(created) if created else ''}; "
+          f"journal_mode={mode}")
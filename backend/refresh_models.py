@@ -0,0 +1,74 @@
+"""
+Nightly refresh of the per-ticker forecasting models.
+
+Fetches history for every watched / held ticker in one batched download and
+brings each registry entry up to date: stale models are fine-tuned on the new
+bars, and only fall back to a full retrain when validation loss degrades.
+
+Usage (from backend/, e.g. from cron after market close):
+    python refresh_models.py                 # all watchlist + portfolio tickers
+    python refresh_models.py TCS.NS INFY.NS  # explicit tickers
+"""
+
+import sys
+import time
+from datetime import timedelta
+
+from applications import model_registry
+from applications.models import PortfolioHolding, Watchlist
+from applications.price_store import get_history, to_yf_symbol
+from applications.symbol_master import canonical_symbol, canonical_symbols
+from applications.stock_7_14 import (
+    MODEL_VERSION, START_DATE, prepare_closes, fine_tune_model, train_model,
+)
+
+# Refresh anything not updated in the last ~half day, so a nightly run always updates
+NIGHTLY_MAX_AGE = timedelta(hours=12)
+# get_or_train sources meaning the model was trained from scratch
+RETRAIN_SOURCES = ('cold_start', 'forced', 'model_version_changed', 'expired', 'price_drift',
+                   'out_of_range', 'degraded')
+
+
+def tracked_tickers():
+    watched = {canonical_symbol(t) for (t,) in Watchlist.query.with_entities(Watchlist.ticker).distinct()}
+    held = {to_yf_symbol(s) for (s,) in PortfolioHolding.query.with_entities(PortfolioHolding.symbol).distinct()}
+    return sorted(watched | held)
+
+
+def refresh(tickers):
+    frames = get_history(tickers, START_DATE)
+    summary = {}
+    for ticker in tickers:
+        if ticker not in frames:
+            summary[ticker] = 'no_data'
+            continue
+        closes, _ = prepare_closes(frames[ticker])
+        if closes is None:
+            summary[ticker] = 'not_enough_data'
+            continue
+        started = time.perf_counter()
+        try:
+            _, source = model_registry.get_or_train(
+                ticker, closes, train_model, model_version=MODEL_VERSION,
+                update_fn=fine_tune_model, max_age=NIGHTLY_MAX_AGE,
+            )
+        except Exception as e:
+            source = f'error: {e}'
+        summary[ticker] = source
+        print(f"[REFRESH] {ticker:<15} {source:<28} {time.perf_counter() - started:6.1f}s")
+    return summary
+
+
+if __name__ == '__main__':
+    from main import app
+
+    with app.app_context():
+        tickers = canonical_symbols(sys.argv[1:]) or tracked_tickers()
+    print(f"Refreshing {len(tickers)} models...")
+    started = time.perf_counter()
+    summary = refresh(tickers)
+    print(f"Done in {time.perf_counter() - started:.1f}s: "
+          f"{sum(s.startswith('fine_tune') for s in summary.values())} fine-tuned, "
+          f"{sum(s.startswith('revalidated') for s in summary.values())} revalidated, "
+          f"{sum(s in RETRAIN_SOURCES for s in summary.values())} retrained, "
+          f"{sum(s in ('memory', 'disk') for s in summary.values())} up to date")
@@ -0,0 +1,54 @@
+"""
+Walk-forward backtest of the forecasters across tickers.
+
+Usage (from backend/):
+    python run_backtest.py TCS.NS INFY.NS RELIANCE.NS
+    python run_backtest.py --models ets ar drift --folds 20 --workers 4 TCS.NS INFY.NS
+    python run_backtest.py --output backtest.json TCS.NS
+"""
+
+import argparse
+import json
+
+from applications.backtesting import BACKTEST_FORECASTERS, FOLD_STEP, HORIZONS, NUM_FOLDS, run_backtest
+from applications.price_store import get_history
+from applications.symbol_master import canonical_symbols
+from applications.stock_7_14 import START_DATE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--models', nargs='+', default=list(BACKTEST_FORECASTERS), choices=list(BACKTEST_FORECASTERS))
+    parser.add_argument('--folds', type=int, default=NUM_FOLDS)
+    parser.add_argument('--step', type=int, default=FOLD_STEP)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', help='write the full JSON report here')
+    args = parser.parse_args()
+
+    tickers = canonical_symbols(args.tickers)
+    frames = get_history(tickers, START_DATE)
+    series = {t: df['Close'].dropna().to_numpy() for t, df in frames.items()}
+    missing = sorted(set(tickers) - set(series))
+    if missing:
+        print(f"No data for: {', '.join(missing)}")
+
+    report = run_backtest(series, args.models, args.folds, args.step, args.workers)
+
+    columns = [f'mape_{h}d' for h in HORIZONS] + [f'directional_accuracy_{h}d' for h in HORIZONS]
+    print(f"\n{'model':<8}{'tickers':>8}" + ''.join(f'{c:>26}' for c in columns) + f"{'wall s':>10}")
+    for model_name, row in sorted(report['summary'].items(), key=lambda kv: kv[1][f'mape_{HORIZONS[-1]}d']):
+        print(f"{model_name:<8}{row['tickers']:>8}" + ''.join(f'{row[c]:>26}' for c in columns)
+              + f"{row['wall_seconds']:>10}")
+    for error in report['errors']:
+        print(f"[BACKTEST_ERROR] {error['model']} {error['ticker']}: {error['error']}")
+    print(f"\nTotal elapsed: {report['elapsed_seconds']}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""
+Daily portfolio snapshot.
+
+Values every user's holdings from one batched price fetch and stores one
+PortfolioSnapshot row per user for the day. Safe to re-run: a second run on
+the same day replaces that day's rows.
+
+Usage (from backend/, e.g. from cron after market close):
+    python snapshot_job.py               # today
+    python snapshot_job.py 2024-06-28    # a specific day (uses current prices)
+    python snapshot_job.py --backfill    # reconstruct history before each user's first snapshot
+"""
+
+import sys
+import time
+from datetime import datetime
+
+from applications.portfolio_history import backfill_snapshots, write_snapshots
+
+
+if __name__ == '__main__':
+    from main import app
+
+    args = [a for a in sys.argv[1:] if a != '--backfill']
+    started = time.perf_counter()
+    with app.app_context():
+        if '--backfill' in sys.argv:
+            inserted = backfill_snapshots()
+            print(f"[SNAPSHOT] Backfilled {sum(inserted.values())} rows for {len(inserted)} users "
+                  f"in {time.perf_counter() - started:.1f}s")
+        else:
+            when = datetime.strptime(args[0], '%Y-%m-%d') if args else None
+            totals = write_snapshots(when)
+            print(f"[SNAPSHOT] {len(totals)} portfolios valued in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,42 @@
+"""
+Download the exchange listing files used by the local symbol master.
+
+NSE publishes its equity list as a public CSV. The BSE scrip list has no
+stable direct link; download "List of Scrips" (Equity, Active) from bseindia.com
+and save it as applications/instance/Equity.csv.
+
+Usage (from backend/):
+    python update_symbols.py
+"""
+
+import os
+import time
+
+import requests
+
+from applications.config import Config
+from applications.symbol_master import read_listing_file, reload
+
+NSE_EQUITY_URL = 'https://archives.nseindia.com/content/equities/EQUITY_L.csv'
+HEADERS = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64)', 'Accept': 'text/csv,*/*'}
+
+
+def download(url, path):
+    response = requests.get(url, headers=HEADERS, timeout=30)
+    response.raise_for_status()
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(response.content)
+    if not read_listing_file(tmp):
+        os.remove(tmp)
+        raise ValueError(f'{url} did not return a listing file')
+    os.replace(tmp, path)
+
+
+if __name__ == '__main__':
+    nse_path = Config.SYMBOL_MASTER_FILES[0]
+    started = time.perf_counter()
+    download(NSE_EQUITY_URL, nse_path)
+    print(f"[SYMBOLS] NSE list saved to {nse_path}")
+    index = reload()
+    print(f"[SYMBOLS] {len(index)} listings indexed in {time.perf_counter() - started:.1f}s")